@@ -0,0 +1,220 @@
+"""Mesures de performance du moteur de délibération sur des cohortes synthétiques.
+
+Échoue si une requête critique passe en balayage complet (EXPLAIN QUERY PLAN). Le budget
+d'import du démarrage est vérifié par tests/test_demarrage.py.
+
+Usage : python benchmark.py [--tailles 1000 10000 50000] [--tailles-noyau 10000 100000]
+                            [--tailles-import 5000] [--limite-par-ligne 10000]
+                            [--centres 8] [--taille-centre 2000]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+from database import create_database
+from models.consolidation import consolider
+from models.deliberation_engine import (
+    COLONNES_TOUR1, COLONNES_TOUR2, calculer_resultat, charger_resultat_candidat,
+    charger_resultats
+)
+from models.import_pipeline import COLONNES_MOYENNES, COLONNES_NOTES, importer_dataframe
+from models.migrations import requetes_en_balayage_complet
+from models.scoring_kernel import calculer_cohorte
+
+
+def creer_base_synthetique(chemin, nb_candidats, graine=0):
+    """Crée une base BFEM remplie de candidats, notes et livrets aléatoires."""
+    create_database(chemin)
+    rng = random.Random(graine)
+
+    def note(probabilite_absente=0.02):
+        return None if rng.random() < probabilite_absente else round(rng.uniform(0, 20), 2)
+
+    candidats, notes_tour1, notes_tour2, livrets = [], [], [], []
+    for i in range(1, nb_candidats + 1):
+        candidats.append((
+            i, i, f"PRENOM{i}", f"NOM{i}", "2008-01-01", "Dakar",
+            rng.choice("MF"), "Officiel", f"Etablissement {i % 40}", "SEN",
+            False, "Neutre", True
+        ))
+        notes_tour1.append((i, str(i), *[note() for _ in COLONNES_TOUR1]))
+        if rng.random() < 0.15:
+            notes_tour2.append((i, str(i), *[note(0) for _ in COLONNES_TOUR2]))
+        if rng.random() < 0.9:
+            livrets.append((i, 1, round(rng.uniform(5, 18), 2)))
+
+    with closing(sqlite3.connect(chemin)) as conn:
+        with conn:
+            conn.executemany("""
+                INSERT INTO Candidats (
+                    id_candidat, numero_table, prenom, nom, date_naissance, lieu_naissance,
+                    sexe, type_candidat, etablissement, nationalite,
+                    choix_epr_facultative, epreuve_facultative, aptitude_sportive
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, candidats)
+            conn.executemany(f"""
+                INSERT INTO Notes_Tour1 (id_candidat, anonymat, {', '.join(COLONNES_TOUR1)})
+                VALUES (?, ?, {', '.join('?' * len(COLONNES_TOUR1))})
+            """, notes_tour1)
+            conn.executemany(f"""
+                INSERT INTO Notes_Tour2 (id_candidat, anonymat, {', '.join(COLONNES_TOUR2)})
+                VALUES (?, ?, {', '.join('?' * len(COLONNES_TOUR2))})
+            """, notes_tour2)
+            conn.executemany("""
+                INSERT INTO Livret_Scolaire (id_candidat, nombre_de_fois, moyenne_cycle)
+                VALUES (?, ?, ?)
+            """, livrets)
+
+
+def deliberation_par_ligne(conn):
+    """Reproduit l'ancien chemin : trois requêtes par candidat."""
+    cur = conn.cursor()
+    cur.execute("SELECT id_candidat FROM Candidats ORDER BY numero_table")
+    resultats = []
+    for (id_candidat,) in cur.fetchall():
+        resultat = charger_resultat_candidat(cur, id_candidat)
+        if resultat[0] is not None:
+            resultats.append(resultat)
+    return resultats
+
+
+def comparer_noyau(nb_candidats, graine=0):
+    """Compare le noyau NumPy au calcul scalaire sur des notes aléatoires.
+
+    Retourne (durée scalaire, durée noyau) après avoir vérifié la parité des résultats.
+    """
+    rng = np.random.default_rng(graine)
+    notes_tour1 = rng.uniform(0, 20, (nb_candidats, len(COLONNES_TOUR1))).round(2)
+    notes_tour1[rng.random(notes_tour1.shape) < 0.05] = np.nan
+    notes_tour2 = rng.uniform(0, 20, (nb_candidats, len(COLONNES_TOUR2))).round(2)
+    presence_tour2 = rng.random(nb_candidats) < 0.15
+    moyenne_cycle = rng.uniform(5, 18, nb_candidats).round(2)
+
+    def scalaire():
+        lignes_tour1 = [[None if n != n else n for n in ligne] for ligne in notes_tour1.tolist()]
+        lignes_tour2 = notes_tour2.tolist()
+        return [
+            calculer_resultat(t1, t2 if present else None, moyenne)
+            for t1, t2, present, moyenne in zip(lignes_tour1, lignes_tour2,
+                                                presence_tour2.tolist(), moyenne_cycle.tolist())
+        ]
+
+    duree_scalaire, attendus = chronometrer(scalaire)
+    duree_noyau, (total_points, points_tour2, bonus_malus, statuts) = chronometrer(
+        calculer_cohorte, notes_tour1, notes_tour2, presence_tour2, moyenne_cycle)
+
+    obtenus = [
+        (total, None if tour2 != tour2 else tour2, moyenne, bonus, statut)
+        for total, tour2, moyenne, bonus, statut in zip(
+            total_points.tolist(), points_tour2.tolist(), moyenne_cycle.tolist(),
+            bonus_malus.tolist(), statuts.tolist())
+    ]
+    if obtenus != attendus:
+        raise SystemExit(f"Noyau NumPy divergent du calcul scalaire pour {nb_candidats} candidats")
+    return duree_scalaire, duree_noyau
+
+
+def feuille_synthetique(nb_candidats, graine=0):
+    """Construit un DataFrame au format de la feuille Excel BD_BFEM."""
+    rng = np.random.default_rng(graine)
+    feuille = pd.DataFrame({
+        "N° de table": np.arange(1, nb_candidats + 1),
+        "Prenom (s)": [f"PRENOM{i}" for i in range(nb_candidats)],
+        "NOM": [f"NOM{i}" for i in range(nb_candidats)],
+        "Date de nais.": pd.Timestamp("2008-01-01"),
+        "Lieu de nais.": "Dakar",
+        "Sexe": rng.choice(["M", "F"], nb_candidats),
+        "Nb fois": 1,
+        "Type de candidat": "Officiel",
+        "Etablissement": [f"Etablissement {i % 40}" for i in range(nb_candidats)],
+        "Nationnallité": "SEN",
+        "Etat Sportif": "APTE",
+        "Epreuve Facultative": rng.choice(["NEUTRE", "COUTURE", "Dessin", "musique"], nb_candidats),
+    })
+    for colonne in list(COLONNES_MOYENNES) + list(COLONNES_NOTES):
+        feuille[colonne] = rng.uniform(0, 20, nb_candidats).round(2)
+    return feuille
+
+
+def chronometrer(fonction, *args):
+    """Exécute une fonction et retourne (durée en secondes, résultat)."""
+    debut = time.perf_counter()
+    resultat = fonction(*args)
+    return time.perf_counter() - debut, resultat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tailles", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--tailles-noyau", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--tailles-import", type=int, nargs="+", default=[5000])
+    parser.add_argument("--limite-par-ligne", type=int, default=10000,
+                        help="taille au-delà de laquelle l'ancien chemin n'est pas mesuré")
+    parser.add_argument("--centres", type=int, default=8, help="bases de centre pour la consolidation")
+    parser.add_argument("--taille-centre", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'Candidats':>10} {'Par ligne (s)':>14} {'Moteur (s)':>11} {'Gain':>8}")
+    with tempfile.TemporaryDirectory() as dossier:
+        for taille in args.tailles:
+            chemin = os.path.join(dossier, f"bench_{taille}.sqlite")
+            creer_base_synthetique(chemin, taille)
+
+            with closing(sqlite3.connect(chemin)) as conn:
+                regressions = requetes_en_balayage_complet(conn)
+                if regressions:
+                    raise SystemExit(f"Requêtes en balayage complet : {regressions}")
+                duree_moteur, resultats = chronometrer(charger_resultats, conn)
+
+                if taille <= args.limite_par_ligne:
+                    duree_ligne, attendus = chronometrer(deliberation_par_ligne, conn)
+                    obtenus = [(r.points_tour1, r.points_tour2, r.moyenne_cycle,
+                                r.bonus_malus, r.statut) for r in resultats]
+                    if obtenus != attendus:
+                        raise SystemExit(f"Résultats divergents pour {taille} candidats")
+                    print(f"{taille:>10} {duree_ligne:>14.3f} {duree_moteur:>11.3f} "
+                          f"{duree_ligne / duree_moteur:>7.1f}x")
+                else:
+                    print(f"{taille:>10} {'ignoré':>14} {duree_moteur:>11.3f} {'-':>8}")
+
+    print(f"\n{'Candidats':>10} {'Scalaire (s)':>14} {'Noyau (s)':>11} {'Gain':>8}")
+    for taille in args.tailles_noyau:
+        duree_scalaire, duree_noyau = comparer_noyau(taille)
+        print(f"{taille:>10} {duree_scalaire:>14.3f} {duree_noyau:>11.3f} "
+              f"{duree_scalaire / duree_noyau:>7.1f}x")
+
+    print(f"\n{'Candidats':>10} {'Lignes':>14} {'Import (s)':>11} {'Lignes/s':>10}")
+    with tempfile.TemporaryDirectory() as dossier:
+        for taille in args.tailles_import:
+            chemin = os.path.join(dossier, f"import_{taille}.sqlite")
+            create_database(chemin)
+            feuille = feuille_synthetique(taille)
+            with closing(sqlite3.connect(chemin)) as conn:
+                rapport = importer_dataframe(conn, feuille)
+            print(f"{taille:>10} {rapport.nb_lignes:>14} {rapport.duree:>11.3f} "
+                  f"{rapport.lignes_par_seconde:>10,.0f}")
+
+    # Consolidation : un processus, puis un par cœur
+    print(f"\n{'Centres':>10} {'Processus':>14} {'Durée (s)':>11} {'Gain':>8}")
+    with tempfile.TemporaryDirectory() as dossier:
+        for i in range(args.centres):
+            creer_base_synthetique(os.path.join(dossier, f"centre_{i}.sqlite"), args.taille_centre, graine=i)
+        synthese = os.path.join(dossier, "synthese", "synthese.sqlite")
+        os.makedirs(os.path.dirname(synthese))
+        reference = None
+        for processus in sorted({1, os.cpu_count() or 1}):
+            rapport = consolider(dossier, synthese, processus)
+            reference = reference or rapport.duree
+            print(f"{args.centres:>10} {processus:>14} {rapport.duree:>11.3f} "
+                  f"{reference / rapport.duree:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
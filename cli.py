@@ -0,0 +1,228 @@
+"""Traitements BFEM en ligne de commande, sans interface graphique.
+
+Chaque sous-commande travaille sur une base de centre (--base) avec le même code que
+les fenêtres de l'application. Une base par processus : plusieurs centres se traitent
+en parallèle en lançant plusieurs commandes, par exemple
+
+    ls centres/*.sqlite | xargs -P 4 -I{} python cli.py --base {} deliberer
+
+Usage : python cli.py [--base bfem_db.sqlite] <commande> [options]
+    import FICHIER [--flux] [--recommencer] [--lot 5000]
+    anonymats
+    deliberer
+    finaliser
+    statistiques [--json] [--detail]
+    pdf {candidats,anonymats,resultats,pv} [-o FICHIER] [--sans-cache]
+    releves [--tour 1] [--etablissement NOM] [-o DOSSIER | --fusionner FICHIER] [--processus N]
+    consolider DOSSIER [--synthese synthese_regionale.sqlite] [--processus N]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+import time
+
+from models.database_manager import DB_NAME, DatabaseManager, obtenir_connexion
+
+# Documents PDF : (nom du constructeur dans models.rapports_pdf, fichier par défaut)
+DOCUMENTS_PDF = {
+    "candidats": ("construire_liste_candidats", "Liste_Candidats.pdf"),
+    "anonymats": ("construire_liste_anonymats", "Liste_Anonymats.pdf"),
+    "resultats": ("construire_resultats_deliberation", "Resultats_Deliberation.pdf"),
+    "pv": ("construire_pv_deliberation", "PV_Deliberation.pdf"),
+}
+
+
+def afficher_progression(fait, total):
+    """Progression d'un import sur la sortie d'erreur, réécrite sur la même ligne."""
+    suffixe = f"/{total}" if total else ""
+    print(f"\r{fait}{suffixe} lignes importées", end="", file=sys.stderr, flush=True)
+
+
+def commande_import(conn, args):
+    # pandas n'est chargé que par les commandes qui en ont besoin
+    from models.import_pipeline import import_en_flux_conseille, importer_en_flux, importer_fichier_excel
+
+    if args.flux or import_en_flux_conseille(conn, args.fichier):
+        rapport = importer_en_flux(conn, args.fichier, taille_lot=args.lot,
+                                   reprendre=not args.recommencer, progression=afficher_progression)
+        print(file=sys.stderr)
+    else:
+        rapport = importer_fichier_excel(conn, args.fichier)
+    print(f"{rapport.nb_candidats} candidats, {rapport.nb_lignes} lignes en {rapport.duree:.2f} s "
+          f"({rapport.lignes_par_seconde:,.0f} lignes/s)")
+
+
+def commande_anonymats(conn, args):
+    from models.anonymats import attribuer_anonymats_manquants
+
+    print(f"{attribuer_anonymats_manquants(conn)} anonymat(s) attribué(s)")
+
+
+def commande_deliberer(conn, args):
+    from models.deliberation_engine import rafraichir_resultats
+
+    debut = time.perf_counter()
+    nb_recalcules = rafraichir_resultats(conn)
+    print(f"{nb_recalcules} candidat(s) recalculé(s) en {time.perf_counter() - debut:.2f} s")
+
+
+def commande_finaliser(conn, args):
+    from models.deliberation_engine import finaliser_resultats
+
+    debut = time.perf_counter()
+    nb_enregistres = finaliser_resultats(conn)
+    print(f"{nb_enregistres} candidat(s) enregistré(s) en {time.perf_counter() - debut:.2f} s")
+
+
+def commande_statistiques(conn, args):
+    from models.statistiques import STATUTS, calculer_statistiques, lire_compteurs, statistiques_resultats
+
+    # Sans --detail, les compteurs suffisent : pas de parcours de la cohorte
+    statistiques = calculer_statistiques(conn) if args.detail else lire_compteurs(conn)
+    if args.json:
+        donnees = statistiques.en_dict() if args.detail else statistiques_resultats(conn, statistiques)
+        print(json.dumps(donnees, ensure_ascii=False, indent=2))
+        return
+    stats = statistiques_resultats(conn, statistiques)
+    print(f"Total Candidats : {stats.pop('Total Candidats')}")
+    for statut, donnees in stats.items():
+        print(f"{statut:>10} : {donnees['nombre']:>6} ({donnees['pourcentage']}%)")
+    if not args.detail:
+        return
+
+    print(f"\n{'Matière':<22}{'Notes':>7}{'Moy.':>7}{'Éc.-t.':>7}{'P10':>7}{'Méd.':>7}{'P90':>7}")
+    for matiere, m in statistiques.matieres.items():
+        valeurs = [("-" if m[cle] is None else f"{m[cle]:.2f}") for cle in ("moyenne", "ecart_type", "p10", "mediane", "p90")]
+        print(f"{matiere:<22}{m['effectif']:>7}" + "".join(f"{v:>7}" for v in valeurs))
+    for dimension, repartition in statistiques.repartitions.items():
+        print(f"\n{dimension:<22}{'Total':>7}" + "".join(f"{statut:>10}" for statut in STATUTS) + f"{'% admis':>9}")
+        for valeur, groupe in repartition.items():
+            print(f"{valeur[:21]:<22}{groupe['total']:>7}" + "".join(f"{groupe[statut]:>10}" for statut in STATUTS)
+                  + f"{groupe['taux_admis']:>9}")
+
+
+def commande_pdf(conn, args):
+    import models.rapports_pdf as rapports_pdf
+
+    constructeur, fichier_par_defaut = DOCUMENTS_PDF[args.document]
+    rapport = rapports_pdf.enregistrer_pdf(conn, getattr(rapports_pdf, constructeur), args.sortie or fichier_par_defaut,
+                                           cache=not args.sans_cache)
+    if rapport.depuis_cache:
+        print(f"Document enregistré : {rapport.chemin} (données inchangées, repris du cache)")
+    else:
+        print(f"Document enregistré : {rapport.chemin} ({rapport.nb_lignes} lignes, {rapport.nb_pages} pages "
+              f"en {rapport.duree:.2f} s, {rapport.lignes_par_seconde:,.0f} lignes/s)")
+
+
+def commande_releves(conn, args):
+    from models.releves import generer_releves_fichiers, generer_releves_fusionnes, lire_releves
+
+    def progression(fait, total):
+        print(f"\r{fait}/{total} relevés", end="", file=sys.stderr, flush=True)
+
+    releves = lire_releves(conn, args.tour, args.etablissement)
+    if args.fusionner:
+        rapport = generer_releves_fusionnes(releves, args.tour, args.fusionner, progression)
+    else:
+        rapport = generer_releves_fichiers(releves, args.tour, args.sortie, args.processus, progression)
+    print(file=sys.stderr)
+    print(f"{rapport.nb_releves} relevé(s), {rapport.nb_pages} pages en {rapport.duree:.2f} s "
+          f"({rapport.pages_par_seconde:,.0f} pages/s) dans {rapport.destination}")
+
+
+def commande_consolider(args):
+    from models.consolidation import consolider
+
+    def progression(fait, total, bilan):
+        etat = f"erreur : {bilan.erreur}" if bilan.erreur else f"{bilan.nb_deliberes} délibérés"
+        print(f"[{fait}/{total}] {bilan.centre} ({etat})", file=sys.stderr)
+
+    rapport = consolider(args.dossier, args.synthese, args.processus, progression)
+    print(f"{rapport.nb_centres} centre(s), {rapport.nb_candidats} candidats consolidés en "
+          f"{rapport.duree:.2f} s dans {args.synthese}"
+          + (f" ({rapport.nb_erreurs} centre(s) en erreur)" if rapport.nb_erreurs else ""))
+    return 1 if rapport.nb_erreurs else 0
+
+
+def construire_parser():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base", default=DB_NAME, help=f"base SQLite du centre (défaut : {DB_NAME})")
+    commandes = parser.add_subparsers(dest="commande", required=True)
+
+    importer = commandes.add_parser("import", help="importer les candidats d'un classeur BD_BFEM (xlsx ou csv)")
+    importer.add_argument("fichier")
+    importer.add_argument("--flux", action="store_true", help="importer lot par lot quelle que soit la taille")
+    importer.add_argument("--recommencer", action="store_true",
+                          help="ne pas reprendre un import en flux interrompu")
+    importer.add_argument("--lot", type=int, default=5000, help="lignes par lot en mode flux")
+    importer.set_defaults(executer=commande_import)
+
+    commandes.add_parser("anonymats", help="attribuer les anonymats manquants") \
+        .set_defaults(executer=commande_anonymats)
+    commandes.add_parser("deliberer", help="recalculer les résultats des candidats modifiés") \
+        .set_defaults(executer=commande_deliberer)
+    commandes.add_parser("finaliser", help="enregistrer la délibération") \
+        .set_defaults(executer=commande_finaliser)
+
+    statistiques = commandes.add_parser("statistiques", help="répartition des candidats par statut")
+    statistiques.add_argument("--json", action="store_true")
+    statistiques.add_argument("--detail", action="store_true",
+                              help="ajouter les notes par matière et les répartitions par sexe, type et établissement")
+    statistiques.set_defaults(executer=commande_statistiques)
+
+    pdf = commandes.add_parser("pdf", help="produire un document PDF")
+    pdf.add_argument("document", choices=sorted(DOCUMENTS_PDF))
+    pdf.add_argument("-o", "--sortie", help="fichier de sortie")
+    pdf.add_argument("--sans-cache", action="store_true", help="reconstruire même si les données n'ont pas changé")
+    pdf.set_defaults(executer=commande_pdf)
+
+    releves = commandes.add_parser("releves", help="produire les relevés de notes de tous les candidats")
+    releves.add_argument("--tour", type=int, choices=(1, 2), default=1)
+    releves.add_argument("--etablissement", help="limiter aux candidats d'un établissement")
+    releves.add_argument("-o", "--sortie", default="Releves", help="dossier des fichiers par candidat")
+    releves.add_argument("--fusionner", metavar="FICHIER", help="produire un seul PDF au lieu d'un fichier par candidat")
+    releves.add_argument("--processus", type=int, help="processus de rendu (défaut : un par cœur)")
+    releves.set_defaults(executer=commande_releves)
+
+    # Travaille sur un dossier de bases et non sur --base
+    consolider = commandes.add_parser("consolider",
+                                      help="délibérer en parallèle les bases de centre d'un dossier")
+    consolider.add_argument("dossier")
+    consolider.add_argument("--synthese", default="synthese_regionale.sqlite",
+                            help="base de synthèse régionale à créer ou compléter")
+    consolider.add_argument("--processus", type=int, help="processus de travail (défaut : un par cœur)")
+    consolider.set_defaults(executer=None)
+    return parser
+
+
+def main(argv=None):
+    args = construire_parser().parse_args(argv)
+    if args.commande == "consolider":
+        try:
+            return commande_consolider(args)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Erreur : {e}", file=sys.stderr)
+            return 1
+    if args.commande != "import" and not os.path.exists(args.base):
+        print(f"Erreur : la base {args.base} n'existe pas", file=sys.stderr)
+        return 1
+    try:
+        # Migrations et réparation du schéma, comme à l'ouverture de l'application
+        DatabaseManager(args.base)
+        args.executer(obtenir_connexion(args.base), args)
+    except (ValueError, OSError) as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 1
+    except sqlite3.Error as e:
+        print(f"Erreur de base de données : {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    # Nécessaire aux pools de processus de « consolider » et « releves » dans l'exécutable PyInstaller
+    multiprocessing.freeze_support()
+    sys.exit(main())
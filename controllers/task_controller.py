@@ -0,0 +1,141 @@
+import sqlite3
+import threading
+import traceback
+
+from PyQt5.QtCore import QObject, QRunnable, QThread, QThreadPool, pyqtSignal
+
+from models.database_manager import DB_NAME, obtenir_connexion
+
+
+class TacheAnnulee(Exception):
+    """Levée dans le thread de travail quand l'utilisateur annule la tâche."""
+
+
+class SignauxTache(QObject):
+    progression = pyqtSignal(int, int)  # (fait, total) ; total = 0 si inconnu
+    termine = pyqtSignal(object)        # Résultat de la fonction
+    erreur = pyqtSignal(object)         # Exception levée
+    annulee = pyqtSignal()
+    fin = pyqtSignal()                  # Émis dans tous les cas, en dernier
+
+
+class Tache(QRunnable):
+    """Opération longue exécutée hors du thread graphique.
+
+    La fonction est appelée sous la forme fonction(conn, tache, *args, **kwargs) avec la
+    connexion SQLite propre au thread de travail. Elle signale son avancement par
+    tache.progression(fait, total), qui lève TacheAnnulee si l'annulation a été demandée.
+    """
+
+    def __init__(self, fonction, *args, db_name=DB_NAME, **kwargs):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.fonction = fonction
+        self.args = args
+        self.kwargs = kwargs
+        self.db_name = db_name
+        self.signaux = SignauxTache()
+        self._annulation = threading.Event()
+        # Connexion du thread de travail, renseignée pendant l'exécution de la fonction seulement :
+        # hors de cet intervalle, elle peut servir à une autre tâche du même thread
+        self._conn = None
+        self._verrou = threading.Lock()
+
+    def annuler(self):
+        """Demande l'arrêt de la tâche ; une requête SQLite en cours de cette tâche est interrompue."""
+        with self._verrou:
+            self._annulation.set()
+            if self._conn is not None:
+                self._conn.interrupt()
+
+    @property
+    def annulation_demandee(self):
+        return self._annulation.is_set()
+
+    def verifier_annulation(self):
+        if self._annulation.is_set():
+            raise TacheAnnulee()
+
+    def progression(self, fait, total=0):
+        self.verifier_annulation()
+        self.signaux.progression.emit(int(fait), int(total or 0))
+
+    def run(self):
+        try:
+            conn = obtenir_connexion(self.db_name)
+            with self._verrou:
+                self._conn = conn
+            try:
+                resultat = self.fonction(conn, self, *self.args, **self.kwargs)
+            finally:
+                with self._verrou:
+                    self._conn = None
+            self.verifier_annulation()
+        except TacheAnnulee:
+            self.signaux.annulee.emit()
+        except sqlite3.OperationalError as e:
+            # conn.interrupt() se traduit par « interrupted » : la transaction est annulée
+            if self._annulation.is_set():
+                self.signaux.annulee.emit()
+            else:
+                traceback.print_exc()
+                self.signaux.erreur.emit(e)
+        except ValueError as e:
+            # Message destiné à l'utilisateur, affiché par le rappel d'erreur
+            self.signaux.erreur.emit(e)
+        except Exception as e:
+            traceback.print_exc()
+            self.signaux.erreur.emit(e)
+        else:
+            self.signaux.termine.emit(resultat)
+        finally:
+            self.signaux.fin.emit()
+
+
+class GestionnaireTaches(QObject):
+    """File d'exécution partagée par les écrans pour les opérations longues."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(2, QThread.idealThreadCount()))
+        # Threads conservés : chacun garde sa connexion SQLite au lieu d'en rouvrir une
+        self.pool.setExpiryTimeout(-1)
+        self._taches = set()
+
+    def soumettre(self, fonction, *args, progression=None, termine=None, erreur=None,
+                  annulee=None, **kwargs):
+        """Lance fonction(conn, tache, *args, **kwargs) en arrière-plan et retourne la Tache.
+
+        Les rappels sont appelés dans le thread graphique.
+        """
+        tache = Tache(fonction, *args, **kwargs)
+        for signal, rappel in ((tache.signaux.progression, progression),
+                               (tache.signaux.termine, termine),
+                               (tache.signaux.erreur, erreur),
+                               (tache.signaux.annulee, annulee)):
+            if rappel is not None:
+                signal.connect(rappel)
+        tache.signaux.fin.connect(lambda: self._taches.discard(tache))
+
+        self._taches.add(tache)
+        self.pool.start(tache)
+        return tache
+
+    def en_cours(self):
+        return bool(self._taches)
+
+    def annuler_tout(self):
+        for tache in list(self._taches):
+            tache.annuler()
+
+
+_gestionnaire = None
+
+
+def gestionnaire_taches():
+    """Retourne le gestionnaire de tâches de l'application (créé au premier appel)."""
+    global _gestionnaire
+    if _gestionnaire is None:
+        _gestionnaire = GestionnaireTaches()
+    return _gestionnaire
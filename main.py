@@ -1,9 +1,12 @@
+import multiprocessing
 import sys
 from PyQt5.QtWidgets import QApplication, QDialog
 from views.login_window import LoginWindow
-from views.main_menu import MainMenu
 
 if __name__ == "__main__":
+    # Nécessaire au pool de processus des relevés de notes dans l'exécutable PyInstaller
+    multiprocessing.freeze_support()
+
     # Créer une instance de l'application PyQt
     app = QApplication(sys.argv)
 
@@ -12,6 +15,9 @@ if __name__ == "__main__":
     if login_window.exec_() == QDialog.Accepted:
         role = login_window.role  # Récupérer le rôle après l'authentification
         if role:
+            # Le menu principal n'est chargé qu'après l'authentification
+            from views.main_menu import MainMenu
+
             # Ouvrir la fenêtre principale avec le rôle
             main_menu = MainMenu(role)
             main_menu.show()
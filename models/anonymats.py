@@ -0,0 +1,86 @@
+import json
+import os
+import secrets
+import sqlite3
+
+import numpy as np
+
+from models.instrumentation import CALCUL, chronometre
+
+CONFIG_FILE = "config.json"
+
+# Plage des numéros (bornes incluses), surchargeable par la clé "anonymats" de config.json :
+# {"anonymats": [1000, 999999]}. Un candidat garde le même anonymat au second tour : les notes
+# des deux tours sont rattachées au numéro de la table Anonymats.
+PLAGE_PAR_DEFAUT = (1000, 999999)
+
+
+def charger_plage(config_file=CONFIG_FILE):
+    """Retourne (premier, dernier), lue dans la section "anonymats" de config.json à défaut de la valeur par défaut."""
+    if os.path.exists(config_file):
+        try:
+            with open(config_file, encoding="utf-8") as fichier:
+                section = json.load(fichier).get("anonymats")
+            if section is not None:
+                premier, dernier = section
+                return int(premier), int(dernier)
+        except (OSError, ValueError, TypeError):
+            pass
+    return PLAGE_PAR_DEFAUT
+
+
+def generateur():
+    """Générateur numpy amorcé par le module secrets : les tirages ne sont pas reproductibles."""
+    return np.random.default_rng(secrets.randbits(128))
+
+
+def tirer_numeros(nb, premier, dernier, utilises=(), rng=None):
+    """Tire nb numéros distincts de [premier, dernier] hors des numéros utilisés.
+
+    Les rangs sont tirés sans remise parmi les numéros libres (O(nb)), puis convertis en
+    numéros en sautant les numéros utilisés (recherche dichotomique) : ni boucle de
+    nouvel essai, ni ensemble de toute la plage en mémoire.
+    """
+    utilises = np.unique(np.asarray(utilises, dtype=np.int64))
+    utilises = utilises[(utilises >= premier) & (utilises <= dernier)]
+    nb_libres = dernier - premier + 1 - len(utilises)
+    if nb > nb_libres:
+        raise ValueError(f"Plage d'anonymats {premier}-{dernier} insuffisante : {nb} numéros demandés, "
+                         f"{nb_libres} disponibles. Élargissez la plage dans config.json.")
+    rangs = (rng or generateur()).choice(nb_libres, size=nb, replace=False)
+    # Le rang r désigne le r-ième numéro libre : on le décale du nombre de numéros utilisés qui le précèdent
+    decalages = (utilises - premier) - np.arange(len(utilises))
+    return premier + rangs + np.searchsorted(decalages, rangs, side="right")
+
+
+def tirer_anonymats(cur, nb):
+    """Tire nb numéros d'anonymat libres dans la plage configurée ; retourne une liste d'entiers."""
+    premier, dernier = charger_plage()
+    cur.execute("SELECT numero_anonymat FROM Anonymats WHERE numero_anonymat BETWEEN ? AND ?",
+                (premier, dernier))
+    utilises = np.fromiter((numero for (numero,) in cur), dtype=np.int64)
+    return tirer_numeros(nb, premier, dernier, utilises).tolist()
+
+
+@chronometre(CALCUL)
+def attribuer_anonymats_manquants(conn: sqlite3.Connection):
+    """Attribue un numéro d'anonymat aux candidats qui n'en ont pas, en une transaction.
+
+    Le numéro est attribué au premier tour et sert aussi au second.
+    Retourne le nombre d'anonymats créés.
+    """
+    with conn:
+        cur = conn.cursor()
+        candidats = [id_candidat for (id_candidat,) in cur.execute("""
+            SELECT id_candidat FROM Candidats
+            WHERE id_candidat NOT IN (SELECT id_candidat FROM Anonymats)
+            ORDER BY numero_table
+        """)]
+        if not candidats:
+            return 0
+
+        cur.executemany("""
+            INSERT INTO Anonymats (id_candidat, numero_anonymat, tour)
+            VALUES (?, ?, 1)
+        """, zip(candidats, tirer_anonymats(cur, len(candidats))))
+    return len(candidats)
@@ -0,0 +1,26 @@
+# Barème officiel du BFEM (RM4-RM9), partagé par le calcul scalaire et le noyau NumPy
+
+COEFFICIENTS_TOUR1 = {
+    "compo_francais": 2, "dictee": 1, "etude_de_texte": 1,
+    "instruction_civique": 1, "histoire_geographie": 2,
+    "mathematiques": 4, "pc_lv2": 2, "svt": 2,
+    "anglais_ecrit": 2, "anglais_oral": 1
+}
+
+COEFFICIENTS_TOUR2 = {
+    "francais_2nd_tour": 2,
+    "mathematiques_2nd_tour": 4,
+    "pc_lv2_2nd_tour": 2
+}
+
+# Colonnes lues dans Notes_Tour1 : matières à coefficient puis EPS et épreuve facultative
+COLONNES_TOUR1 = list(COEFFICIENTS_TOUR1) + ["eps", "epreuve_facultative"]
+COLONNES_TOUR2 = list(COEFFICIENTS_TOUR2)
+
+# Seuils de points du 1er tour (bonus/malus inclus) et du 2nd tour
+SEUIL_ADMIS = 180
+SEUIL_SECOND_TOUR = 153
+SEUIL_REPECHAGE_SECOND_TOUR = 171
+SEUIL_REPECHAGE = 144
+SEUIL_ADMIS_TOUR2 = 60
+SEUIL_MOYENNE_CYCLE = 12
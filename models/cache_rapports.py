@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+from typing import Optional
+
+# Documents déjà produits, rangés à côté de la base dans ce dossier. Un document est
+# réutilisé tant que les tables dont il dépend n'ont pas changé : sa clé est l'empreinte
+# des versions de ces tables (Versions_Tables, tenue par déclencheurs).
+DOSSIER_CACHE = "cache_rapports"
+
+# À incrémenter quand la mise en page d'un document change : les anciens ne sont plus servis
+FORMAT_RAPPORTS = 1
+
+
+def chemin_base(conn: sqlite3.Connection):
+    """Chemin absolu du fichier de la base ; chaîne vide pour une base en mémoire."""
+    for _, nom, fichier in conn.execute("PRAGMA database_list"):
+        if nom == "main":
+            return fichier or ""
+    return ""
+
+
+def dossier_cache(conn: sqlite3.Connection):
+    """Dossier du cache de la base, ou None si la base n'a pas de fichier."""
+    base = chemin_base(conn)
+    return os.path.join(os.path.dirname(base), DOSSIER_CACHE) if base else None
+
+
+def versions_tables(conn: sqlite3.Connection, tables):
+    """{table: version} ; None si la base n'a pas encore de Versions_Tables."""
+    try:
+        versions = dict(conn.execute(
+            f"SELECT nom_table, version FROM Versions_Tables WHERE nom_table IN ({', '.join('?' * len(tables))})",
+            list(tables)))
+    except sqlite3.OperationalError:
+        return None
+    return versions if len(versions) == len(tables) else None
+
+
+def cle_document(conn: sqlite3.Connection, document, tables, *complements) -> Optional[str]:
+    """Empreinte des données d'un document : base, versions des tables et compléments (date...).
+
+    None si le document ne peut pas être mis en cache (base en mémoire, versions absentes).
+    """
+    base = chemin_base(conn)
+    versions = versions_tables(conn, tables)
+    if not base or versions is None:
+        return None
+    contenu = json.dumps([FORMAT_RAPPORTS, base, document, sorted(versions.items()), list(complements)],
+                         ensure_ascii=False)
+    return hashlib.sha256(contenu.encode("utf-8")).hexdigest()[:32]
+
+
+def _fichiers(dossier, document, cle):
+    prefixe = os.path.join(dossier, f"{document}-{cle}")
+    return prefixe + ".pdf", prefixe + ".json"
+
+
+def chercher(dossier, document, cle):
+    """(chemin du PDF en cache, informations enregistrées avec lui), ou None."""
+    pdf, infos = _fichiers(dossier, document, cle)
+    try:
+        with open(infos, encoding="utf-8") as fichier:
+            informations = json.load(fichier)
+    except (OSError, ValueError):
+        return None
+    return (pdf, informations) if os.path.exists(pdf) else None
+
+
+def conserver(dossier, document, cle, source, informations):
+    """Copie le PDF source dans le cache et retire les versions périmées du même document.
+
+    Le cache n'est qu'une accélération : une erreur d'écriture est ignorée.
+    """
+    pdf, infos = _fichiers(dossier, document, cle)
+    try:
+        os.makedirs(dossier, exist_ok=True)
+        for nom in os.listdir(dossier):
+            if nom.startswith(f"{document}-"):
+                os.remove(os.path.join(dossier, nom))
+        # Écriture sous un nom temporaire puis renommage : jamais de PDF partiel servi
+        shutil.copyfile(source, pdf + ".tmp")
+        os.replace(pdf + ".tmp", pdf)
+        with open(infos, "w", encoding="utf-8") as fichier:
+            json.dump(informations, fichier)
+    except OSError:
+        pass
+
+
+def vider(dossier):
+    """Supprime tous les documents en cache."""
+    if dossier and os.path.isdir(dossier):
+        shutil.rmtree(dossier, ignore_errors=True)
@@ -0,0 +1,201 @@
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from models.deliberation_engine import charger_resultats
+
+# Extensions reconnues comme bases de centre
+EXTENSIONS_BASES = (".sqlite", ".db")
+
+# Histogramme des points du 1er tour (bonus/malus inclus), par tranches de 20 points
+BORNES_HISTOGRAMME = list(range(0, 400, 20))
+
+STATUTS = ["Admis", "2nd Tour", "Repêchage", "Échec"]
+
+SCHEMA_SYNTHESE = [
+    """
+    CREATE TABLE IF NOT EXISTS Centres (
+        centre TEXT PRIMARY KEY,
+        fichier TEXT NOT NULL,
+        nb_candidats INTEGER NOT NULL DEFAULT 0,
+        nb_deliberes INTEGER NOT NULL DEFAULT 0,
+        moyenne_points REAL,
+        duree REAL,
+        erreur TEXT,
+        consolide_le TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Repartition_Statuts (
+        centre TEXT NOT NULL REFERENCES Centres(centre) ON DELETE CASCADE,
+        statut TEXT NOT NULL,
+        nombre INTEGER NOT NULL,
+        PRIMARY KEY (centre, statut)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Histogramme_Points (
+        centre TEXT NOT NULL REFERENCES Centres(centre) ON DELETE CASCADE,
+        borne_inf INTEGER NOT NULL,
+        borne_sup INTEGER,
+        nombre INTEGER NOT NULL,
+        PRIMARY KEY (centre, borne_inf)
+    )
+    """,
+    """
+    CREATE VIEW IF NOT EXISTS Synthese_Statuts AS
+    SELECT statut, SUM(nombre) AS nombre,
+           ROUND(SUM(nombre) * 100.0 / (SELECT SUM(nb_deliberes) FROM Centres), 2) AS pourcentage
+    FROM Repartition_Statuts
+    GROUP BY statut
+    """,
+    """
+    CREATE VIEW IF NOT EXISTS Synthese_Histogramme AS
+    SELECT borne_inf, borne_sup, SUM(nombre) AS nombre
+    FROM Histogramme_Points
+    GROUP BY borne_inf, borne_sup
+    """,
+]
+
+
+class BilanCentre(NamedTuple):
+    """Résumé de la délibération d'un centre, renvoyé par les processus de travail."""
+    centre: str
+    fichier: str
+    nb_candidats: int
+    nb_deliberes: int
+    statuts: Dict[str, int]
+    moyenne_points: Optional[float]
+    histogramme: List[int]  # Un effectif par tranche de BORNES_HISTOGRAMME
+    duree: float
+    erreur: Optional[str] = None
+
+
+class RapportConsolidation(NamedTuple):
+    """Bilan d'une consolidation régionale."""
+    nb_centres: int
+    nb_erreurs: int
+    nb_candidats: int
+    duree: float
+
+
+def lister_bases_centres(dossier, exclure=None):
+    """Bases de centre du dossier (sous-dossiers compris), triées par chemin."""
+    exclure = os.path.abspath(exclure) if exclure else None
+    return sorted(
+        str(chemin) for chemin in Path(dossier).rglob("*")
+        if chemin.suffix.lower() in EXTENSIONS_BASES and chemin.is_file()
+        and os.path.abspath(chemin) != exclure
+    )
+
+
+def _nom_centre(chemin, dossier):
+    """Identifiant du centre : chemin relatif sans extension (les bases peuvent porter le même nom)."""
+    return Path(os.path.relpath(chemin, dossier)).with_suffix("").as_posix()
+
+
+def traiter_centre(chemin, centre=None):
+    """Calcule la délibération d'une base de centre, ouverte en lecture seule.
+
+    Exécutée dans un processus de travail ; une erreur est rapportée dans le bilan
+    au lieu d'interrompre la consolidation.
+    """
+    debut = time.perf_counter()
+    centre = centre or Path(chemin).stem
+    try:
+        uri = f"{Path(os.path.abspath(chemin)).as_uri()}?mode=ro"
+        with closing(sqlite3.connect(uri, uri=True)) as conn:
+            nb_candidats = conn.execute("SELECT COUNT(*) FROM Candidats").fetchone()[0]
+            resultats = charger_resultats(conn)
+
+        points = np.array([r.points_tour1 for r in resultats], dtype=float)
+        statuts, effectifs = np.unique([r.statut for r in resultats], return_counts=True)
+        # Tranche de chaque candidat ; les totaux au-delà de la dernière borne vont dans la dernière
+        tranches = np.searchsorted(BORNES_HISTOGRAMME, points, side="right") - 1
+        histogramme = np.bincount(tranches.clip(0, len(BORNES_HISTOGRAMME) - 1),
+                                  minlength=len(BORNES_HISTOGRAMME))
+    except Exception as e:
+        # Base illisible ou données inattendues (note non numérique...) : seul ce centre est écarté
+        return BilanCentre(centre, chemin, 0, 0, {}, None, [0] * len(BORNES_HISTOGRAMME),
+                           time.perf_counter() - debut, f"{type(e).__name__}: {e}")
+
+    return BilanCentre(
+        centre, chemin, nb_candidats, len(resultats),
+        dict(zip(statuts.tolist(), effectifs.tolist())),
+        float(points.mean()) if len(points) else None,
+        histogramme.tolist(),
+        time.perf_counter() - debut
+    )
+
+
+def enregistrer_bilans(conn: sqlite3.Connection, bilans):
+    """Écrit (ou remplace) les bilans des centres dans la base de synthèse, en une transaction."""
+    consolide_le = datetime.now().isoformat(timespec="seconds")
+    with conn:
+        cur = conn.cursor()
+        for requete in SCHEMA_SYNTHESE:
+            cur.execute(requete)
+        centres = [(b.centre,) for b in bilans]
+        cur.executemany("DELETE FROM Repartition_Statuts WHERE centre = ?", centres)
+        cur.executemany("DELETE FROM Histogramme_Points WHERE centre = ?", centres)
+        cur.executemany("""
+            INSERT OR REPLACE INTO Centres
+                (centre, fichier, nb_candidats, nb_deliberes, moyenne_points, duree, erreur, consolide_le)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(b.centre, b.fichier, b.nb_candidats, b.nb_deliberes, b.moyenne_points,
+               b.duree, b.erreur, consolide_le) for b in bilans])
+        cur.executemany("""
+            INSERT INTO Repartition_Statuts (centre, statut, nombre) VALUES (?, ?, ?)
+        """, [(b.centre, statut, b.statuts.get(statut, 0)) for b in bilans if not b.erreur
+              for statut in STATUTS])
+        bornes = list(zip(BORNES_HISTOGRAMME, BORNES_HISTOGRAMME[1:] + [None]))
+        cur.executemany("""
+            INSERT INTO Histogramme_Points (centre, borne_inf, borne_sup, nombre) VALUES (?, ?, ?, ?)
+        """, [(b.centre, inf, sup, nombre) for b in bilans if not b.erreur
+              for (inf, sup), nombre in zip(bornes, b.histogramme)])
+
+
+def consolider(dossier, base_synthese, processus=None, progression=None) -> RapportConsolidation:
+    """Délibère toutes les bases de centre du dossier en parallèle et écrit la synthèse régionale.
+
+    Chaque base est traitée par un processus du pool (processus=None : un par cœur) ; seuls
+    les bilans, de quelques centaines d'octets, reviennent au processus principal.
+    progression(fait, total, bilan) est appelée à chaque centre terminé.
+    """
+    debut = time.perf_counter()
+    chemins = lister_bases_centres(dossier, exclure=base_synthese)
+    centres = [_nom_centre(chemin, dossier) for chemin in chemins]
+    processus = processus or os.cpu_count() or 1
+
+    if processus == 1:
+        bilans = _collecter(map(traiter_centre, chemins, centres), len(chemins), progression)
+    else:
+        with ProcessPoolExecutor(max_workers=processus) as executeur:
+            # Regroupement par paquets : limite les échanges entre processus pour des centaines de fichiers
+            paquet = max(1, len(chemins) // (processus * 4))
+            resultats = executeur.map(traiter_centre, chemins, centres, chunksize=paquet)
+            bilans = _collecter(resultats, len(chemins), progression)
+
+    with closing(sqlite3.connect(base_synthese)) as conn:
+        enregistrer_bilans(conn, bilans)
+
+    return RapportConsolidation(
+        len(bilans), sum(1 for b in bilans if b.erreur),
+        sum(b.nb_candidats for b in bilans), time.perf_counter() - debut
+    )
+
+
+def _collecter(resultats, total, progression):
+    bilans = []
+    for bilan in resultats:
+        bilans.append(bilan)
+        if progression:
+            progression(len(bilans), total, bilan)
+    return bilans
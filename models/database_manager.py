@@ -1,46 +1,128 @@
+import atexit
+import json
+import os
 import sqlite3
 import hashlib
+import threading
+
+from models.instrumentation import ConnexionInstrumentee, journal
+from models.migrations import appliquer_migrations
+from models.schema import reparer_schema
+
+DB_NAME = "bfem_db.sqlite"
+CONFIG_FILE = "config.json"
+
+# Réglages SQLite par défaut, surchargeables par la clé "sqlite" de config.json
+PRAGMAS_PAR_DEFAUT = {
+    "journal_mode": "WAL",      # Lecteurs et écrivain ne se bloquent plus entre fenêtres
+    "synchronous": "NORMAL",    # Suffisant en WAL, évite un fsync par transaction
+    "cache_size": -16000,       # Valeur négative = taille en Kio (16 Mo)
+    "mmap_size": 268435456,     # 256 Mo de lecture en mémoire projetée
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,       # En millisecondes
+    # Un INSERT OR REPLACE déclenche alors les déclencheurs DELETE de la ligne remplacée
+    # (compteurs, recherche, suivi) ; aucun déclencheur ne modifie sa propre table
+    "recursive_triggers": "ON"
+}
+
+# Nombre de requêtes préparées conservées par connexion
+TAILLE_CACHE_REQUETES = 256
+
+
+def charger_reglages_sqlite(config_file=CONFIG_FILE):
+    """Retourne les PRAGMAs à appliquer, fusionnés avec ceux de config.json."""
+    reglages = dict(PRAGMAS_PAR_DEFAUT)
+    if os.path.exists(config_file):
+        try:
+            with open(config_file, encoding="utf-8") as fichier:
+                reglages.update(json.load(fichier).get("sqlite", {}))
+        except (OSError, ValueError):
+            pass
+    return reglages
+
 
 class DatabaseManager:
-    def __init__(self, db_name):
+    """Fournisseur de connexions SQLite partagées à l'échelle du processus.
+
+    Chaque thread réutilise une connexion persistante par base ; les PRAGMAs
+    sont appliqués une seule fois, à l'ouverture.
+    """
+    _local = threading.local()
+    _connexions = []
+    _verrou = threading.Lock()
+    _bases_initialisees = set()
+    _reglages = None
+
+    def __init__(self, db_name=DB_NAME):
         self.db_name = db_name
-        self.initialize_db()
+        if db_name not in DatabaseManager._bases_initialisees:
+            self.initialize_db()
+            DatabaseManager._bases_initialisees.add(db_name)
+
+    @classmethod
+    def obtenir_connexion(cls, db_name=DB_NAME):
+        """Retourne la connexion du thread courant vers la base, en l'ouvrant au besoin."""
+        connexions = getattr(cls._local, "connexions", None)
+        if connexions is None:
+            connexions = cls._local.connexions = {}
+
+        connexion = connexions.get(db_name)
+        if connexion is None:
+            # Les mesures s'activent et se coupent sur les curseurs : la connexion reste la même
+            connexion = sqlite3.connect(db_name, cached_statements=TAILLE_CACHE_REQUETES,
+                                        factory=ConnexionInstrumentee)
+            cls._appliquer_reglages(connexion)
+            connexions[db_name] = connexion
+            with cls._verrou:
+                cls._connexions.append(connexion)
+        return connexion
+
+    @classmethod
+    def _appliquer_reglages(cls, connexion):
+        if cls._reglages is None:
+            cls._reglages = charger_reglages_sqlite()
+        for pragma, valeur in cls._reglages.items():
+            connexion.execute(f"PRAGMA {pragma} = {valeur}")
+
+    @classmethod
+    def fermer_connexions(cls):
+        """Ferme toutes les connexions ouvertes (appelé à la sortie du programme)."""
+        with cls._verrou:
+            for connexion in cls._connexions:
+                try:
+                    connexion.close()
+                except sqlite3.Error:
+                    pass
+            cls._connexions.clear()
+        cls._local = threading.local()
 
     def connect(self):
-        return sqlite3.connect(self.db_name)
+        return self.obtenir_connexion(self.db_name)
 
     def execute_query(self, query, params=()):
         with self.connect() as connection:
             cursor = connection.cursor()
             cursor.execute(query, params)
-            connection.commit()
             return cursor
 
     def fetch_all(self, query, params=()):
-        with self.connect() as connection:
-            cursor = connection.cursor()
-            cursor.execute(query, params)
-            return cursor.fetchall()
+        cursor = self.connect().cursor()
+        cursor.execute(query, params)
+        return cursor.fetchall()
 
     def fetch_one(self, query, params=()):
-        with self.connect() as connection:
-            cursor = connection.cursor()
-            cursor.execute(query, params)
-            return cursor.fetchone()
+        cursor = self.connect().cursor()
+        cursor.execute(query, params)
+        return cursor.fetchone()
 
     def initialize_db(self):
-        # Créer la table Utilisateurs si elle n'existe pas
-        with self.connect() as connection:
-            cursor = connection.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS Utilisateurs (
-                    id_utilisateur INTEGER PRIMARY KEY AUTOINCREMENT,
-                    nom_utilisateur TEXT UNIQUE NOT NULL,
-                    mot_de_passe TEXT NOT NULL,
-                    role TEXT CHECK (role IN ('Jury', 'Professeur')) NOT NULL
-                )
-            """)
-            connection.commit()
+        # Mettre le schéma à jour (tables, index) avant toute lecture
+        appliquer_migrations(self.connect())
+
+        # Reconstruire les tables créées avec une définition dégradée
+        for table, ecartees in reparer_schema(self.connect()).items():
+            journal.warning("Table %s reconstruite selon le schéma de référence (%d lignes écartées)",
+                            table, ecartees)
 
         # Vérifier si un utilisateur existe déjà
         cursor = self.execute_query("SELECT COUNT(*) FROM Utilisateurs")
@@ -51,9 +133,17 @@ class DatabaseManager:
                 "INSERT INTO Utilisateurs (nom_utilisateur, mot_de_passe, role) VALUES (?, ?, ?)",
                 ("admin", hashed_password, "Jury")
             )
-            print("Utilisateur administrateur ajouté : admin / admin123")
+            journal.warning("Utilisateur administrateur ajouté : admin / admin123 (mot de passe à changer)")
 
     @staticmethod
     def hash_password(password):
         """Hache un mot de passe avec SHA-256."""
-        return hashlib.sha256(password.encode()).hexdigest()
\ No newline at end of file
+        return hashlib.sha256(password.encode()).hexdigest()
+
+
+def obtenir_connexion(db_name=DB_NAME):
+    """Raccourci utilisé par les vues pour obtenir la connexion partagée."""
+    return DatabaseManager.obtenir_connexion(db_name)
+
+
+atexit.register(DatabaseManager.fermer_connexions)
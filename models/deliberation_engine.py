@@ -0,0 +1,310 @@
+import sqlite3
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+from models.bareme import (
+    COEFFICIENTS_TOUR1, COEFFICIENTS_TOUR2, COLONNES_TOUR1, COLONNES_TOUR2, SEUIL_ADMIS, SEUIL_ADMIS_TOUR2,
+    SEUIL_MOYENNE_CYCLE, SEUIL_REPECHAGE, SEUIL_REPECHAGE_SECOND_TOUR, SEUIL_SECOND_TOUR
+)
+from models.instrumentation import CALCUL, chronometre
+from models.recherche import condition_recherche
+from models.scoring_kernel import calculer_cohorte, tableau_notes
+
+
+class ResultatCandidat(NamedTuple):
+    """Résultat de délibération d'un candidat, prêt à être affiché."""
+    id_candidat: int
+    numero_table: int
+    nom_complet: str
+    points_tour1: float  # Total du 1er tour, bonus/malus inclus
+    points_tour2: Optional[float]
+    moyenne_cycle: float
+    bonus_malus: float
+    statut: str
+
+
+def determiner_statut(points_tour1, points_tour2, moyenne_cycle):
+    """Détermine le statut d'un candidat selon les règles RM4-RM9."""
+    if points_tour2 is not None:
+        if points_tour2 >= SEUIL_ADMIS_TOUR2:
+            return "Admis"
+        return "Échec"
+
+    if points_tour1 >= SEUIL_ADMIS:
+        return "Admis"
+    elif SEUIL_SECOND_TOUR <= points_tour1 < SEUIL_REPECHAGE_SECOND_TOUR:
+        return "2nd Tour"
+    elif SEUIL_REPECHAGE_SECOND_TOUR <= points_tour1 < SEUIL_ADMIS:
+        return "Repêchage"
+    elif SEUIL_REPECHAGE <= points_tour1 < SEUIL_SECOND_TOUR:
+        return "Repêchage"
+    elif moyenne_cycle >= SEUIL_MOYENNE_CYCLE:
+        return "Repêchage"
+    else:
+        return "Échec"
+
+
+def calculer_resultat(notes_tour1, notes_tour2, moyenne_cycle):
+    """Calcule les points, le bonus/malus et le statut à partir des notes déjà lues.
+
+    Retourne (total_points, points_tour2, moyenne_cycle, bonus_malus, statut).
+    """
+    points_tour1 = sum(notes_tour1[i] * coef
+                       for i, coef in enumerate(COEFFICIENTS_TOUR1.values())
+                       if notes_tour1[i] is not None)
+
+    bonus_malus = 0
+
+    # EPS : bonus au-delà de 10, malus en dessous
+    if notes_tour1[10] is not None:
+        if notes_tour1[10] > 10:
+            bonus_malus += (notes_tour1[10] - 10)
+        else:
+            bonus_malus -= (10 - notes_tour1[10])
+
+    # Épreuve facultative : uniquement des points au-delà de 10
+    if notes_tour1[11] is not None and notes_tour1[11] > 10:
+        bonus_malus += (notes_tour1[11] - 10)
+
+    points_tour2 = None
+    if notes_tour2:
+        points_tour2 = sum(notes_tour2[i] * coef
+                           for i, coef in enumerate(COEFFICIENTS_TOUR2.values())
+                           if notes_tour2[i] is not None)
+
+    total_points = points_tour1 + bonus_malus
+    statut = determiner_statut(total_points, points_tour2, moyenne_cycle)
+
+    return total_points, points_tour2, moyenne_cycle, bonus_malus, statut
+
+
+def charger_resultat_candidat(cur, id_candidat):
+    """Calcule le résultat d'un seul candidat (trois lectures ciblées)."""
+    cur.execute(f"""
+        SELECT {', '.join(COLONNES_TOUR1)}
+        FROM Notes_Tour1
+        WHERE id_candidat = ?
+    """, (id_candidat,))
+    notes_tour1 = cur.fetchone()
+
+    if not notes_tour1:
+        return None, None, None, 0, "Notes manquantes"
+
+    cur.execute(f"""
+        SELECT {', '.join(COLONNES_TOUR2)}
+        FROM Notes_Tour2
+        WHERE id_candidat = ?
+    """, (id_candidat,))
+    notes_tour2 = cur.fetchone()
+
+    cur.execute("""
+        SELECT moyenne_cycle
+        FROM Livret_Scolaire
+        WHERE id_candidat = ?
+    """, (id_candidat,))
+    moyenne_cycle = cur.fetchone()
+    moyenne_cycle = moyenne_cycle[0] if moyenne_cycle else 0
+
+    return calculer_resultat(notes_tour1, notes_tour2, moyenne_cycle)
+
+
+def _aligner(ids_candidats, lignes, nb_colonnes):
+    """Aligne des lignes (id_candidat, valeurs...) sur l'ordre des candidats.
+
+    Seule la première ligne d'un candidat est conservée, comme avec fetchone().
+    Retourne la matrice alignée (NaN si absente) et le masque de présence.
+    """
+    tableau = tableau_notes(lignes, nb_colonnes + 1)
+    ids, premieres = np.unique(tableau[:, 0], return_index=True)
+    valeurs = tableau[premieres, 1:]
+
+    positions = np.searchsorted(ids, ids_candidats).clip(max=max(len(ids) - 1, 0))
+    presence = (ids[positions] == ids_candidats) if len(ids) else np.zeros(len(ids_candidats), bool)
+
+    alignees = np.full((len(ids_candidats), nb_colonnes), np.nan)
+    alignees[presence] = valeurs[positions[presence]]
+    return alignees, presence
+
+
+@chronometre(CALCUL)
+def charger_resultats(conn: sqlite3.Connection, seulement_a_recalculer=False) -> List[ResultatCandidat]:
+    """Calcule la délibération de toute la cohorte en quelques lectures groupées.
+
+    Les candidats sans notes du 1er tour sont ignorés, comme dans l'écran de délibération.
+    Avec seulement_a_recalculer, seuls les candidats de Resultats_A_Recalculer sont lus.
+    """
+    filtre = ("WHERE id_candidat IN (SELECT id_candidat FROM Resultats_A_Recalculer)"
+              if seulement_a_recalculer else "")
+
+    cur = conn.cursor()
+    cur.execute(f"""
+        SELECT C.id_candidat, C.numero_table, C.nom || ' ' || C.prenom
+        FROM Candidats C
+        {filtre}
+        ORDER BY C.numero_table
+    """)
+    candidats = cur.fetchall()
+    ids_candidats = np.array([c[0] for c in candidats], dtype=float)
+
+    notes_tour1, presence_tour1 = _aligner(ids_candidats, cur.execute(f"""
+        SELECT id_candidat, {', '.join(COLONNES_TOUR1)}
+        FROM Notes_Tour1
+        {filtre}
+        ORDER BY rowid
+    """).fetchall(), len(COLONNES_TOUR1))
+    notes_tour2, presence_tour2 = _aligner(ids_candidats, cur.execute(f"""
+        SELECT id_candidat, {', '.join(COLONNES_TOUR2)}
+        FROM Notes_Tour2
+        {filtre}
+        ORDER BY rowid
+    """).fetchall(), len(COLONNES_TOUR2))
+    livrets, presence_livret = _aligner(ids_candidats, cur.execute(f"""
+        SELECT id_candidat, moyenne_cycle
+        FROM Livret_Scolaire
+        {filtre}
+        ORDER BY rowid
+    """).fetchall(), 1)
+    moyenne_cycle = np.where(presence_livret, livrets[:, 0], 0)
+
+    total_points, points_tour2, bonus_malus, statuts = calculer_cohorte(
+        notes_tour1, notes_tour2, presence_tour2, moyenne_cycle)
+
+    # Conversion en types Python pour l'affichage, NaN -> None
+    points_tour2 = [None if p != p else p for p in points_tour2.tolist()]
+    moyenne_cycle = [None if m != m else m for m in moyenne_cycle.tolist()]
+    colonnes = zip(candidats, total_points.tolist(), points_tour2, moyenne_cycle,
+                   bonus_malus.tolist(), statuts.tolist(), presence_tour1.tolist())
+
+    return [
+        ResultatCandidat(id_candidat, numero_table, nom_complet, total, tour2, moyenne, bonus, statut)
+        for (id_candidat, numero_table, nom_complet), total, tour2, moyenne, bonus, statut, present
+        in colonnes if present
+    ]
+
+
+@chronometre(CALCUL)
+def rafraichir_resultats(conn: sqlite3.Connection):
+    """Recalcule uniquement les candidats marqués par les déclencheurs.
+
+    Retourne le nombre de candidats recalculés.
+    """
+    with conn:
+        # Écriture réservée dès le début : aucune note ne peut arriver entre lecture et effacement
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        cur = conn.cursor()
+        nb_a_recalculer = cur.execute("SELECT COUNT(*) FROM Resultats_A_Recalculer").fetchone()[0]
+        if not nb_a_recalculer:
+            return 0
+
+        resultats = charger_resultats(conn, seulement_a_recalculer=True)
+        cur.execute("""
+            DELETE FROM Resultats_Deliberation
+            WHERE id_candidat IN (SELECT id_candidat FROM Resultats_A_Recalculer)
+        """)
+        cur.executemany("""
+            INSERT INTO Resultats_Deliberation (
+                id_candidat, numero_table, nom_complet, points_tour1, points_tour2,
+                moyenne_cycle, bonus_malus, statut
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, resultats)
+        cur.execute("DELETE FROM Resultats_A_Recalculer")
+    return nb_a_recalculer
+
+
+def _filtre_resultats(conn, statut=None, recherche=""):
+    """Clause WHERE (et paramètres) des résultats retenus par l'écran de délibération.
+
+    Une recherche numérique retient les numéros de table dont l'écriture commence par ces
+    chiffres, sous forme d'intervalles (12 -> 12, 120-129, 1200-1299...) pour rester sur
+    l'index ; une recherche textuelle passe par l'index plein texte des candidats (models.recherche).
+    """
+    conditions, parametres = [], []
+    if statut:
+        conditions.append("statut = ?")
+        parametres.append(statut)
+
+    recherche = recherche.strip()
+    if recherche.isdigit() and recherche.startswith("0") and recherche != "0":
+        # Aucun numéro ne s'écrit avec un zéro en tête : « 012 » ne désigne pas 12
+        conditions.append("0")
+    elif recherche.isdigit():
+        maximum = conn.execute("SELECT MAX(numero_table) FROM Resultats_Deliberation").fetchone()[0] or 0
+        debut, largeur, intervalles = int(recherche), 1, []
+        while debut <= maximum or not intervalles:
+            intervalles.append("(numero_table >= ? AND numero_table < ?)")
+            parametres += [debut, debut + largeur]
+            debut, largeur = debut * 10, largeur * 10
+            if debut == 0:
+                break  # « 0 » ne désigne que le numéro 0
+        conditions.append(f"({' OR '.join(intervalles)})")
+    elif recherche:
+        condition, parametres_recherche = condition_recherche(conn, recherche)
+        if condition:
+            conditions.append(condition)
+            parametres += parametres_recherche
+
+    return (f"WHERE {' AND '.join(conditions)}" if conditions else ""), parametres
+
+
+def compter_resultats(conn: sqlite3.Connection, statut=None, recherche=""):
+    """Nombre de résultats retenus par le statut et la recherche."""
+    filtre, parametres = _filtre_resultats(conn, statut, recherche)
+    return conn.execute(f"SELECT COUNT(*) FROM Resultats_Deliberation {filtre}", parametres).fetchone()[0]
+
+
+def page_resultats(conn: sqlite3.Connection, statut=None, recherche="", limite=100,
+                   decalage=0) -> List[ResultatCandidat]:
+    """Une page de résultats matérialisés, par numéro de table ; seule la page est lue."""
+    filtre, parametres = _filtre_resultats(conn, statut, recherche)
+    cur = conn.execute(f"""
+        SELECT id_candidat, numero_table, nom_complet, points_tour1, points_tour2,
+               moyenne_cycle, bonus_malus, statut
+        FROM Resultats_Deliberation
+        {filtre}
+        ORDER BY numero_table
+        LIMIT ? OFFSET ?
+    """, parametres + [limite, decalage])
+    return [ResultatCandidat(*ligne) for ligne in cur.fetchall()]
+
+
+def lire_resultats(conn: sqlite3.Connection) -> List[ResultatCandidat]:
+    """Met à jour puis lit les résultats matérialisés, par numéro de table."""
+    rafraichir_resultats(conn)
+    cur = conn.execute("""
+        SELECT id_candidat, numero_table, nom_complet, points_tour1, points_tour2,
+               moyenne_cycle, bonus_malus, statut
+        FROM Resultats_Deliberation
+        ORDER BY numero_table
+    """)
+    return [ResultatCandidat(*ligne) for ligne in cur.fetchall()]
+
+
+@chronometre(CALCUL)
+def finaliser_resultats(conn: sqlite3.Connection):
+    """Enregistre les résultats à jour dans Deliberation, en une seule instruction.
+
+    L'UPSERT conserve la ligne existante de chaque candidat (pas de suppression/réinsertion
+    comme avec INSERT OR REPLACE). Les délibérations de candidats supprimés sont retirées.
+    Retourne le nombre de candidats enregistrés.
+    """
+    rafraichir_resultats(conn)
+    with conn:
+        conn.execute("DELETE FROM Deliberation WHERE id_candidat NOT IN (SELECT id_candidat FROM Candidats)")
+        cur = conn.execute("""
+            INSERT INTO Deliberation (id_candidat, points_tour1, points_tour2, statut)
+            SELECT id_candidat, points_tour1, points_tour2, statut
+            FROM Resultats_Deliberation
+            WHERE true
+            ON CONFLICT (id_candidat) DO UPDATE SET
+                points_tour1 = excluded.points_tour1,
+                points_tour2 = excluded.points_tour2,
+                statut = excluded.statut
+        """)
+    return cur.rowcount
+
+
+def resultats_a_recalculer(conn: sqlite3.Connection):
+    """Vrai si des notes ont changé depuis le dernier rafraîchissement."""
+    return conn.execute("SELECT EXISTS (SELECT 1 FROM Resultats_A_Recalculer)").fetchone()[0] == 1
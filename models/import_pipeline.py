@@ -0,0 +1,311 @@
+import os
+import sqlite3
+import time
+from typing import NamedTuple, Tuple
+
+import numpy as np
+import pandas as pd
+
+from models.anonymats import tirer_anonymats
+from models.schema import compteurs_suspendus
+
+FEUILLE_CANDIDATS = "Feuille 1"
+
+# Correspondance colonnes Excel -> colonnes de la base
+COLONNES_CANDIDAT = {
+    "N° de table": "numero_table",
+    "Prenom (s)": "prenom",
+    "NOM": "nom",
+    "Date de nais.": "date_naissance",
+    "Lieu de nais.": "lieu_naissance",
+    "Sexe": "sexe",
+    "Type de candidat": "type_candidat",
+    "Etablissement": "etablissement",
+    "Nationnallité": "nationalite",
+    "choix_epr_facultative": "choix_epr_facultative",
+    "Epreuve Facultative": "epreuve_facultative",
+    "Etat Sportif": "aptitude_sportive",
+}
+
+COLONNES_MOYENNES = {
+    "Moy_6e": "moyenne_6e",
+    "Moy_5e": "moyenne_5e",
+    "Moy_4e": "moyenne_4e",
+    "Moy_3e": "moyenne_3e",
+}
+
+COLONNES_NOTES = {
+    "Note CF": "compo_francais",
+    "Note Ort": "dictee",
+    "Note TSQ": "etude_de_texte",
+    "Note IC": "instruction_civique",
+    "Note HG": "histoire_geographie",
+    "Note MATH": "mathematiques",
+    "Note PC/LV2": "pc_lv2",
+    "Note SVT": "svt",
+    "Note ANG1": "anglais_ecrit",
+    "Note ANG2": "anglais_oral",
+    "Note EPS": "eps",
+    "Note Ep Fac": "epreuve_facultative",
+}
+
+EPREUVES_FACULTATIVES = {
+    "COUT": "COUTURE",
+    "DESS": "DESSIN",
+    "MUSI": "MUSIQUE",
+}
+
+
+class RapportImport(NamedTuple):
+    """Bilan d'un import : volumes insérés et débit obtenu."""
+    nb_candidats: int
+    nb_lignes: int  # Toutes tables confondues
+    duree: float
+
+    @property
+    def lignes_par_seconde(self):
+        return self.nb_lignes / self.duree if self.duree else float("inf")
+
+
+def normaliser_epreuves_facultatives(serie):
+    """Ramène les libellés d'épreuve facultative aux valeurs autorisées par la base."""
+    valeurs = serie.fillna("").astype(str).str.upper().str.strip()
+    conditions = [valeurs.str.startswith(prefixe) for prefixe in EPREUVES_FACULTATIVES]
+    return pd.Series(
+        np.select(conditions, list(EPREUVES_FACULTATIVES.values()), default="Neutre"),
+        index=serie.index
+    )
+
+
+def _vers_lignes(frame):
+    """Convertit un DataFrame en tuples Python natifs, NaN -> None, pour executemany."""
+    frame = frame.astype(object).where(pd.notna(frame), None)
+    return list(frame.itertuples(index=False, name=None))
+
+
+def preparer_donnees(df):
+    """Applique en bloc les conversions de la feuille Excel.
+
+    Retourne (candidats, livrets, notes) sous forme de DataFrames indexés comme df.
+    """
+    df = df.copy()
+    if "choix_epr_facultative" not in df:
+        df["choix_epr_facultative"] = False
+    df["Date de nais."] = pd.to_datetime(df["Date de nais."]).dt.strftime("%Y-%m-%d")
+    df["Epreuve Facultative"] = normaliser_epreuves_facultatives(df["Epreuve Facultative"])
+
+    candidats = df[list(COLONNES_CANDIDAT)].rename(columns=COLONNES_CANDIDAT)
+    # Numéros saisis comme texte dans le classeur (" 012") : SQLite les stocke en entiers, la
+    # correspondance numero_table -> id_candidat doit les lire de même
+    numeros = pd.to_numeric(candidats["numero_table"], errors="coerce")
+    candidats["numero_table"] = numeros.where(numeros.notna(), candidats["numero_table"])
+
+    # Moyenne du cycle : somme des moyennes / nombre de moyennes renseignées (> 0)
+    moyennes = df[list(COLONNES_MOYENNES)].astype(float)
+    remplies = moyennes.fillna(0)
+    nb_positives = (remplies > 0).sum(axis=1)
+    livrets = moyennes.rename(columns=COLONNES_MOYENNES)
+    livrets.insert(0, "nombre_de_fois", df["Nb fois"])
+    livrets["moyenne_cycle"] = np.where(
+        nb_positives > 0, remplies.sum(axis=1) / nb_positives.where(nb_positives > 0, 1), 0
+    )
+
+    notes = df[list(COLONNES_NOTES)].astype(float).rename(columns=COLONNES_NOTES)
+    return candidats, livrets, notes
+
+
+def _inserer_lot(cur, df):
+    """Insère un lot de lignes Excel (candidats, anonymats, livrets, notes).
+
+    Retourne (nb_candidats, nb_lignes) insérés.
+    """
+    candidats, livrets, notes = preparer_donnees(df)
+
+    # Les identifiants AUTOINCREMENT du lot sont strictement supérieurs à ce maximum
+    dernier_id = cur.execute("SELECT COALESCE(MAX(id_candidat), 0) FROM Candidats").fetchone()[0]
+    cur.executemany(f"""
+        INSERT INTO Candidats ({', '.join(candidats.columns)})
+        VALUES ({', '.join('?' * len(candidats.columns))})
+    """, _vers_lignes(candidats))
+
+    # Correspondance numero_table -> id_candidat en mémoire
+    ids = dict(cur.execute(
+        "SELECT numero_table, id_candidat FROM Candidats WHERE id_candidat > ?", (dernier_id,)))
+    id_candidats = candidats["numero_table"].map(ids)
+
+    # Anonymats attribués dans l'ordre des numéros de table
+    ordre = candidats.sort_values("numero_table").index
+    anonymats = pd.Series(tirer_anonymats(cur, len(ordre)), index=ordre)
+    id_candidats = id_candidats.loc[ordre].astype(int)
+
+    cur.executemany("""
+        INSERT INTO Anonymats (id_candidat, numero_anonymat, tour)
+        VALUES (?, ?, 1)
+    """, zip(id_candidats.tolist(), anonymats.tolist()))
+
+    livrets = livrets.loc[ordre]
+    livrets.insert(0, "id_candidat", id_candidats)
+    cur.executemany(f"""
+        INSERT INTO Livret_Scolaire ({', '.join(livrets.columns)})
+        VALUES ({', '.join('?' * len(livrets.columns))})
+    """, _vers_lignes(livrets))
+
+    notes = notes.loc[ordre]
+    notes.insert(0, "anonymat", anonymats)
+    notes.insert(0, "id_candidat", id_candidats)
+    cur.executemany(f"""
+        INSERT INTO Notes_Tour1 ({', '.join(notes.columns)})
+        VALUES ({', '.join('?' * len(notes.columns))})
+    """, _vers_lignes(notes))
+
+    return len(candidats), 4 * len(candidats)
+
+
+def _vider_tables(cur):
+    """Nettoie les tables alimentées par l'import."""
+    cur.execute("DELETE FROM Notes_Tour1")
+    cur.execute("DELETE FROM Anonymats")
+    cur.execute("DELETE FROM Livret_Scolaire")
+    cur.execute("DELETE FROM Candidats")
+
+
+def importer_dataframe(conn: sqlite3.Connection, df) -> RapportImport:
+    """Remplace les candidats, anonymats, livrets et notes par le contenu de df.
+
+    Tout est chargé par executemany dans une seule transaction ; les compteurs du
+    tableau de bord sont recalculés une fois à la fin.
+    """
+    debut = time.perf_counter()
+    with conn:
+        cur = conn.cursor()
+        with compteurs_suspendus(cur):
+            _vider_tables(cur)
+            nb_candidats, nb_lignes = _inserer_lot(cur, df)
+    return RapportImport(nb_candidats, nb_lignes, time.perf_counter() - debut)
+
+
+def importer_fichier_excel(conn: sqlite3.Connection, chemin) -> RapportImport:
+    """Importe la feuille des candidats d'un classeur BD_BFEM."""
+    with pd.ExcelFile(chemin) as classeur:
+        if FEUILLE_CANDIDATS not in classeur.sheet_names:
+            raise ValueError(f"La feuille '{FEUILLE_CANDIDATS}' est introuvable dans le fichier Excel.")
+        df = classeur.parse(FEUILLE_CANDIDATS)
+    return importer_dataframe(conn, df)
+
+
+# --- Import en flux pour les fichiers volumineux ---
+
+TAILLE_LOT = 5000
+
+# Au-delà de cette taille, le classeur est importé en flux, lot par lot
+SEUIL_IMPORT_EN_FLUX = 20 * 1024 * 1024
+
+
+def _empreinte(chemin):
+    """Identifie une version du fichier sans le relire (taille et date de modification)."""
+    infos = os.stat(chemin)
+    return f"{infos.st_size}:{infos.st_mtime_ns}"
+
+
+def import_interrompu(conn: sqlite3.Connection, chemin):
+    """Retourne le nombre de lignes déjà validées d'un import inachevé de ce fichier, sinon 0."""
+    ligne = conn.execute("""
+        SELECT lignes_importees FROM Import_Progression
+        WHERE fichier = ? AND empreinte = ? AND termine = 0
+    """, (os.path.abspath(chemin), _empreinte(chemin))).fetchone()
+    return ligne[0] if ligne else 0
+
+
+def import_en_flux_conseille(conn: sqlite3.Connection, chemin):
+    """Vrai si le fichier doit être importé en flux : CSV, classeur volumineux ou import à reprendre."""
+    return chemin.lower().endswith(".csv") or os.path.getsize(chemin) > SEUIL_IMPORT_EN_FLUX \
+        or bool(import_interrompu(conn, chemin))
+
+
+def lire_par_lots(chemin, taille_lot=TAILLE_LOT, debut=0):
+    """Lit la feuille des candidats (xlsx ou csv) par DataFrames de taille_lot lignes.
+
+    Seul le lot courant est en mémoire. Les lignes vides sont ignorées et les `debut`
+    premières lignes non vides sautées : debut se compte comme lignes_importees.
+    Produit des couples (lot, nombre total de lignes estimé ou None).
+    """
+    if chemin.lower().endswith(".csv"):
+        a_sauter = debut
+        for lot in pd.read_csv(chemin, chunksize=taille_lot):
+            lot = lot.dropna(how="all")
+            if a_sauter:
+                sautees = min(a_sauter, len(lot))
+                lot, a_sauter = lot.iloc[sautees:], a_sauter - sautees
+            if len(lot):
+                yield lot, None
+        return
+
+    from openpyxl import load_workbook
+
+    classeur = load_workbook(chemin, read_only=True, data_only=True)
+    try:
+        if FEUILLE_CANDIDATS not in classeur.sheetnames:
+            raise ValueError(f"La feuille '{FEUILLE_CANDIDATS}' est introuvable dans le fichier Excel.")
+        feuille = classeur[FEUILLE_CANDIDATS]
+        total = feuille.max_row - 1 if feuille.max_row else None
+
+        lignes = feuille.iter_rows(values_only=True)
+        entetes = next(lignes)
+        lot, a_sauter = [], debut
+        for ligne in lignes:
+            if not any(valeur is not None for valeur in ligne):
+                continue
+            if a_sauter:
+                a_sauter -= 1
+                continue
+            lot.append(ligne)
+            if len(lot) == taille_lot:
+                yield pd.DataFrame(lot, columns=entetes), total
+                lot = []
+        if lot:
+            yield pd.DataFrame(lot, columns=entetes), total
+    finally:
+        classeur.close()
+
+
+def importer_en_flux(conn: sqlite3.Connection, chemin, taille_lot=TAILLE_LOT,
+                     reprendre=True, progression=None) -> RapportImport:
+    """Importe un fichier de candidats lot par lot, avec validation après chaque lot.
+
+    La progression est enregistrée dans la même transaction que le lot : après un
+    arrêt brutal, un nouvel appel avec reprendre=True repart du dernier lot validé.
+    progression(lignes_importees, total) est appelée après chaque lot (total peut être None).
+    """
+    debut_import = time.perf_counter()
+    fichier, empreinte = os.path.abspath(chemin), _empreinte(chemin)
+    deja_importees = import_interrompu(conn, chemin) if reprendre else 0
+
+    if not deja_importees:
+        with conn:
+            cur = conn.cursor()
+            # Les lots suivants sont validés un par un : leurs compteurs restent tenus par déclencheurs
+            with compteurs_suspendus(cur):
+                _vider_tables(cur)
+            cur.execute("""
+                INSERT OR REPLACE INTO Import_Progression (fichier, empreinte, lignes_importees, termine)
+                VALUES (?, ?, 0, 0)
+            """, (fichier, empreinte))
+
+    lignes_importees, nb_candidats, nb_lignes = deja_importees, 0, 0
+    for lot, total in lire_par_lots(chemin, taille_lot, deja_importees):
+        with conn:
+            cur = conn.cursor()
+            candidats_lot, lignes_lot = _inserer_lot(cur, lot)
+            lignes_importees += len(lot)
+            cur.execute("""
+                UPDATE Import_Progression SET lignes_importees = ? WHERE fichier = ?
+            """, (lignes_importees, fichier))
+        nb_candidats += candidats_lot
+        nb_lignes += lignes_lot
+        if progression:
+            progression(lignes_importees, total)
+
+    with conn:
+        conn.execute("UPDATE Import_Progression SET termine = 1 WHERE fichier = ?", (fichier,))
+
+    return RapportImport(nb_candidats, nb_lignes, time.perf_counter() - debut_import)
@@ -0,0 +1,222 @@
+import functools
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import NamedTuple
+
+CONFIG_FILE = "config.json"
+VARIABLE_ENVIRONNEMENT = "BFEM_INSTRUMENTATION"
+
+# Réglages par défaut, surchargeables par la clé "instrumentation" de config.json
+REGLAGES_PAR_DEFAUT = {
+    "actif": False,
+    "journal": "bfem_performances.log",
+    "taille_max": 1024 * 1024,  # Octets par fichier de journal
+    "nb_archives": 3,           # Fichiers .1, .2, ... conservés par la rotation
+    "seuil_ms": 0,              # Seules les opérations plus longues sont journalisées
+}
+
+# Catégories utilisées pour attribuer la lenteur signalée par un centre
+REQUETE = "Requête"
+CALCUL = "Calcul"
+AFFICHAGE = "Affichage"
+RENDU = "Rendu PDF"
+
+journal = logging.getLogger("bfem.performances")
+journal.propagate = False
+
+_actif = False
+_seuil = 0.0
+_gestionnaire = None  # Journal tournant ; d'autres gestionnaires peuvent être attachés au journal
+_statistiques = {}
+_verrou = threading.Lock()
+_INACTIF = nullcontext()
+
+
+class Statistique(NamedTuple):
+    """Cumul des mesures d'une opération."""
+    categorie: str
+    operation: str
+    appels: int
+    total: float  # Secondes
+    maximum: float
+
+    @property
+    def moyenne(self):
+        return self.total / self.appels if self.appels else 0.0
+
+
+def charger_reglages(config_file=CONFIG_FILE):
+    """Retourne les réglages d'instrumentation, fusionnés avec ceux de config.json.
+
+    La variable d'environnement BFEM_INSTRUMENTATION=1 (ou 0) force l'activation.
+    """
+    reglages = dict(REGLAGES_PAR_DEFAUT)
+    if os.path.exists(config_file):
+        try:
+            with open(config_file, encoding="utf-8") as fichier:
+                reglages.update(json.load(fichier).get("instrumentation", {}))
+        except (OSError, ValueError):
+            pass
+    forcage = os.environ.get(VARIABLE_ENVIRONNEMENT)
+    if forcage is not None:
+        reglages["actif"] = forcage.strip().lower() not in ("", "0", "false", "non")
+    return reglages
+
+
+def activer(actif=True, reglages=None):
+    """Active ou désactive les mesures ; le journal tournant est ouvert à la première activation."""
+    global _actif, _seuil, _gestionnaire
+    reglages = reglages or charger_reglages()
+    if actif and _gestionnaire is None:
+        from logging.handlers import RotatingFileHandler
+
+        _gestionnaire = RotatingFileHandler(
+            reglages["journal"], maxBytes=reglages["taille_max"],
+            backupCount=reglages["nb_archives"], encoding="utf-8", delay=True
+        )
+        _gestionnaire.setFormatter(logging.Formatter("%(asctime)s\t%(threadName)s\t%(message)s"))
+        journal.addHandler(_gestionnaire)
+        journal.setLevel(logging.INFO)
+    _seuil = reglages["seuil_ms"] / 1000
+    _actif = actif
+
+
+def fermer_journal():
+    """Ferme le journal tournant ; la prochaine activation le rouvre avec ses réglages."""
+    global _gestionnaire
+    if _gestionnaire is not None:
+        journal.removeHandler(_gestionnaire)
+        _gestionnaire.close()
+        _gestionnaire = None
+
+
+def est_actif():
+    return _actif
+
+
+def enregistrer(categorie, operation, duree):
+    """Ajoute une mesure (en secondes) aux compteurs et au journal."""
+    cle = (categorie, operation)
+    with _verrou:
+        appels, total, maximum = _statistiques.get(cle, (0, 0.0, 0.0))
+        _statistiques[cle] = (appels + 1, total + duree, max(maximum, duree))
+    if duree >= _seuil:
+        journal.info("%s\t%s\t%.2f ms", categorie, operation, duree * 1000)
+
+
+@contextmanager
+def _chronometrer(categorie, operation):
+    debut = time.perf_counter()
+    try:
+        yield
+    finally:
+        enregistrer(categorie, operation, time.perf_counter() - debut)
+
+
+def mesurer(categorie, operation):
+    """Contexte qui chronomètre le bloc ; sans effet (contexte partagé) si l'instrumentation est inactive."""
+    return _chronometrer(categorie, operation) if _actif else _INACTIF
+
+
+def chronometre(categorie, operation=None):
+    """Décorateur : chronomètre chaque appel de la fonction sous le nom operation (par défaut son nom)."""
+    def decorateur(fonction):
+        nom = operation or fonction.__qualname__
+
+        @functools.wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            if not _actif:
+                return fonction(*args, **kwargs)
+            debut = time.perf_counter()
+            try:
+                return fonction(*args, **kwargs)
+            finally:
+                enregistrer(categorie, nom, time.perf_counter() - debut)
+        return enveloppe
+    return decorateur
+
+
+def resume():
+    """Retourne les statistiques, de la plus coûteuse à la moins coûteuse."""
+    with _verrou:
+        statistiques = [Statistique(categorie, operation, *valeurs)
+                        for (categorie, operation), valeurs in _statistiques.items()]
+    return sorted(statistiques, key=lambda s: s.total, reverse=True)
+
+
+def totaux_par_categorie():
+    """Retourne {catégorie: durée totale en secondes}."""
+    totaux = {}
+    for statistique in resume():
+        totaux[statistique.categorie] = totaux.get(statistique.categorie, 0.0) + statistique.total
+    return totaux
+
+
+def reinitialiser():
+    with _verrou:
+        _statistiques.clear()
+
+
+# --- Requêtes SQLite ---
+
+def libelle_requete(requete):
+    """Résumé d'une requête pour les compteurs : les espaces sont réduits, le texte tronqué."""
+    texte = " ".join(requete.split())
+    return texte if len(texte) <= 80 else texte[:77] + "..."
+
+
+class CurseurInstrumente(sqlite3.Cursor):
+    """Curseur qui chronomètre l'exécution et la lecture complète des résultats.
+
+    SQLite ne calcule une requête SELECT qu'au fil de la lecture : fetchall est
+    compté à part, sous le libellé de la requête suivi de « (lecture) ».
+    Inactive, l'instrumentation se réduit à un test par appel.
+    """
+    libelle = ""
+
+    def execute(self, requete, parametres=()):
+        if not _actif:
+            return super().execute(requete, parametres)
+        self.libelle = libelle_requete(requete)
+        with _chronometrer(REQUETE, self.libelle):
+            return super().execute(requete, parametres)
+
+    def executemany(self, requete, lignes):
+        if not _actif:
+            return super().executemany(requete, lignes)
+        self.libelle = libelle_requete(requete)
+        with _chronometrer(REQUETE, self.libelle):
+            return super().executemany(requete, lignes)
+
+    def fetchall(self):
+        if not _actif:
+            return super().fetchall()
+        with _chronometrer(REQUETE, f"{self.libelle} (lecture)"):
+            return super().fetchall()
+
+
+class ConnexionInstrumentee(sqlite3.Connection):
+    """Connexion dont les curseurs (y compris ceux de conn.execute) sont instrumentés.
+
+    Les mesures sont activées ou coupées au niveau des curseurs : les connexions déjà
+    ouvertes par les fenêtres suivent l'état courant, sans qu'il faille les remplacer.
+    """
+
+    def cursor(self, factory=CurseurInstrumente):
+        return super().cursor(factory)
+
+    def execute(self, requete, parametres=()):
+        return self.cursor().execute(requete, parametres)
+
+    def executemany(self, requete, lignes):
+        return self.cursor().executemany(requete, lignes)
+
+
+# Activation au chargement selon config.json / BFEM_INSTRUMENTATION
+if charger_reglages()["actif"]:
+    activer(True)
@@ -0,0 +1,258 @@
+import sqlite3
+from typing import Callable, List, NamedTuple
+
+from models.schema import (
+    DECLENCHEURS_COMPTEURS, TABLES_COMPTEURS, creer_declencheurs, creer_index, creer_recherche_plein_texte,
+    creer_tables, creer_versions_tables, declencheurs_suivi, marquer_tous_a_recalculer, recalculer_compteurs
+)
+
+
+class Migration(NamedTuple):
+    """Évolution du schéma, appliquée une seule fois par base."""
+    version: int
+    description: str
+    appliquer: Callable
+
+
+# Les migrations s'appuient sur les définitions de référence (models.schema) tant qu'elles
+# n'ont pas changé. Quand une définition évolue, la migration qui l'avait publiée en garde une
+# copie figée ici et la nouvelle définition passe par une nouvelle migration : une migration
+# déjà appliquée ailleurs ne change jamais. tests/test_migrations.py vérifie qu'une base migrée
+# correspond à la référence.
+
+def _schema_initial(cur):
+    """Tables de create_database, créées si elles n'existent pas encore."""
+    creer_tables(cur, ["Utilisateurs", "Parametres_Jury", "Candidats", "Anonymats",
+                       "Livret_Scolaire", "Notes_Tour1", "Notes_Tour2", "Deliberation"])
+
+
+def _index_requetes_frequentes(cur):
+    """Index des recherches par candidat, par statut et par anonymat.
+
+    Les clés de recherche protégées par UNIQUE dans create_database sont
+    recréées ici pour les bases dont les tables ont été créées sans contraintes.
+    """
+    creer_index(cur, "idx_candidats_numero_table", "Candidats", ["numero_table"])
+    creer_index(cur, "idx_anonymats_candidat", "Anonymats", ["id_candidat"])
+    creer_index(cur, "idx_anonymats_numero", "Anonymats", ["numero_anonymat"])
+    creer_index(cur, "idx_notes_tour1_candidat", "Notes_Tour1", ["id_candidat"])
+    creer_index(cur, "idx_notes_tour1_anonymat", "Notes_Tour1", ["anonymat"])
+    creer_index(cur, "idx_notes_tour2_candidat", "Notes_Tour2", ["id_candidat"])
+    creer_index(cur, "idx_notes_tour2_anonymat", "Notes_Tour2", ["anonymat"])
+    # Couvrant : la moyenne du cycle est lue sans accéder à la table
+    creer_index(cur, "idx_livret_candidat", "Livret_Scolaire", ["id_candidat", "moyenne_cycle"])
+    creer_index(cur, "idx_deliberation_statut", "Deliberation", ["statut", "id_candidat"])
+    creer_index(cur, "idx_parametres_jury_utilisateur", "Parametres_Jury", ["id_utilisateur"])
+    cur.execute("ANALYZE")
+
+
+def _suivi_des_imports(cur):
+    """Progression des imports en flux, pour reprendre un import interrompu."""
+    creer_tables(cur, ["Import_Progression"])
+
+
+def _resultats_materialises(cur):
+    """Table des résultats, suivi des candidats à recalculer et déclencheurs associés."""
+    creer_tables(cur, ["Resultats_Deliberation", "Resultats_A_Recalculer"])
+    creer_index(cur, "idx_resultats_numero_table", "Resultats_Deliberation", ["numero_table"])
+    # Marquage publié par cette migration, remplacé par la migration 7
+    for definition in declencheurs_suivi(
+            lambda ligne: f"INSERT OR IGNORE INTO Resultats_A_Recalculer VALUES ({ligne}.id_candidat);").values():
+        cur.execute(definition)
+    marquer_tous_a_recalculer(cur)
+
+
+def _index_recherche_resultats(cur):
+    """Index du filtrage et de la recherche paginés de l'écran de délibération."""
+    creer_index(cur, "idx_resultats_statut", "Resultats_Deliberation", ["statut", "numero_table"])
+    creer_index(cur, "idx_resultats_nom", "Resultats_Deliberation", ["nom_complet COLLATE NOCASE"])
+
+
+def _compteurs_deliberation_v9(ligne, signe):
+    """Corps publié par la migration 9 : une délibération sans statut n'était comptée dans aucun statut."""
+    return f"""UPDATE Compteurs_Statuts SET nombre = nombre {signe} 1 WHERE statut = {ligne}.statut;
+                UPDATE Compteurs_Etablissements SET
+                    deliberes = deliberes {signe} ({ligne}.statut IS NOT NULL),
+                    admis = admis {signe} ({ligne}.statut IS 'Admis')
+                WHERE etablissement = COALESCE((SELECT etablissement FROM Candidats WHERE id_candidat = {ligne}.id_candidat), '');"""
+
+
+# Déclencheurs des compteurs publiés par la migration 9 et remplacés depuis (migration 10)
+_DECLENCHEURS_COMPTEURS_V9 = {
+    "trg_deliberation_insert_compteurs": f'''
+            CREATE TRIGGER IF NOT EXISTS trg_deliberation_insert_compteurs
+            AFTER INSERT ON Deliberation
+            BEGIN
+                {_compteurs_deliberation_v9("NEW", "+")}
+            END
+        ''',
+    "trg_deliberation_delete_compteurs": f'''
+            CREATE TRIGGER IF NOT EXISTS trg_deliberation_delete_compteurs
+            AFTER DELETE ON Deliberation
+            BEGIN
+                {_compteurs_deliberation_v9("OLD", "-")}
+            END
+        ''',
+    "trg_deliberation_update_compteurs": f'''
+            CREATE TRIGGER IF NOT EXISTS trg_deliberation_update_compteurs
+            AFTER UPDATE OF statut, id_candidat ON Deliberation
+            WHEN OLD.statut IS NOT NEW.statut OR OLD.id_candidat IS NOT NEW.id_candidat
+            BEGIN
+                {_compteurs_deliberation_v9("OLD", "-")}
+                {_compteurs_deliberation_v9("NEW", "+")}
+            END
+        ''',
+    # AFTER DELETE : sous la cascade ON DELETE, les délibérations sont déjà effacées
+    "trg_candidats_delete_compteurs": '''
+            CREATE TRIGGER IF NOT EXISTS trg_candidats_delete_compteurs
+            AFTER DELETE ON Candidats
+            BEGIN
+                UPDATE Compteurs_Etablissements SET candidats = candidats - 1
+                WHERE etablissement = COALESCE(OLD.etablissement, '');
+                UPDATE Compteurs_Etablissements SET
+                    deliberes = deliberes - (SELECT COUNT(statut) FROM Deliberation WHERE id_candidat = OLD.id_candidat),
+                    admis = admis - (SELECT COUNT(*) FROM Deliberation WHERE id_candidat = OLD.id_candidat AND statut = 'Admis')
+                WHERE etablissement = COALESCE(OLD.etablissement, '');
+                UPDATE Compteurs_Etablissements SET
+                    deliberes = deliberes + (SELECT COUNT(statut) FROM Deliberation WHERE id_candidat = OLD.id_candidat),
+                    admis = admis + (SELECT COUNT(*) FROM Deliberation WHERE id_candidat = OLD.id_candidat AND statut = 'Admis')
+                WHERE etablissement = '';
+            END
+        ''',
+}
+
+
+def _compteurs(cur):
+    """Tables de compteurs du tableau de bord, leurs déclencheurs et leur alimentation."""
+    creer_tables(cur, TABLES_COMPTEURS)
+    for nom, definition in DECLENCHEURS_COMPTEURS.items():
+        cur.execute(_DECLENCHEURS_COMPTEURS_V9.get(nom, definition))
+    recalculer_compteurs(cur)
+
+
+def _compteurs_suppressions(cur):
+    """Compteurs justes sous la cascade ON DELETE des candidats et pour les délibérations sans statut.
+
+    Le déclencheur de suppression des candidats passe AVANT la suppression, et les délibérations
+    sans statut sont comptées sur la ligne '' de Compteurs_Statuts.
+    """
+    for nom in _DECLENCHEURS_COMPTEURS_V9:
+        cur.execute(f"DROP TRIGGER IF EXISTS {nom}")
+        cur.execute(DECLENCHEURS_COMPTEURS[nom])
+    recalculer_compteurs(cur)
+
+
+def _retrait_index_noms_resultats(cur):
+    """Retire l'index des noms de Resultats_Deliberation, que la recherche par FTS5 a rendu inutile.
+
+    Il coûtait une écriture de plus à chaque enregistrement de résultat.
+    """
+    cur.execute("DROP INDEX IF EXISTS idx_resultats_nom")
+
+
+# Liste ordonnée : ne jamais modifier une migration publiée, en ajouter une nouvelle
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Schéma initial", _schema_initial),
+    Migration(2, "Index des requêtes fréquentes", _index_requetes_frequentes),
+    Migration(3, "Suivi des imports en flux", _suivi_des_imports),
+    Migration(4, "Résultats de délibération incrémentaux", _resultats_materialises),
+    Migration(5, "Index de recherche des résultats", _index_recherche_resultats),
+    # Sans FTS5, la migration ne crée rien : la recherche se rabat sur LIKE
+    Migration(6, "Recherche plein texte des candidats", creer_recherche_plein_texte),
+    Migration(7, "Déclencheurs de suivi compatibles UPSERT", lambda cur: creer_declencheurs(cur, remplacer=True)),
+    Migration(8, "Versions des tables pour le cache des documents", creer_versions_tables),
+    Migration(9, "Compteurs du tableau de bord tenus par déclencheurs", _compteurs),
+    Migration(10, "Compteurs justes sous cascade et délibérations sans statut", _compteurs_suppressions),
+    Migration(11, "Retrait de l'index des noms de résultats", _retrait_index_noms_resultats),
+]
+
+
+def version_schema(conn: sqlite3.Connection):
+    """Retourne la version du schéma de la base (0 si aucune migration appliquée)."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            appliquee_le TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def appliquer_migrations(conn: sqlite3.Connection):
+    """Applique dans l'ordre les migrations manquantes, chacune dans sa transaction.
+
+    La transaction est ouverte explicitement : le module sqlite3 n'en ouvre pas avant
+    un CREATE, et une migration interrompue laisserait sinon un schéma à moitié créé.
+    Retourne la liste des versions appliquées.
+    """
+    with conn:
+        version_actuelle = version_schema(conn)
+
+    appliquees = []
+    for migration in MIGRATIONS:
+        if migration.version <= version_actuelle:
+            continue
+        cur = conn.cursor()
+        cur.execute("BEGIN")
+        try:
+            migration.appliquer(cur)
+            cur.execute("INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                        (migration.version, migration.description))
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+        appliquees.append(migration.version)
+    return appliquees
+
+
+# Requêtes chaudes des écrans, avec des paramètres représentatifs
+REQUETES_CRITIQUES = {
+    "Candidat par numéro de table": (
+        "SELECT id_candidat FROM Candidats WHERE numero_table = ?", (1,)),
+    "Notes du 1er tour d'un candidat": (
+        "SELECT * FROM Notes_Tour1 WHERE id_candidat = ?", (1,)),
+    "Notes du 2nd tour d'un candidat": (
+        "SELECT * FROM Notes_Tour2 WHERE id_candidat = ?", (1,)),
+    "Notes du 1er tour par anonymat": (
+        "SELECT * FROM Notes_Tour1 WHERE anonymat = ?", ("1000",)),
+    "Candidat par numéro d'anonymat": (
+        "SELECT id_candidat FROM Anonymats WHERE numero_anonymat = ?", (1000,)),
+    "Moyenne du cycle d'un candidat": (
+        "SELECT moyenne_cycle FROM Livret_Scolaire WHERE id_candidat = ?", (1,)),
+    "Candidats en repêchage": ("""
+        SELECT C.numero_table, L.moyenne_cycle, D.points_tour1
+        FROM Deliberation D
+        JOIN Candidats C ON D.id_candidat = C.id_candidat
+        LEFT JOIN Livret_Scolaire L ON D.id_candidat = L.id_candidat
+        WHERE D.statut = ?
+    """, ("Repêchage",)),
+    "Page de résultats par statut": ("""
+        SELECT * FROM Resultats_Deliberation WHERE statut = ?
+        ORDER BY numero_table LIMIT 100 OFFSET 0
+    """, ("Admis",)),
+    "Recherche plein texte des résultats": ("""
+        SELECT * FROM Resultats_Deliberation
+        WHERE id_candidat IN (SELECT rowid FROM Candidats_FTS WHERE Candidats_FTS MATCH ?)
+    """, ('"diop"*',)),
+    "Recherche de résultats par numéro de table": (
+        "SELECT * FROM Resultats_Deliberation WHERE (numero_table >= ? AND numero_table < ?) "
+        "OR (numero_table >= ? AND numero_table < ?)", (12, 13, 120, 130)),
+}
+
+
+def requetes_en_balayage_complet(conn: sqlite3.Connection, requetes=None):
+    """Vérifie par EXPLAIN QUERY PLAN que les requêtes critiques utilisent un index.
+
+    Retourne {libellé: étapes du plan en balayage complet} pour les requêtes en régression.
+    """
+    regressions = {}
+    for libelle, (requete, parametres) in (requetes or REQUETES_CRITIQUES).items():
+        plan = conn.execute(f"EXPLAIN QUERY PLAN {requete}", parametres).fetchall()
+        # Une table virtuelle (FTS5) est toujours « parcourue » : son propre index répond
+        balayages = [etape[3] for etape in plan
+                     if etape[3].startswith("SCAN") and "VIRTUAL TABLE" not in etape[3]]
+        if balayages:
+            regressions[libelle] = balayages
+    return regressions
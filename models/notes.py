@@ -0,0 +1,147 @@
+import sqlite3
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional
+
+from models.bareme import COLONNES_TOUR1, COLONNES_TOUR2
+from models.instrumentation import REQUETE, chronometre
+
+NOTE_MIN, NOTE_MAX = 0, 20
+
+# Matières saisies et table des notes de chaque tour
+MATIERES = {1: COLONNES_TOUR1, 2: COLONNES_TOUR2}
+TABLES_NOTES = {1: "Notes_Tour1", 2: "Notes_Tour2"}
+
+
+class LigneSaisie(NamedTuple):
+    """Copie anonyme à noter : seul l'anonymat est montré au correcteur."""
+    anonymat: str
+    id_candidat: int
+    aptitude_sportive: bool
+    choix_epr_facultative: bool
+    notes: Dict[str, Optional[float]]
+
+
+class NotesCandidat(NamedTuple):
+    """Ligne de l'écran de saisie des notes, avec des notes typées (None : non saisie)."""
+    id_candidat: int
+    numero_table: int
+    nom_complet: str
+    anonymat: Optional[int]
+    notes_tour1: tuple  # Matières à coefficient du 1er tour, dans l'ordre de COEFFICIENTS_TOUR1
+    notes_tour2: tuple
+    eps: Optional[float]
+    epreuve_facultative: Optional[float]
+
+
+def valider_note(texte) -> Optional[float]:
+    """Convertit une saisie en note (virgule acceptée) ; None pour une saisie vide.
+
+    Lève ValueError si la saisie n'est pas un nombre entre NOTE_MIN et NOTE_MAX.
+    """
+    texte = str(texte).strip().replace(",", ".")
+    if not texte:
+        return None
+    try:
+        note = float(texte)
+    except ValueError:
+        raise ValueError(f"« {texte} » n'est pas une note.")
+    if not NOTE_MIN <= note <= NOTE_MAX:
+        raise ValueError(f"La note doit être comprise entre {NOTE_MIN} et {NOTE_MAX}.")
+    return note
+
+
+def matiere_applicable(ligne: LigneSaisie, matiere):
+    """RM15 : pas d'EPS pour un candidat inapte, pas d'épreuve facultative si elle n'est pas choisie."""
+    if matiere == "eps":
+        return bool(ligne.aptitude_sportive)
+    if matiere == "epreuve_facultative":
+        return bool(ligne.choix_epr_facultative)
+    return True
+
+
+# Requête de l'écran de saisie : jointures directes sur l'index UNIQUE de anonymat
+_REQUETE_NOTES_CANDIDATS = f"""
+    SELECT C.id_candidat, C.numero_table, C.nom || ' ' || C.prenom, A.numero_anonymat,
+           {', '.join(f'N1.{m}' for m in COLONNES_TOUR1)},
+           {', '.join(f'N2.{m}' for m in COLONNES_TOUR2)}
+    FROM Candidats C
+    LEFT JOIN Anonymats A ON A.id_candidat = C.id_candidat
+    LEFT JOIN Notes_Tour1 N1 ON N1.anonymat = CAST(A.numero_anonymat AS TEXT)
+    LEFT JOIN Notes_Tour2 N2 ON N2.anonymat = CAST(A.numero_anonymat AS TEXT)
+"""
+
+# Variables par requête pour les rafraîchissements ciblés (limite SQLite historique : 999)
+TAILLE_PAQUET_IDS = 900
+
+
+def _notes_candidat(ligne):
+    nb1 = len(COLONNES_TOUR1) - 2  # Sans EPS ni épreuve facultative
+    notes_tour1 = ligne[4:4 + len(COLONNES_TOUR1)]
+    return NotesCandidat(*ligne[:4], tuple(notes_tour1[:nb1]), tuple(ligne[4 + len(COLONNES_TOUR1):]),
+                         notes_tour1[nb1], notes_tour1[nb1 + 1])
+
+
+@chronometre(REQUETE)
+def lire_notes_candidats(conn: sqlite3.Connection, ids=None) -> List[NotesCandidat]:
+    """Candidats et notes des deux tours ; ids limite la lecture à ces candidats (rafraîchissement ciblé)."""
+    if ids is None:
+        cur = conn.execute(f"{_REQUETE_NOTES_CANDIDATS} ORDER BY C.numero_table")
+        return [_notes_candidat(ligne) for ligne in cur.fetchall()]
+    ids = list(ids)
+    lignes = []
+    for debut in range(0, len(ids), TAILLE_PAQUET_IDS):
+        paquet = ids[debut:debut + TAILLE_PAQUET_IDS]
+        cur = conn.execute(f"{_REQUETE_NOTES_CANDIDATS} WHERE C.id_candidat IN ({', '.join('?' * len(paquet))})",
+                           paquet)
+        lignes += [_notes_candidat(ligne) for ligne in cur.fetchall()]
+    return lignes
+
+
+@chronometre(REQUETE)
+def lire_grille(conn: sqlite3.Connection, tour=1) -> List[LigneSaisie]:
+    """Copies du tour, par anonymat, avec les notes déjà saisies.
+
+    Au 2nd tour, seuls les candidats envoyés au second tour (ou déjà notés) sont retenus.
+    """
+    matieres = MATIERES[tour]
+    condition = "" if tour == 1 else """
+        WHERE C.id_candidat IN (
+            SELECT id_candidat FROM Deliberation WHERE statut = '2nd Tour'
+            UNION SELECT id_candidat FROM Resultats_Deliberation WHERE statut = '2nd Tour'
+            UNION SELECT id_candidat FROM Notes_Tour2
+        )
+    """
+    cur = conn.execute(f"""
+        SELECT CAST(A.numero_anonymat AS TEXT), C.id_candidat, C.aptitude_sportive,
+               C.choix_epr_facultative, {', '.join(f'N.{m}' for m in matieres)}
+        FROM Anonymats A
+        JOIN Candidats C ON C.id_candidat = A.id_candidat
+        LEFT JOIN {TABLES_NOTES[tour]} N ON N.anonymat = CAST(A.numero_anonymat AS TEXT)
+        {condition}
+        ORDER BY A.numero_anonymat
+    """)
+    return [LigneSaisie(*ligne[:4], dict(zip(matieres, ligne[4:]))) for ligne in cur.fetchall()]
+
+
+@chronometre(REQUETE)
+def enregistrer_notes(conn: sqlite3.Connection, tour, saisies):
+    """Écrit un lot de notes en une transaction, par UPSERT sur l'anonymat.
+
+    saisies : itérable de (anonymat, id_candidat, matiere, note). Les lignes de notes
+    absentes sont créées, les autres mises à jour colonne par colonne (les autres
+    matières de la copie sont conservées). Retourne le nombre de notes écrites.
+    """
+    table = TABLES_NOTES[tour]
+    par_matiere = defaultdict(list)
+    for anonymat, id_candidat, matiere, note in saisies:
+        if matiere not in MATIERES[tour]:
+            raise ValueError(f"Matière inconnue au tour {tour} : {matiere}")
+        par_matiere[matiere].append((str(anonymat), id_candidat, note))
+
+    with conn:
+        for matiere, lignes in par_matiere.items():
+            conn.executemany(f"""
+                INSERT INTO {table} (anonymat, id_candidat, {matiere}) VALUES (?, ?, ?)
+                ON CONFLICT (anonymat) DO UPDATE SET {matiere} = excluded.{matiere}
+            """, lignes)
+    return sum(len(lignes) for lignes in par_matiere.values())
@@ -0,0 +1,519 @@
+import os
+import shutil
+import sqlite3
+import time
+import zlib
+from datetime import datetime
+from typing import NamedTuple
+
+from fpdf import FPDF
+
+from models import cache_rapports
+from models.instrumentation import RENDU, chronometre
+from models.statistiques import lire_compteurs
+
+# Construction des documents PDF, indépendante de l'interface : chaque fonction lit la
+# base par la connexion reçue et retourne l'objet FPDF prêt à être enregistré.
+# ValueError signale un document impossible à produire (message destiné à l'utilisateur).
+#
+# Avec un fichier (enregistrer_pdf), le document y est écrit au fil des pages (DocumentPDF)
+# et les lignes sont lues par paquets : la mémoire reste constante quelle que soit la taille de la cohorte.
+
+# Lignes lues à chaque fetchmany
+TAILLE_LECTURE = 1000
+
+# Tables lues par chaque document : tant que leurs versions sont inchangées, le document
+# en cache est servi au lieu d'être reconstruit
+DEPENDANCES_DOCUMENTS = {
+    "construire_liste_candidats": ["Candidats"],
+    "construire_liste_anonymats": ["Candidats", "Anonymats"],
+    "construire_resultats_deliberation": ["Candidats", "Deliberation", "Livret_Scolaire"],
+    "construire_pv_deliberation": ["Utilisateurs", "Parametres_Jury", "Candidats", "Deliberation"],
+}
+# Documents datés du jour : la date entre dans leur clé de cache
+DOCUMENTS_DATES = {"construire_pv_deliberation"}
+
+
+class TamponPDF:
+    """Tampon de sortie de FPDF tenu en morceaux.
+
+    FPDF 1.7 écrit le document par « self.buffer += ... », ce qui recopie tout le tampon
+    à chaque objet : le coût devient quadratique sur les documents de milliers de pages.
+    Seules les opérations utilisées par FPDF (+=, len, encode) sont fournies.
+    """
+
+    def __init__(self):
+        self.morceaux = []
+        self.taille = 0
+
+    def __iadd__(self, texte):
+        self.morceaux.append(texte)
+        self.taille += len(texte)
+        return self
+
+    def __len__(self):
+        return self.taille
+
+    def __str__(self):
+        return "".join(self.morceaux)
+
+    def encode(self, *args):
+        return str(self).encode(*args)
+
+
+class TamponFichier:
+    """Tampon de sortie de FPDF écrit directement dans un fichier.
+
+    len() donne le nombre d'octets déjà écrits : FPDF s'en sert pour la table des références.
+    """
+
+    def __init__(self, fichier):
+        self.fichier = fichier
+        self.taille = 0
+
+    def __iadd__(self, texte):
+        self.taille += self.fichier.write(texte.encode("latin1"))
+        return self
+
+    def __len__(self):
+        return self.taille
+
+
+class DocumentPDF(FPDF):
+    """FPDF dont l'écriture finale est linéaire en la taille du document.
+
+    Avec fichier (ouvert en binaire), chaque page terminée y est écrite puis libérée ;
+    output() termine alors le document, sans fermer le fichier. L'alias du nombre de pages
+    et les liens, qui demandent le document entier, ne sont pas disponibles dans ce mode.
+    """
+
+    def __init__(self, *args, fichier=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fichier = fichier
+        self.nb_lignes = 0
+        self.pages_ecrites = 0
+        if fichier:
+            self.buffer = TamponFichier(fichier)
+            self.buffer += f"%PDF-{self.pdf_version}\n"
+        else:
+            self.buffer = TamponPDF()
+
+    def parcourir(self, cur, progression=None, total=0):
+        """Lignes du curseur, lues par paquets de TAILLE_LECTURE ; nb_lignes les compte.
+
+        progression(fait, total) est appelée après chaque paquet.
+        """
+        while True:
+            paquet = cur.fetchmany(TAILLE_LECTURE)
+            if not paquet:
+                return
+            yield from paquet
+            self.nb_lignes += len(paquet)
+            if progression:
+                progression(self.nb_lignes, total)
+
+    def _endpage(self):
+        super()._endpage()
+        if self.fichier:
+            self._ecrire_page(self.page)
+
+    def _ecrire_page(self, n):
+        """Écrit la page n (objet page et contenu, numérotés 3 + 2(n-1) comme dans FPDF) et la libère."""
+        largeur, hauteur = (self.fw_pt, self.fh_pt) if self.def_orientation == 'P' else (self.fh_pt, self.fw_pt)
+        self._newobj()
+        self._out('<</Type /Page')
+        self._out('/Parent 1 0 R')
+        if n in self.orientation_changes:
+            self._out('/MediaBox [0 0 %.2f %.2f]' % (hauteur, largeur))
+        self._out('/Resources 2 0 R')
+        if self.pdf_version > '1.3':
+            self._out('/Group <</Type /Group /S /Transparency /CS /DeviceRGB>>')
+        self._out('/Contents ' + str(self.n + 1) + ' 0 R>>')
+        self._out('endobj')
+        contenu = self.pages[n]
+        if self.compress:
+            contenu = zlib.compress(contenu.encode("latin1"))
+        self._newobj()
+        self._out('<<' + ('/Filter /FlateDecode ' if self.compress else '') + '/Length ' + str(len(contenu)) + '>>')
+        self._putstream(contenu)
+        self._out('endobj')
+        self.pages[n] = ""
+        self.pages_ecrites = n
+
+    def _putheader(self):
+        if not self.fichier:
+            super()._putheader()
+
+    def _putpages(self):
+        if not self.fichier:
+            return super()._putpages()
+        # Les pages sont déjà écrites : reste l'objet racine des pages
+        largeur, hauteur = (self.fw_pt, self.fh_pt) if self.def_orientation == 'P' else (self.fh_pt, self.fw_pt)
+        self.offsets[1] = len(self.buffer)
+        self._out('1 0 obj')
+        self._out('<</Type /Pages')
+        self._out('/Kids [' + ''.join(f'{3 + 2 * i} 0 R ' for i in range(self.page)) + ']')
+        self._out('/Count ' + str(self.page))
+        self._out('/MediaBox [0 0 %.2f %.2f]' % (largeur, hauteur))
+        self._out('>>')
+        self._out('endobj')
+
+    def output(self, name='', dest=''):
+        if self.fichier:
+            self.close()
+            return None
+        resultat = super().output(name, dest)
+        return str(resultat) if isinstance(resultat, TamponPDF) else resultat
+
+
+class RapportPDF(NamedTuple):
+    """Bilan de l'écriture d'un document."""
+    nb_lignes: int
+    nb_pages: int
+    duree: float
+    chemin: str
+    depuis_cache: bool = False
+
+    @property
+    def lignes_par_seconde(self):
+        return self.nb_lignes / self.duree if self.duree else float("inf")
+
+
+def compter(conn: sqlite3.Connection, requete):
+    """Nombre de lignes d'une requête, pour une progression en pourcentage."""
+    return conn.execute(f"SELECT COUNT(*) FROM ({requete})").fetchone()[0]
+
+
+def cle_cache(conn: sqlite3.Connection, construire):
+    """Clé de cache du document, ou None s'il ne peut pas être mis en cache."""
+    document = construire.__name__
+    if document not in DEPENDANCES_DOCUMENTS:
+        return None
+    complements = [datetime.now().strftime('%d/%m/%Y')] if document in DOCUMENTS_DATES else []
+    return cache_rapports.cle_document(conn, document, DEPENDANCES_DOCUMENTS[document], *complements)
+
+
+@chronometre(RENDU)
+def enregistrer_pdf(conn: sqlite3.Connection, construire, chemin, progression=None, cache=True) -> RapportPDF:
+    """Construit un document en l'écrivant au fil des pages dans chemin.
+
+    construire est l'une des fonctions construire_* ci-dessous. Le fichier partiel est
+    supprimé si la construction échoue ou est annulée. Avec cache, un document déjà
+    produit sur les mêmes données est recopié au lieu d'être reconstruit.
+    """
+    debut = time.perf_counter()
+    document = construire.__name__
+    dossier = cache_rapports.dossier_cache(conn) if cache else None
+    cle = cle_cache(conn, construire) if dossier else None
+    if cle:
+        trouve = cache_rapports.chercher(dossier, document, cle)
+        if trouve:
+            source, infos = trouve
+            shutil.copyfile(source, chemin)
+            return RapportPDF(infos["nb_lignes"], infos["nb_pages"], time.perf_counter() - debut, chemin, True)
+
+    try:
+        with open(chemin, "wb") as fichier:
+            pdf = construire(conn, fichier, progression)
+            pdf.output()
+    except BaseException:
+        if os.path.exists(chemin):
+            os.remove(chemin)
+        raise
+    # Données modifiées pendant la construction : le document ne correspond à aucune clé sûre
+    if cle and cle == cle_cache(conn, construire):
+        cache_rapports.conserver(dossier, document, cle, chemin,
+                                 {"nb_lignes": pdf.nb_lignes, "nb_pages": pdf.page_no()})
+    return RapportPDF(pdf.nb_lignes, pdf.page_no(), time.perf_counter() - debut, chemin)
+
+
+class ListeCandidatsPDF(DocumentPDF):
+    def header(self):
+        self.set_font('Arial', 'B', 14)
+        self.cell(0, 10, 'Liste des Candidats', 0, 1, 'C')
+        self.ln(10)
+
+
+@chronometre(RENDU)
+def construire_liste_candidats(conn: sqlite3.Connection, fichier=None, progression=None):
+    """Liste des candidats (paysage)."""
+    requete = """
+        SELECT numero_table, prenom, nom, date_naissance, lieu_naissance,
+            sexe, type_candidat, etablissement, nationalite,
+            choix_epr_facultative, epreuve_facultative, aptitude_sportive
+        FROM Candidats
+    """
+    total = compter(conn, requete) if progression else 0
+
+    pdf = ListeCandidatsPDF('L', fichier=fichier)
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+
+    # Définir les largeurs de colonnes proportionnelles
+    w_page = pdf.w - 20  # Largeur totale disponible moins marges
+    col_widths = [
+        20,  # N° Table
+        25,  # Prénom
+        25,  # Nom
+        22,  # Date Naiss.
+        25,  # Lieu Naiss.
+        12,  # Sexe
+        22,  # Type
+        35,  # Établissement
+        25,  # Nationalité
+        22,  # Choix Fac.
+        22,  # Épr. Fac.
+        22   # Aptitude
+    ]
+
+    # En-têtes avec une police plus petite
+    pdf.set_font("Arial", "B", 7)  # Réduit la taille de police pour les en-têtes
+    headers = [
+        "N° Table",
+        "Prénom",
+        "Nom",
+        "Date Naiss.",
+        "Lieu Naiss.",
+        "Sexe",
+        "Type",
+        "Établissement",
+        "Nationalité",
+        "Choix Fac.",
+        "Épr. Fac.",
+        "Aptitude"
+    ]
+
+    # En-têtes
+    for header, width in zip(headers, col_widths):
+        pdf.cell(width, 7, header, 1, 0, 'C')
+    pdf.ln()
+
+    # Contenu
+    pdf.set_font("Arial", "", 8)
+    for candidat in pdf.parcourir(conn.execute(requete), progression, total):
+        if pdf.get_y() + 7 > pdf.page_break_trigger:
+            pdf.add_page()
+            # Répéter les en-têtes
+            pdf.set_font("Arial", "B", 8)
+            for header, width in zip(headers, col_widths):
+                pdf.cell(width, 7, header, 1, 0, 'C')
+            pdf.ln()
+            pdf.set_font("Arial", "", 8)
+
+        for value, width in zip(candidat, col_widths):
+            pdf.cell(width, 7, str(value) if value else "", 1, 0, 'C')
+        pdf.ln()
+    return pdf
+
+
+@chronometre(RENDU)
+def construire_liste_anonymats(conn: sqlite3.Connection, fichier=None, progression=None):
+    """Liste des anonymats."""
+    requete = """
+        SELECT C.numero_table, C.nom || ' ' || C.prenom, A.numero_anonymat
+        FROM Candidats C
+        JOIN Anonymats A ON C.id_candidat = A.id_candidat
+    """
+    total = compter(conn, requete) if progression else 0
+
+    pdf = DocumentPDF(fichier=fichier)
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 14)
+    pdf.cell(0, 10, "Liste des Anonymats", 0, 1, 'C')
+    pdf.ln(5)
+
+    # Largeurs de colonnes optimisées
+    w_page = pdf.w - 20
+    col_widths = [w_page * 0.25, w_page * 0.5, w_page * 0.25]
+
+    # En-têtes
+    pdf.set_font("Arial", "B", 10)
+    headers = ["N° Table", "Nom Candidat", "Anonymat"]
+    for header, width in zip(headers, col_widths):
+        pdf.cell(width, 10, header, 1, 0, 'C')
+    pdf.ln()
+
+    # Contenu
+    pdf.set_font("Arial", "", 10)
+    for anonymat in pdf.parcourir(conn.execute(requete), progression, total):
+        if pdf.get_y() + 10 > pdf.page_break_trigger:
+            pdf.add_page()
+            pdf.set_font("Arial", "B", 10)
+            for header, width in zip(headers, col_widths):
+                pdf.cell(width, 10, header, 1, 0, 'C')
+            pdf.ln()
+            pdf.set_font("Arial", "", 10)
+
+        for value, width in zip(anonymat, col_widths):
+            pdf.cell(width, 10, str(value), 1, 0, 'C')
+        pdf.ln()
+    return pdf
+
+
+@chronometre(RENDU)
+def construire_resultats_deliberation(conn: sqlite3.Connection, fichier=None, progression=None):
+    """Résultats des délibérations (paysage)."""
+    requete = """
+        SELECT C.numero_table, C.nom || ' ' || C.prenom, D.points_tour1, D.points_tour2,
+               D.statut, L.moyenne_cycle
+        FROM Candidats C
+        JOIN Deliberation D ON C.id_candidat = D.id_candidat
+        LEFT JOIN Livret_Scolaire L ON C.id_candidat = L.id_candidat
+    """
+    total = compter(conn, requete) if progression else 0
+
+    pdf = DocumentPDF(fichier=fichier)
+    pdf.add_page('L')  # Format paysage
+    pdf.set_font("Arial", "B", 14)
+    pdf.cell(0, 10, "Résultats des Délibérations", 0, 1, 'C')
+    pdf.ln(5)
+
+    # Largeurs de colonnes optimisées
+    w_page = pdf.w - 20
+    col_widths = [
+        w_page * 0.15,  # N° Table
+        w_page * 0.30,  # Nom Candidat
+        w_page * 0.15,  # Points Tour 1
+        w_page * 0.15,  # Points Tour 2
+        w_page * 0.15,  # Moyenne Cycle
+        w_page * 0.10   # Statut
+    ]
+
+    # En-têtes
+    pdf.set_font("Arial", "B", 10)
+    headers = ["N° Table", "Nom Candidat", "Points Tour 1", "Points Tour 2", "Moyenne Cycle", "Statut"]
+    for header, width in zip(headers, col_widths):
+        pdf.cell(width, 10, header, 1, 0, 'C')
+    pdf.ln()
+
+    # Contenu
+    pdf.set_font("Arial", "", 10)
+    for resultat in pdf.parcourir(conn.execute(requete), progression, total):
+        if pdf.get_y() + 10 > pdf.page_break_trigger:
+            pdf.add_page('L')
+            pdf.set_font("Arial", "B", 10)
+            for header, width in zip(headers, col_widths):
+                pdf.cell(width, 10, header, 1, 0, 'C')
+            pdf.ln()
+            pdf.set_font("Arial", "", 10)
+
+        pdf.cell(col_widths[0], 10, str(resultat[0]), 1, 0, 'C')
+        pdf.cell(col_widths[1], 10, str(resultat[1]), 1, 0, 'C')
+        pdf.cell(col_widths[2], 10, str(resultat[2]), 1, 0, 'C')
+        pdf.cell(col_widths[3], 10, str(resultat[3] if resultat[3] else ""), 1, 0, 'C')
+        pdf.cell(col_widths[4], 10, str(resultat[5] if resultat[5] else ""), 1, 0, 'C')
+        pdf.cell(col_widths[5], 10, str(resultat[4]), 1, 0, 'C')
+        pdf.ln()
+    return pdf
+
+
+@chronometre(RENDU)
+def construire_pv_deliberation(conn: sqlite3.Connection, fichier=None, progression=None):
+    """Procès-verbal de délibération avec les informations du jury et les statistiques."""
+    cur = conn.cursor()
+    # Récupérer les informations du jury depuis la base de données
+    cur.execute("""
+        SELECT region, ief, localite, centre_examen, president_jury
+        FROM Parametres_Jury
+        WHERE id_utilisateur = (
+            SELECT id_utilisateur
+            FROM Utilisateurs
+            WHERE role = 'Jury'
+            LIMIT 1
+        )
+    """)
+    jury_info = cur.fetchone()
+
+    if not jury_info:
+        raise ValueError("Informations du jury non trouvées. Veuillez configurer les paramètres du jury.")
+
+    jury_info_text = (
+        f"Région: {jury_info[0]}\n"
+        f"IEF: {jury_info[1]}\n"
+        f"Localité: {jury_info[2]}\n"
+        f"Centre d'examen: {jury_info[3]}\n"
+        f"Président du Jury: {jury_info[4]}"
+    )
+
+    # Résultats des candidats
+    requete = """
+        SELECT
+            C.numero_table,
+            C.nom || ' ' || C.prenom as nom_complet,
+            D.statut,
+            CASE
+                WHEN D.statut = 'Admis' THEN D.points_tour1
+                WHEN D.statut = '2nd Tour' THEN D.points_tour1
+                WHEN D.statut = 'Échec' AND D.points_tour2 IS NOT NULL THEN D.points_tour2
+                ELSE D.points_tour1
+            END as points
+        FROM Candidats C
+        JOIN Deliberation D ON C.id_candidat = D.id_candidat
+        ORDER BY C.numero_table
+    """
+    total = compter(conn, requete)
+    if not total:
+        raise ValueError("Aucun résultat trouvé pour générer le PV.")
+
+    # Création du PDF
+    pdf = DocumentPDF(fichier=fichier)
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 14)
+    pdf.cell(0, 10, "Procès-Verbal de Délibération du BFEM", 0, 1, 'C')
+    pdf.ln(5)
+
+    # Informations du jury
+    pdf.set_font("Arial", "", 10)
+    pdf.multi_cell(0, 10, jury_info_text)
+    pdf.ln(5)
+
+    # Largeurs de colonnes optimisées
+    w_page = pdf.w - 20
+    col_widths = [w_page * 0.15, w_page * 0.45, w_page * 0.2, w_page * 0.2]
+
+    # En-têtes
+    pdf.set_font("Arial", "B", 10)
+    headers = ["N° Table", "Nom et Prénom", "Statut", "Points"]
+    for header, width in zip(headers, col_widths):
+        pdf.cell(width, 10, header, 1, 0, 'C')
+    pdf.ln()
+
+    # Contenu
+    pdf.set_font("Arial", "", 10)
+    for resultat in pdf.parcourir(conn.execute(requete), progression, total):
+        if pdf.get_y() + 10 > pdf.page_break_trigger:
+            pdf.add_page()
+            pdf.set_font("Arial", "B", 10)
+            for header, width in zip(headers, col_widths):
+                pdf.cell(width, 10, header, 1, 0, 'C')
+            pdf.ln()
+            pdf.set_font("Arial", "", 10)
+
+        for value, width in zip(resultat, col_widths):
+            pdf.cell(width, 10, str(value), 1, 0, 'C')
+        pdf.ln()
+
+    # Statistiques
+    pdf.ln(10)
+    pdf.set_font("Arial", "B", 11)
+    pdf.cell(0, 10, "Statistiques de la délibération:", 0, 1, 'L')
+    pdf.set_font("Arial", "", 10)
+
+    # Mêmes chiffres que le tableau de bord
+    statuts = lire_compteurs(conn).statuts
+    stats_text = (
+        f"Total des candidats: {pdf.nb_lignes}\n"
+        f"Admis: {statuts['Admis']['nombre']} ({statuts['Admis']['pourcentage']:.2f}%)\n"
+        f"Admissibles au 2nd tour: {statuts['2nd Tour']['nombre']} ({statuts['2nd Tour']['pourcentage']:.2f}%)\n"
+        f"Échec: {statuts['Échec']['nombre']} ({statuts['Échec']['pourcentage']:.2f}%)"
+    )
+
+    pdf.multi_cell(0, 10, stats_text)
+
+    # Date et signature
+    pdf.ln(20)
+    pdf.cell(0, 10, f"Fait à {jury_info[2]}, le {datetime.now().strftime('%d/%m/%Y')}", 0, 1, 'R')
+    pdf.ln(10)
+    pdf.set_font("Arial", "B", 10)
+    pdf.cell(0, 10, "Signature du Président du Jury:", 0, 1, 'L')
+    return pdf
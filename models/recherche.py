@@ -0,0 +1,56 @@
+import re
+import sqlite3
+from typing import Optional, Set
+
+from models.instrumentation import REQUETE, chronometre
+from models.schema import COLONNES_RECHERCHE
+
+# Mots de la saisie : lettres (accentuées comprises) et chiffres
+MOTS = re.compile(r"\w+")
+
+
+def fts_disponible(conn: sqlite3.Connection):
+    """Vrai si la base possède l'index plein texte des candidats (migration 6 avec FTS5)."""
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'Candidats_FTS'").fetchone() is not None
+
+
+def requete_fts(texte):
+    """Expression MATCH : chaque mot saisi est un préfixe, tous les mots sont requis.
+
+    « ndiay ous » -> "ndiay"* AND "ous"* ; les accents et la casse sont ignorés
+    par le tokenizer (unicode61 remove_diacritics 2).
+    """
+    return " AND ".join(f'"{mot}"*' for mot in MOTS.findall(texte))
+
+
+def condition_recherche(conn: sqlite3.Connection, texte, colonne="id_candidat"):
+    """Condition SQL (et paramètres) retenant les candidats dont colonne correspond à la saisie.
+
+    Le nom, le prénom, le lieu de naissance, l'établissement et le numéro de table sont
+    cherchés dans l'index plein texte ; sans FTS5, chaque mot est cherché par LIKE
+    (sensible aux accents). Retourne ("", []) pour une saisie vide.
+    """
+    mots = MOTS.findall(texte)
+    if not mots:
+        return "", []
+    if fts_disponible(conn):
+        return (f"{colonne} IN (SELECT rowid FROM Candidats_FTS WHERE Candidats_FTS MATCH ?)",
+                [requete_fts(texte)])
+
+    conditions, parametres = [], []
+    for mot in mots:
+        conditions.append("(" + " OR ".join(f"{c} LIKE ?" for c in COLONNES_RECHERCHE) + ")")
+        parametres += [f"%{mot}%"] * len(COLONNES_RECHERCHE)
+    return (f"{colonne} IN (SELECT id_candidat FROM Candidats WHERE {' AND '.join(conditions)})",
+            parametres)
+
+
+@chronometre(REQUETE)
+def rechercher_candidats(conn: sqlite3.Connection, texte) -> Optional[Set[int]]:
+    """Identifiants des candidats correspondant à la saisie (None pour une saisie vide : pas de filtre)."""
+    condition, parametres = condition_recherche(conn, texte)
+    if not condition:
+        return None
+    return {id_candidat for (id_candidat,) in
+            conn.execute(f"SELECT id_candidat FROM Candidats WHERE {condition}", parametres)}
@@ -0,0 +1,191 @@
+import multiprocessing
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, NamedTuple, Optional
+
+from fpdf import FPDF
+
+from models.instrumentation import RENDU, chronometre
+from models.notes import MATIERES, TABLES_NOTES
+from models.rapports_pdf import DocumentPDF
+
+LIBELLES_TOURS = {1: "1er_Tour", 2: "2nd_Tour"}
+
+# Relevés confiés à un processus à la fois : assez pour amortir l'envoi, assez peu pour la progression
+TAILLE_PAQUET = 50
+
+
+class ReleveCandidat(NamedTuple):
+    """Données d'un relevé de notes, lues en une requête pour toute la cohorte."""
+    numero_table: int
+    nom_complet: str
+    anonymat: int
+    etablissement: Optional[str]
+    notes: tuple  # Dans l'ordre de MATIERES[tour]
+
+
+class RapportReleves(NamedTuple):
+    """Bilan d'une génération de relevés."""
+    nb_releves: int
+    nb_pages: int
+    duree: float
+    destination: str
+
+    @property
+    def pages_par_seconde(self):
+        return self.nb_pages / self.duree if self.duree else float("inf")
+
+
+def lister_etablissements(conn: sqlite3.Connection):
+    """Établissements des candidats, par ordre alphabétique."""
+    return [etablissement for (etablissement,) in conn.execute(
+        "SELECT DISTINCT etablissement FROM Candidats WHERE etablissement IS NOT NULL ORDER BY etablissement")]
+
+
+def lire_releves(conn: sqlite3.Connection, tour=1, etablissement=None, numero_table=None) -> List[ReleveCandidat]:
+    """Relevés des candidats notés au tour, éventuellement d'un établissement ou d'un seul candidat."""
+    conditions, parametres = [], []
+    if etablissement is not None:
+        conditions.append("C.etablissement = ?")
+        parametres.append(etablissement)
+    if numero_table is not None:
+        conditions.append("C.numero_table = ?")
+        parametres.append(numero_table)
+    cur = conn.execute(f"""
+        SELECT C.numero_table, C.nom || ' ' || C.prenom, A.numero_anonymat, C.etablissement,
+               {', '.join(f'N.{m}' for m in MATIERES[tour])}
+        FROM Candidats C
+        JOIN Anonymats A ON A.id_candidat = C.id_candidat
+        JOIN {TABLES_NOTES[tour]} N ON N.anonymat = CAST(A.numero_anonymat AS TEXT)
+        {('WHERE ' + ' AND '.join(conditions)) if conditions else ''}
+        ORDER BY C.etablissement, C.numero_table
+    """, parametres)
+    return [ReleveCandidat(*ligne[:4], tuple(ligne[4:])) for ligne in cur.fetchall()]
+
+
+def dessiner_releve(pdf: FPDF, releve: ReleveCandidat, tour=1):
+    """Ajoute au document la page du relevé de notes d'un candidat."""
+    pdf.add_page()
+
+    # Ajouter un logo (si disponible)
+    if os.path.exists("logo.png"):
+        pdf.image("logo.png", x=10, y=8, w=30)
+
+    # Titre du relevé de notes
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(0, 10, f"Relevé de Notes - {releve.nom_complet}", 0, 1, "C")
+    pdf.ln(10)
+
+    # Informations du candidat
+    pdf.set_font("Arial", "", 12)
+    pdf.cell(0, 10, f"Numéro de Table: {releve.numero_table}", 0, 1)
+    pdf.cell(0, 10, f"Anonymat: {releve.anonymat}", 0, 1)
+    if releve.etablissement:
+        pdf.cell(0, 10, f"Établissement: {releve.etablissement}", 0, 1)
+    pdf.ln(10)
+
+    # Tableau des notes
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(0, 10, "Notes:", 0, 1)
+    pdf.ln(5)
+
+    pdf.set_font("Arial", "B", 10)
+    col_widths = [100, 50]
+    for header, width in zip(["Matière", "Note"], col_widths):
+        pdf.cell(width, 10, header, 1, 0, "C")
+    pdf.ln()
+
+    pdf.set_font("Arial", "", 10)
+    for matiere, note in zip(MATIERES[tour], releve.notes):
+        pdf.cell(col_widths[0], 10, matiere.replace("_", " ").capitalize(), 1, 0, "L")
+        pdf.cell(col_widths[1], 10, "-" if note is None else f"{note:g}", 1, 0, "C")
+        pdf.ln()
+
+
+def nom_fichier_releve(releve: ReleveCandidat, tour=1):
+    return f"Releve_Notes_{releve.numero_table}_{LIBELLES_TOURS[tour]}.pdf"
+
+
+def construire_releve(releve: ReleveCandidat, tour=1):
+    """Document d'un seul relevé."""
+    pdf = FPDF()
+    dessiner_releve(pdf, releve, tour)
+    return pdf
+
+
+def ecrire_paquet(releves, tour, dossier):
+    """Écrit un fichier par relevé dans le dossier ; exécutée dans un processus de travail.
+
+    Retourne le nombre de pages écrites.
+    """
+    nb_pages = 0
+    for releve in releves:
+        pdf = construire_releve(releve, tour)
+        pdf.output(os.path.join(dossier, nom_fichier_releve(releve, tour)))
+        nb_pages += pdf.page_no()
+    return nb_pages
+
+
+@chronometre(RENDU)
+def generer_releves_fichiers(releves, tour, dossier, processus=None, progression=None) -> RapportReleves:
+    """Un PDF par candidat dans le dossier, rendus en parallèle par paquets de TAILLE_PAQUET.
+
+    progression(fait, total) est appelée à chaque paquet terminé ; si elle lève une
+    exception (annulation), les paquets non commencés sont abandonnés.
+    """
+    if not releves:
+        raise ValueError("Aucun relevé à générer : aucune note saisie pour ces candidats.")
+    debut = time.perf_counter()
+    os.makedirs(dossier, exist_ok=True)
+    paquets = [releves[i:i + TAILLE_PAQUET] for i in range(0, len(releves), TAILLE_PAQUET)]
+    processus = processus or os.cpu_count() or 1
+    fait = nb_pages = 0
+
+    if processus == 1 or len(paquets) <= 1:
+        for paquet in paquets:
+            nb_pages += ecrire_paquet(paquet, tour, dossier)
+            fait += len(paquet)
+            if progression:
+                progression(fait, len(releves))
+    else:
+        # « spawn » : pas de fork d'un processus qui fait tourner Qt et des threads
+        executeur = ProcessPoolExecutor(max_workers=processus, mp_context=multiprocessing.get_context("spawn"))
+        try:
+            travaux = {executeur.submit(ecrire_paquet, paquet, tour, dossier): len(paquet) for paquet in paquets}
+            for travail in as_completed(travaux):
+                nb_pages += travail.result()
+                fait += travaux[travail]
+                if progression:
+                    progression(fait, len(releves))
+        finally:
+            executeur.shutdown(wait=True, cancel_futures=True)
+
+    return RapportReleves(len(releves), nb_pages, time.perf_counter() - debut, dossier)
+
+
+@chronometre(RENDU)
+def generer_releves_fusionnes(releves, tour, chemin, progression=None) -> RapportReleves:
+    """Tous les relevés dans un seul PDF.
+
+    FPDF 1.7 ne sait pas assembler des documents produits séparément : le document
+    fusionné est donc rendu dans un seul processus.
+    """
+    if not releves:
+        raise ValueError("Aucun relevé à générer : aucune note saisie pour ces candidats.")
+    debut = time.perf_counter()
+    try:
+        # Chaque page est écrite dans le fichier dès qu'elle est terminée
+        with open(chemin, "wb") as fichier:
+            pdf = DocumentPDF(fichier=fichier)
+            for fait, releve in enumerate(releves, 1):
+                dessiner_releve(pdf, releve, tour)
+                if progression and (fait % TAILLE_PAQUET == 0 or fait == len(releves)):
+                    progression(fait, len(releves))
+            pdf.output()
+    except BaseException:
+        if os.path.exists(chemin):
+            os.remove(chemin)
+        raise
+    return RapportReleves(len(releves), pdf.page_no(), time.perf_counter() - debut, chemin)
@@ -0,0 +1,612 @@
+import re
+import sqlite3
+from contextlib import contextmanager
+from typing import Dict, List
+
+# Définition de référence des tables, dans l'ordre de création (tables parentes d'abord).
+# Toute modification ici passe par une nouvelle migration (models.migrations), et la migration
+# qui avait publié l'ancienne définition en garde une copie figée.
+TABLES: Dict[str, str] = {
+    "Utilisateurs": '''
+        CREATE TABLE IF NOT EXISTS Utilisateurs (
+            id_utilisateur INTEGER PRIMARY KEY AUTOINCREMENT,
+            nom_utilisateur TEXT UNIQUE NOT NULL,
+            mot_de_passe TEXT NOT NULL,
+            role TEXT CHECK (role IN ('Jury', 'Professeur')) NOT NULL
+        )
+    ''',
+
+    "Parametres_Jury": '''
+        CREATE TABLE IF NOT EXISTS Parametres_Jury (
+            id_jury INTEGER PRIMARY KEY AUTOINCREMENT,
+            id_utilisateur INTEGER NOT NULL,
+            region TEXT NOT NULL,
+            ief TEXT NOT NULL,
+            localite TEXT NOT NULL,
+            centre_examen TEXT NOT NULL,
+            president_jury TEXT NOT NULL,
+            telephone TEXT NOT NULL,
+            FOREIGN KEY (id_utilisateur) REFERENCES Utilisateurs(id_utilisateur) ON DELETE CASCADE
+        )
+    ''',
+
+    "Candidats": '''
+        CREATE TABLE IF NOT EXISTS Candidats (
+            id_candidat INTEGER PRIMARY KEY AUTOINCREMENT,
+            numero_table INTEGER UNIQUE NOT NULL,
+            prenom TEXT NOT NULL,
+            nom TEXT NOT NULL,
+            date_naissance DATE NOT NULL,
+            lieu_naissance TEXT NOT NULL,
+            sexe CHAR(1) CHECK (sexe IN ('M', 'F')),
+            type_candidat TEXT,
+            etablissement TEXT,
+            nationalite TEXT NOT NULL,
+            choix_epr_facultative BOOLEAN NOT NULL,
+            epreuve_facultative TEXT CHECK (epreuve_facultative IN ('Neutre', 'COUTURE', 'DESSIN', 'MUSIQUE')),
+            aptitude_sportive BOOLEAN NOT NULL
+        )
+    ''',
+
+    "Anonymats": '''
+        CREATE TABLE IF NOT EXISTS Anonymats (
+        id_anonymat INTEGER PRIMARY KEY AUTOINCREMENT,
+        id_candidat INTEGER UNIQUE NOT NULL,
+        numero_anonymat INTEGER UNIQUE NOT NULL,
+        tour INTEGER CHECK (tour IN (1, 2)) NOT NULL,
+        FOREIGN KEY (id_candidat) REFERENCES Candidats(id_candidat) ON DELETE CASCADE
+    )
+    ''',
+
+    "Livret_Scolaire": '''
+        CREATE TABLE IF NOT EXISTS Livret_Scolaire (
+            id_livret INTEGER PRIMARY KEY AUTOINCREMENT,
+            id_candidat INTEGER NOT NULL,
+            nombre_de_fois INTEGER CHECK (nombre_de_fois >= 1),
+            moyenne_6e REAL CHECK (moyenne_6e BETWEEN 0 AND 20),
+            moyenne_5e REAL CHECK (moyenne_5e BETWEEN 0 AND 20),
+            moyenne_4e REAL CHECK (moyenne_4e BETWEEN 0 AND 20),
+            moyenne_3e REAL CHECK (moyenne_3e BETWEEN 0 AND 20),
+            moyenne_cycle REAL CHECK (moyenne_cycle BETWEEN 0 AND 20),
+            FOREIGN KEY (id_candidat) REFERENCES Candidats(id_candidat) ON DELETE CASCADE
+        )
+    ''',
+
+    "Notes_Tour1": '''
+        CREATE TABLE IF NOT EXISTS Notes_Tour1 (
+        id_note INTEGER PRIMARY KEY AUTOINCREMENT,
+        id_candidat INTEGER NOT NULL,
+        compo_francais REAL CHECK (compo_francais BETWEEN 0 AND 20),
+        dictee REAL CHECK (dictee BETWEEN 0 AND 20),
+        etude_de_texte REAL CHECK (etude_de_texte BETWEEN 0 AND 20),
+        instruction_civique REAL CHECK (instruction_civique BETWEEN 0 AND 20),
+        histoire_geographie REAL CHECK (histoire_geographie BETWEEN 0 AND 20),
+        mathematiques REAL CHECK (mathematiques BETWEEN 0 AND 20),
+        pc_lv2 REAL CHECK (pc_lv2 BETWEEN 0 AND 20),
+        svt REAL CHECK (svt BETWEEN 0 AND 20),
+        anglais_ecrit REAL CHECK (anglais_ecrit BETWEEN 0 AND 20),
+        anglais_oral REAL CHECK (anglais_oral BETWEEN 0 AND 20),
+        -- EPS et Épreuve facultative uniquement si applicable (RM15)
+        eps REAL CHECK (eps BETWEEN 0 AND 20),
+        epreuve_facultative REAL CHECK (epreuve_facultative BETWEEN 0 AND 20),
+        anonymat TEXT UNIQUE NOT NULL,
+        FOREIGN KEY (id_candidat) REFERENCES Candidats(id_candidat) ON DELETE CASCADE
+    )
+    ''',
+
+    "Notes_Tour2": '''
+        CREATE TABLE IF NOT EXISTS Notes_Tour2 (
+        id_note INTEGER PRIMARY KEY AUTOINCREMENT,
+        id_candidat INTEGER NOT NULL,
+        francais_2nd_tour REAL CHECK (francais_2nd_tour BETWEEN 0 AND 20),
+        mathematiques_2nd_tour REAL CHECK (mathematiques_2nd_tour BETWEEN 0 AND 20),
+        pc_lv2_2nd_tour REAL CHECK (pc_lv2_2nd_tour BETWEEN 0 AND 20),
+        anonymat TEXT UNIQUE NOT NULL,
+        FOREIGN KEY (id_candidat) REFERENCES Candidats(id_candidat) ON DELETE CASCADE
+    )
+    ''',
+
+    "Deliberation": '''
+        CREATE TABLE IF NOT EXISTS Deliberation (
+        id_deliberation INTEGER PRIMARY KEY AUTOINCREMENT,
+        id_candidat INTEGER UNIQUE NOT NULL,
+        points_tour1 REAL NOT NULL,
+        points_tour2 REAL,
+        statut TEXT CHECK (statut IN ('Admis', 'Échec', '2nd Tour', 'Repêchage')),
+        FOREIGN KEY (id_candidat) REFERENCES Candidats(id_candidat) ON DELETE CASCADE
+    )
+    ''',
+
+    "Import_Progression": '''
+        CREATE TABLE IF NOT EXISTS Import_Progression (
+            fichier TEXT PRIMARY KEY,
+            empreinte TEXT NOT NULL,
+            lignes_importees INTEGER NOT NULL DEFAULT 0,
+            termine INTEGER NOT NULL DEFAULT 0
+        )
+    ''',
+
+    # Résultats de délibération matérialisés, tenus à jour par rafraichir_resultats()
+    "Resultats_Deliberation": '''
+        CREATE TABLE IF NOT EXISTS Resultats_Deliberation (
+            id_candidat INTEGER PRIMARY KEY,
+            numero_table INTEGER NOT NULL,
+            nom_complet TEXT,
+            points_tour1 REAL NOT NULL,
+            points_tour2 REAL,
+            moyenne_cycle REAL,
+            bonus_malus REAL NOT NULL,
+            statut TEXT NOT NULL
+        )
+    ''',
+
+    # Candidats dont les notes, le livret ou l'identité ont changé depuis le dernier calcul
+    "Resultats_A_Recalculer": '''
+        CREATE TABLE IF NOT EXISTS Resultats_A_Recalculer (
+            id_candidat INTEGER PRIMARY KEY
+        )
+    ''',
+
+    # Agrégats du tableau de bord, tenus à jour par déclencheurs (creer_compteurs)
+    "Compteurs_Statuts": '''
+        CREATE TABLE IF NOT EXISTS Compteurs_Statuts (
+            statut TEXT PRIMARY KEY,
+            nombre INTEGER NOT NULL DEFAULT 0
+        )
+    ''',
+
+    "Compteurs_Matieres": '''
+        CREATE TABLE IF NOT EXISTS Compteurs_Matieres (
+            tour INTEGER NOT NULL,
+            matiere TEXT NOT NULL,
+            nombre INTEGER NOT NULL DEFAULT 0,
+            somme REAL NOT NULL DEFAULT 0,
+            somme_carres REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (tour, matiere)
+        )
+    ''',
+
+    # Candidats sans établissement (ou délibérations sans candidat) : établissement ''
+    "Compteurs_Etablissements": '''
+        CREATE TABLE IF NOT EXISTS Compteurs_Etablissements (
+            etablissement TEXT PRIMARY KEY,
+            candidats INTEGER NOT NULL DEFAULT 0,
+            deliberes INTEGER NOT NULL DEFAULT 0,
+            admis INTEGER NOT NULL DEFAULT 0
+        )
+    ''',
+
+    # Compteur de modifications par table, tenu par déclencheurs : clé du cache des documents
+    "Versions_Tables": '''
+        CREATE TABLE IF NOT EXISTS Versions_Tables (
+            nom_table TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''',
+}
+
+# Index secondaires des requêtes fréquentes : (nom, table, colonnes)
+INDEX = [
+    ("idx_notes_tour1_candidat", "Notes_Tour1", ["id_candidat"]),
+    ("idx_notes_tour2_candidat", "Notes_Tour2", ["id_candidat"]),
+    # Couvrant : la moyenne du cycle est lue sans accéder à la table
+    ("idx_livret_candidat", "Livret_Scolaire", ["id_candidat", "moyenne_cycle"]),
+    ("idx_deliberation_statut", "Deliberation", ["statut", "id_candidat"]),
+    ("idx_parametres_jury_utilisateur", "Parametres_Jury", ["id_utilisateur"]),
+    ("idx_resultats_numero_table", "Resultats_Deliberation", ["numero_table"]),
+    # Pages filtrées par statut, dans l'ordre des numéros de table (la recherche par nom passe par Candidats_FTS)
+    ("idx_resultats_statut", "Resultats_Deliberation", ["statut", "numero_table"]),
+]
+
+# Tables dont chaque modification rend le résultat d'un candidat obsolète
+TABLES_SUIVIES = ["Candidats", "Notes_Tour1", "Notes_Tour2", "Livret_Scolaire"]
+
+
+def marquage_sans_doublon(ligne):
+    """Instruction qui marque ligne.id_candidat (ligne : NEW ou OLD) à recalculer.
+
+    Pas de INSERT OR IGNORE : la politique de conflit d'une instruction UPSERT
+    (INSERT ... ON CONFLICT DO UPDATE) remplacerait le IGNORE du déclencheur.
+    """
+    return (f"INSERT INTO Resultats_A_Recalculer SELECT {ligne}.id_candidat"
+            f"\n                WHERE NOT EXISTS (SELECT 1 FROM Resultats_A_Recalculer"
+            f" WHERE id_candidat = {ligne}.id_candidat);")
+
+
+def declencheurs_suivi(marquage=marquage_sans_doublon):
+    """Déclencheurs qui marquent le candidat modifié dans Resultats_A_Recalculer."""
+    declencheurs = {}
+    for table in TABLES_SUIVIES:
+        for evenement, lignes in (("INSERT", ["NEW"]), ("UPDATE", ["OLD", "NEW"]), ("DELETE", ["OLD"])):
+            nom = f"trg_{table.lower()}_{evenement.lower()}_a_recalculer"
+            marquages = "".join(f"\n                {marquage(ligne)}" for ligne in lignes)
+            declencheurs[nom] = f'''
+            CREATE TRIGGER IF NOT EXISTS {nom}
+            AFTER {evenement} ON {table}
+            BEGIN{marquages}
+            END
+        '''
+    return declencheurs
+
+
+DECLENCHEURS = declencheurs_suivi()
+
+# Tables lues par les documents mis en cache : chaque modification incrémente leur version.
+# Les notes n'en font pas partie (les documents lisent les résultats délibérés) : un déclencheur
+# de plus par note saisie ralentirait la saisie et l'import sans rien invalider d'utile.
+TABLES_VERSIONNEES = ["Utilisateurs", "Parametres_Jury", "Candidats", "Anonymats", "Livret_Scolaire",
+                      "Deliberation"]
+
+
+def _declencheurs_versions():
+    """Déclencheurs qui incrémentent la version de la table modifiée dans Versions_Tables."""
+    return {
+        f"trg_{table.lower()}_{evenement.lower()}_version": f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table.lower()}_{evenement.lower()}_version
+            AFTER {evenement} ON {table}
+            BEGIN
+                UPDATE Versions_Tables SET version = version + 1 WHERE nom_table = '{table}';
+            END
+        '''
+        for table in TABLES_VERSIONNEES
+        for evenement in ("INSERT", "UPDATE", "DELETE")
+    }
+
+
+DECLENCHEURS_VERSIONS = _declencheurs_versions()
+
+# Index plein texte des candidats (FTS5), à contenu externe : seuls les jetons sont stockés.
+# Hors de TABLES : une table virtuelle n'a pas de structure à vérifier ni à reconstruire.
+COLONNES_RECHERCHE = ["nom", "prenom", "lieu_naissance", "etablissement", "numero_table"]
+
+TABLE_RECHERCHE = f'''
+    CREATE VIRTUAL TABLE IF NOT EXISTS Candidats_FTS USING fts5(
+        {", ".join(COLONNES_RECHERCHE)},
+        content='Candidats', content_rowid='id_candidat',
+        tokenize="unicode61 remove_diacritics 2", prefix='2 3'
+    )
+'''
+
+
+def _declencheurs_recherche():
+    """Déclencheurs qui tiennent Candidats_FTS à jour (commande 'delete' des tables à contenu externe)."""
+    colonnes = ", ".join(COLONNES_RECHERCHE)
+    anciennes = ", ".join(f"OLD.{c}" for c in COLONNES_RECHERCHE)
+    nouvelles = ", ".join(f"NEW.{c}" for c in COLONNES_RECHERCHE)
+    suppression = (f"INSERT INTO Candidats_FTS (Candidats_FTS, rowid, {colonnes}) "
+                   f"VALUES ('delete', OLD.id_candidat, {anciennes});")
+    insertion = f"INSERT INTO Candidats_FTS (rowid, {colonnes}) VALUES (NEW.id_candidat, {nouvelles});"
+    corps = {"INSERT": insertion, "UPDATE": suppression + "\n                " + insertion,
+             "DELETE": suppression}
+    return {
+        f"trg_candidats_{evenement.lower()}_recherche": f'''
+            CREATE TRIGGER IF NOT EXISTS trg_candidats_{evenement.lower()}_recherche
+            AFTER {evenement} ON Candidats
+            BEGIN
+                {instructions}
+            END
+        '''
+        for evenement, instructions in corps.items()
+    }
+
+
+DECLENCHEURS_RECHERCHE = _declencheurs_recherche()
+
+
+# Compteurs du tableau de bord : statuts (CHECK de Deliberation), matières des tables de notes
+STATUTS_DELIBERATION = ["Admis", "2nd Tour", "Échec", "Repêchage"]
+TABLES_NOTES_TOURS = {1: "Notes_Tour1", 2: "Notes_Tour2"}
+TABLES_COMPTEURS = ["Compteurs_Statuts", "Compteurs_Matieres", "Compteurs_Etablissements"]
+
+
+def matieres_notes(table):
+    """Matières d'une table de notes, lues dans sa définition de référence."""
+    return re.findall(r"^\s*(\w+) REAL CHECK", TABLES[table], re.M)
+
+
+def _etablissement_de(id_candidat):
+    """Établissement courant d'un candidat dans un déclencheur ('' s'il n'en a pas ou n'existe plus)."""
+    return f"COALESCE((SELECT etablissement FROM Candidats WHERE id_candidat = {id_candidat}), '')"
+
+
+def _declencheurs_compteurs():
+    """Déclencheurs qui tiennent les tables Compteurs_* à jour, ligne par ligne.
+
+    Une mise à jour ne touche que les compteurs concernés : une note modifiée met à jour
+    la seule ligne de sa matière (déclencheur UPDATE OF par colonne).
+    """
+    declencheurs = {}
+
+    def ajouter(nom, evenement, table, corps, condition="", moment="AFTER"):
+        declencheurs[nom] = f'''
+            CREATE TRIGGER IF NOT EXISTS {nom}
+            {moment} {evenement} ON {table}{condition}
+            BEGIN
+                {corps}
+            END
+        '''
+
+    # Notes : effectif, somme et somme des carrés par matière
+    for tour, table in TABLES_NOTES_TOURS.items():
+        matieres = matieres_notes(table)
+        for evenement, ligne, signe in (("INSERT", "NEW", "+"), ("DELETE", "OLD", "-")):
+            note = f"(CASE matiere {' '.join(f'WHEN {m!r} THEN {ligne}.{m}' for m in matieres)} END)"
+            ajouter(f"trg_{table.lower()}_{evenement.lower()}_compteurs", evenement, table, f"""UPDATE Compteurs_Matieres SET
+                    nombre = nombre {signe} ({note} IS NOT NULL),
+                    somme = somme {signe} COALESCE({note}, 0),
+                    somme_carres = somme_carres {signe} COALESCE({note} * {note}, 0)
+                WHERE tour = {tour};""")
+        for m in matieres:
+            ajouter(f"trg_{table.lower()}_update_{m}_compteurs", f"UPDATE OF {m}", table, f"""UPDATE Compteurs_Matieres SET
+                    nombre = nombre + (NEW.{m} IS NOT NULL) - (OLD.{m} IS NOT NULL),
+                    somme = somme + COALESCE(NEW.{m}, 0) - COALESCE(OLD.{m}, 0),
+                    somme_carres = somme_carres + COALESCE(NEW.{m} * NEW.{m}, 0) - COALESCE(OLD.{m} * OLD.{m}, 0)
+                WHERE tour = {tour} AND matiere = '{m}';""", f"\n            WHEN OLD.{m} IS NOT NEW.{m}")
+
+    # Délibérations : effectif par statut (statut absent compté sous ''), délibérés et admis
+    # par établissement du candidat
+    def deliberation(ligne, signe):
+        return f"""UPDATE Compteurs_Statuts SET nombre = nombre {signe} 1 WHERE statut = COALESCE({ligne}.statut, '');
+                UPDATE Compteurs_Etablissements SET
+                    deliberes = deliberes {signe} ({ligne}.statut IS NOT NULL),
+                    admis = admis {signe} ({ligne}.statut IS 'Admis')
+                WHERE etablissement = {_etablissement_de(f'{ligne}.id_candidat')};"""
+
+    ajouter("trg_deliberation_insert_compteurs", "INSERT", "Deliberation", deliberation("NEW", "+"))
+    ajouter("trg_deliberation_delete_compteurs", "DELETE", "Deliberation", deliberation("OLD", "-"))
+    ajouter("trg_deliberation_update_compteurs", "UPDATE OF statut, id_candidat", "Deliberation",
+            deliberation("OLD", "-") + "\n                " + deliberation("NEW", "+"),
+            "\n            WHEN OLD.statut IS NOT NEW.statut OR OLD.id_candidat IS NOT NEW.id_candidat")
+
+    # Candidats : effectif par établissement ; un changement d'établissement (ou une suppression)
+    # déplace aussi les délibérés et admis du candidat, pour que la délibération reste comptée
+    # là où la trouvera sa propre suppression. La suppression est traitée AVANT : la cascade
+    # ON DELETE efface les délibérations entre la suppression du candidat et un déclencheur AFTER
+    def creer_etablissement(ligne):
+        return f"""INSERT INTO Compteurs_Etablissements (etablissement)
+                SELECT COALESCE({ligne}.etablissement, '') WHERE NOT EXISTS (
+                    SELECT 1 FROM Compteurs_Etablissements WHERE etablissement = COALESCE({ligne}.etablissement, ''));"""
+
+    def deplacer(ligne, signe, etablissement):
+        return f"""UPDATE Compteurs_Etablissements SET
+                    deliberes = deliberes {signe} (SELECT COUNT(statut) FROM Deliberation WHERE id_candidat = {ligne}.id_candidat),
+                    admis = admis {signe} (SELECT COUNT(*) FROM Deliberation WHERE id_candidat = {ligne}.id_candidat AND statut = 'Admis')
+                WHERE etablissement = {etablissement};"""
+
+    ajouter("trg_candidats_insert_compteurs", "INSERT", "Candidats", creer_etablissement("NEW") + f"""
+                UPDATE Compteurs_Etablissements SET candidats = candidats + 1
+                WHERE etablissement = COALESCE(NEW.etablissement, '');""")
+    ajouter("trg_candidats_delete_compteurs", "DELETE", "Candidats", f"""UPDATE Compteurs_Etablissements SET candidats = candidats - 1
+                WHERE etablissement = COALESCE(OLD.etablissement, '');
+                {deplacer("OLD", "-", "COALESCE(OLD.etablissement, '')")}
+                {deplacer("OLD", "+", "''")}""", moment="BEFORE")
+    ajouter("trg_candidats_update_compteurs", "UPDATE OF etablissement, id_candidat", "Candidats",
+            creer_etablissement("NEW") + f"""
+                UPDATE Compteurs_Etablissements SET candidats = candidats - 1
+                WHERE etablissement = COALESCE(OLD.etablissement, '');
+                UPDATE Compteurs_Etablissements SET candidats = candidats + 1
+                WHERE etablissement = COALESCE(NEW.etablissement, '');
+                {deplacer("OLD", "-", "COALESCE(OLD.etablissement, '')")}
+                {deplacer("NEW", "+", "COALESCE(NEW.etablissement, '')")}""",
+            "\n            WHEN OLD.etablissement IS NOT NEW.etablissement OR OLD.id_candidat IS NOT NEW.id_candidat")
+    return declencheurs
+
+
+DECLENCHEURS_COMPTEURS = _declencheurs_compteurs()
+
+
+def creer_tables(cur, tables=None):
+    """Crée les tables demandées (toutes par défaut) si elles n'existent pas."""
+    for nom in tables or TABLES:
+        cur.execute(TABLES[nom])
+
+
+def creer_declencheurs(cur, remplacer=False):
+    """Crée les déclencheurs manquants (ils disparaissent avec leur table lors d'une reconstruction).
+
+    remplacer=True recrée aussi ceux qui existent, après un changement de leur définition.
+    """
+    for nom, definition in DECLENCHEURS.items():
+        if remplacer:
+            cur.execute(f"DROP TRIGGER IF EXISTS {nom}")
+        cur.execute(definition)
+
+
+def creer_versions_tables(cur):
+    """Crée Versions_Tables, une ligne par table versionnée, et les déclencheurs manquants."""
+    creer_tables(cur, ["Versions_Tables"])
+    cur.executemany("INSERT OR IGNORE INTO Versions_Tables (nom_table) VALUES (?)",
+                    [(table,) for table in TABLES_VERSIONNEES])
+    for definition in DECLENCHEURS_VERSIONS.values():
+        cur.execute(definition)
+
+
+def recalculer_compteurs(cur):
+    """Recalcule entièrement les tables Compteurs_* à partir des données."""
+    for table in TABLES_COMPTEURS:
+        cur.execute(f"DELETE FROM {table}")
+    # '' : délibérations sans statut, comptées dans le total des délibérés
+    cur.executemany("INSERT INTO Compteurs_Statuts (statut) VALUES (?)", [(s,) for s in STATUTS_DELIBERATION + [""]])
+    cur.execute("""
+        UPDATE Compteurs_Statuts SET nombre = D.nombre
+        FROM (SELECT COALESCE(statut, '') AS statut, COUNT(*) AS nombre FROM Deliberation GROUP BY 1) D
+        WHERE D.statut = Compteurs_Statuts.statut
+    """)
+    for tour, table in TABLES_NOTES_TOURS.items():
+        cur.execute(" UNION ALL ".join(
+            f"SELECT {tour}, '{m}', COUNT({m}), COALESCE(SUM({m}), 0), COALESCE(SUM({m} * {m}), 0) FROM {table}"
+            for m in matieres_notes(table)
+        ).join(["INSERT INTO Compteurs_Matieres (tour, matiere, nombre, somme, somme_carres) ", ""]))
+    cur.execute("INSERT INTO Compteurs_Etablissements (etablissement) VALUES ('')")
+    # Un seul parcours des candidats, puis les délibérations sans candidat sur l'établissement ''
+    cur.execute("""
+        INSERT INTO Compteurs_Etablissements (etablissement, candidats, deliberes, admis)
+        SELECT COALESCE(C.etablissement, ''), COUNT(*), COUNT(D.statut), COUNT(CASE D.statut WHEN 'Admis' THEN 1 END)
+        FROM Candidats C LEFT JOIN Deliberation D ON D.id_candidat = C.id_candidat
+        GROUP BY COALESCE(C.etablissement, '')
+        ON CONFLICT (etablissement) DO UPDATE SET
+            candidats = excluded.candidats, deliberes = excluded.deliberes, admis = excluded.admis
+    """)
+    cur.execute("""
+        UPDATE Compteurs_Etablissements SET deliberes = deliberes + O.nb_deliberes, admis = admis + O.nb_admis
+        FROM (SELECT COUNT(statut) AS nb_deliberes, COUNT(CASE statut WHEN 'Admis' THEN 1 END) AS nb_admis
+              FROM Deliberation WHERE id_candidat NOT IN (SELECT id_candidat FROM Candidats)) O
+        WHERE etablissement = ''
+    """)
+
+
+def creer_compteurs(cur):
+    """Crée les tables de compteurs et leurs déclencheurs, puis les alimente."""
+    creer_tables(cur, TABLES_COMPTEURS)
+    for definition in DECLENCHEURS_COMPTEURS.values():
+        cur.execute(definition)
+    recalculer_compteurs(cur)
+
+
+def retirer_declencheurs_compteurs(cur):
+    """Supprime les déclencheurs des compteurs (recréés par creer_compteurs)."""
+    for nom in DECLENCHEURS_COMPTEURS:
+        cur.execute(f"DROP TRIGGER IF EXISTS {nom}")
+
+
+@contextmanager
+def compteurs_suspendus(cur):
+    """Retire les déclencheurs des compteurs le temps d'un chargement massif, puis recalcule.
+
+    À utiliser dans la transaction du chargement : un recalcul ensembliste coûte bien
+    moins que la mise à jour des compteurs ligne par ligne (import de toute la cohorte).
+    """
+    if "Compteurs_Statuts" not in _tables_existantes(cur):
+        yield
+        return
+    retirer_declencheurs_compteurs(cur)
+    yield
+    creer_compteurs(cur)
+
+
+def creer_recherche_plein_texte(cur):
+    """Crée l'index plein texte des candidats et ses déclencheurs, puis l'alimente.
+
+    Retourne False si SQLite est compilé sans FTS5 : la recherche se rabat alors sur LIKE.
+    """
+    try:
+        cur.execute(TABLE_RECHERCHE)
+    except sqlite3.OperationalError:
+        return False
+    for definition in DECLENCHEURS_RECHERCHE.values():
+        cur.execute(definition)
+    cur.execute("INSERT INTO Candidats_FTS (Candidats_FTS) VALUES ('rebuild')")
+    return True
+
+
+def marquer_tous_a_recalculer(cur):
+    """Force le recalcul de tous les candidats au prochain rafraîchissement."""
+    cur.execute("INSERT OR IGNORE INTO Resultats_A_Recalculer SELECT id_candidat FROM Candidats")
+
+
+def index_existant(cur, table, colonnes):
+    """Vrai si un index de la table commence déjà par ces colonnes (UNIQUE compris)."""
+    for index in cur.execute(f"PRAGMA index_list({table})").fetchall():
+        colonnes_index = [ligne[2] for ligne in cur.execute(f"PRAGMA index_info({index[1]})")]
+        if colonnes_index[:len(colonnes)] == list(colonnes):
+            return True
+    return False
+
+
+def creer_index(cur, nom, table, colonnes):
+    """Crée l'index, sauf si une contrainte UNIQUE ou un autre index le rend inutile."""
+    if not index_existant(cur, table, colonnes):
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {nom} ON {table} ({', '.join(colonnes)})")
+
+
+def _signature(cur, table):
+    """Structure d'une table : colonnes, clés uniques et clés étrangères."""
+    colonnes = [(nom, type_.upper(), bool(notnull), pk)
+                for _, nom, type_, notnull, _, pk in cur.execute(f"PRAGMA table_info({table})")]
+    uniques = sorted(
+        tuple(ligne[2] for ligne in cur.execute(f"PRAGMA index_info({index[1]})").fetchall())
+        for index in cur.execute(f"PRAGMA index_list({table})").fetchall() if index[2]
+    )
+    etrangeres = sorted((ligne[2], ligne[3], ligne[4], ligne[6])
+                        for ligne in cur.execute(f"PRAGMA foreign_key_list({table})"))
+    return colonnes, uniques, etrangeres
+
+
+def _schema_reference():
+    reference = sqlite3.connect(":memory:")
+    creer_tables(reference.cursor())
+    return reference
+
+
+def _tables_existantes(cur):
+    return {nom for (nom,) in cur.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def verifier_schema(conn: sqlite3.Connection) -> List[str]:
+    """Retourne les tables existantes dont la structure diffère de la référence."""
+    reference = _schema_reference()
+    try:
+        existantes = _tables_existantes(conn.cursor())
+        return [
+            table for table in TABLES
+            if table in existantes
+            and _signature(conn.cursor(), table) != _signature(reference.cursor(), table)
+        ]
+    finally:
+        reference.close()
+
+
+def reparer_schema(conn: sqlite3.Connection, tables=None):
+    """Reconstruit les tables dégradées selon la définition de référence.
+
+    Les données des colonnes communes sont recopiées ; les lignes qui violent
+    les contraintes retrouvées (doublons, NULL, valeurs hors bornes) sont écartées.
+    Retourne {table: nombre de lignes écartées}.
+    """
+    tables = verifier_schema(conn) if tables is None else tables
+    if not tables:
+        return {}
+
+    cles_etrangeres = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+    conn.execute("PRAGMA foreign_keys = OFF")
+    ecartees = {}
+    try:
+        with conn:
+            cur = conn.cursor()
+            # Ces déclencheurs lisent Candidats : ils empêcheraient de renommer la table reconstruite
+            retirer_declencheurs_compteurs(cur)
+            for table in tables:
+                anciennes = [ligne[1] for ligne in cur.execute(f"PRAGMA table_info({table})")]
+                temporaire = f"{table}_reconstruction"
+                cur.execute(TABLES[table].replace(f"EXISTS {table} (", f"EXISTS {temporaire} (", 1))
+                nouvelles = [ligne[1] for ligne in cur.execute(f"PRAGMA table_info({temporaire})")]
+                communes = ", ".join(c for c in nouvelles if c in anciennes)
+
+                avant = cur.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                cur.execute(f"INSERT OR IGNORE INTO {temporaire} ({communes}) "
+                            f"SELECT {communes} FROM {table} ORDER BY rowid")
+                apres = cur.execute(f"SELECT COUNT(*) FROM {temporaire}").fetchone()[0]
+
+                cur.execute(f"DROP TABLE {table}")
+                cur.execute(f"ALTER TABLE {temporaire} RENAME TO {table}")
+                ecartees[table] = avant - apres
+
+            for nom, table, colonnes in INDEX:
+                if table in tables:
+                    creer_index(cur, nom, table, colonnes)
+
+            # Les données recopiées ont pu changer : résultats à recalculer
+            if "Resultats_A_Recalculer" in _tables_existantes(cur):
+                creer_declencheurs(cur)
+                marquer_tous_a_recalculer(cur)
+            if "Candidats" in tables and "Candidats_FTS" in _tables_existantes(cur):
+                creer_recherche_plein_texte(cur)
+            if "Compteurs_Statuts" in _tables_existantes(cur):
+                creer_compteurs(cur)
+            # Versions incrémentées : les documents en cache ne correspondent plus aux données
+            if "Versions_Tables" in _tables_existantes(cur):
+                creer_versions_tables(cur)
+                cur.execute("UPDATE Versions_Tables SET version = version + 1")
+    finally:
+        conn.execute(f"PRAGMA foreign_keys = {cles_etrangeres}")
+    return ecartees
@@ -0,0 +1,77 @@
+import numpy as np
+
+from models.bareme import (
+    COEFFICIENTS_TOUR1, COEFFICIENTS_TOUR2, SEUIL_ADMIS, SEUIL_ADMIS_TOUR2, SEUIL_MOYENNE_CYCLE, SEUIL_REPECHAGE,
+    SEUIL_REPECHAGE_SECOND_TOUR, SEUIL_SECOND_TOUR
+)
+
+# Index des colonnes EPS et épreuve facultative dans la matrice du 1er tour
+INDEX_EPS = len(COEFFICIENTS_TOUR1)
+INDEX_FACULTATIVE = INDEX_EPS + 1
+
+
+def tableau_notes(lignes, nb_colonnes):
+    """Convertit des lignes SQL en matrice float, les NULL devenant NaN."""
+    if not lignes:
+        return np.empty((0, nb_colonnes), dtype=float)
+    return np.array(lignes, dtype=float).reshape(-1, nb_colonnes)
+
+
+def _somme_ponderee(notes, coefficients):
+    """Somme colonne par colonne (même ordre que le calcul scalaire), NaN ignorés."""
+    points = np.zeros(notes.shape[0])
+    for i, coef in enumerate(coefficients.values()):
+        colonne = notes[:, i] * coef
+        points += np.where(np.isnan(colonne), 0, colonne)
+    return points
+
+
+def calculer_points_tour1(notes_tour1):
+    """Points du 1er tour (matières à coefficient) pour une matrice (n, 12)."""
+    return _somme_ponderee(notes_tour1, COEFFICIENTS_TOUR1)
+
+
+def calculer_bonus_malus(notes_tour1):
+    """Bonus/malus EPS et épreuve facultative pour une matrice (n, 12)."""
+    eps = notes_tour1[:, INDEX_EPS]
+    facultative = notes_tour1[:, INDEX_FACULTATIVE]
+
+    bonus_malus = np.zeros(notes_tour1.shape[0])
+    bonus_malus += np.where(np.isnan(eps), 0, eps - 10)
+    bonus_malus += np.where(facultative > 10, facultative - 10, 0)
+    return bonus_malus
+
+
+def calculer_points_tour2(notes_tour2, presence_tour2):
+    """Points du 2nd tour ; NaN pour les candidats sans notes du 2nd tour."""
+    points = _somme_ponderee(notes_tour2, COEFFICIENTS_TOUR2)
+    return np.where(presence_tour2, points, np.nan)
+
+
+def determiner_statuts(total_points, points_tour2, moyenne_cycle):
+    """Applique les règles RM4-RM9 à toute la cohorte."""
+    second_tour_passe = ~np.isnan(points_tour2)
+    with np.errstate(invalid="ignore"):
+        conditions = [
+            second_tour_passe & (points_tour2 >= SEUIL_ADMIS_TOUR2),
+            second_tour_passe,
+            total_points >= SEUIL_ADMIS,
+            (total_points >= SEUIL_SECOND_TOUR) & (total_points < SEUIL_REPECHAGE_SECOND_TOUR),
+            (total_points >= SEUIL_REPECHAGE) & (total_points < SEUIL_ADMIS),
+            moyenne_cycle >= SEUIL_MOYENNE_CYCLE,
+        ]
+    statuts = ["Admis", "Échec", "Admis", "2nd Tour", "Repêchage", "Repêchage"]
+    return np.select(conditions, statuts, default="Échec")
+
+
+def calculer_cohorte(notes_tour1, notes_tour2, presence_tour2, moyenne_cycle):
+    """Calcule total_points, points_tour2, bonus_malus et statut pour toute la cohorte.
+
+    notes_tour1 : (n, 12), notes_tour2 : (n, 3), presence_tour2 : (n,) booléen,
+    moyenne_cycle : (n,). Les notes absentes sont des NaN.
+    """
+    bonus_malus = calculer_bonus_malus(notes_tour1)
+    total_points = calculer_points_tour1(notes_tour1) + bonus_malus
+    points_tour2 = calculer_points_tour2(notes_tour2, presence_tour2)
+    statuts = determiner_statuts(total_points, points_tour2, moyenne_cycle)
+    return total_points, points_tour2, bonus_malus, statuts
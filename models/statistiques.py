@@ -0,0 +1,206 @@
+import math
+import sqlite3
+import time
+import warnings
+from typing import Dict, NamedTuple
+
+import numpy as np
+
+from models.bareme import COLONNES_TOUR1
+from models.instrumentation import CALCUL, chronometre
+
+# Statuts affichés, dans l'ordre des cartes et des graphiques
+STATUTS = ["Admis", "2nd Tour", "Échec", "Repêchage"]
+
+# Répartitions calculées (un ensemble de regroupement par dimension, plus le total)
+DIMENSIONS = ["sexe", "type_candidat", "etablissement"]
+NON_RENSEIGNE = "Non renseigné"
+
+# Centiles des notes par matière ; le 50e est la médiane
+CENTILES = [10, 25, 50, 75, 90]
+
+# Une ligne par candidat : dimensions, rang du statut dans STATUTS (len(STATUTS) si non délibéré),
+# notes du 1er tour
+_REQUETE_COHORTE = f"""
+    SELECT {', '.join(f'C.{d}' for d in DIMENSIONS)},
+           CASE D.statut {' '.join(f"WHEN '{statut}' THEN {i}" for i, statut in enumerate(STATUTS))}
+                ELSE {len(STATUTS)} END,
+           {', '.join(f'N.{m}' for m in COLONNES_TOUR1)}
+    FROM Candidats C
+    LEFT JOIN Deliberation D ON D.id_candidat = C.id_candidat
+    -- Première ligne de notes du candidat (index idx_notes_tour1_candidat), comme le moteur de délibération
+    LEFT JOIN Notes_Tour1 N ON N.id_note = (
+        SELECT MIN(id_note) FROM Notes_Tour1 WHERE id_candidat = C.id_candidat)
+"""
+
+# Effectif par statut ; les pourcentages sont rapportés à toutes les lignes de Deliberation
+_REQUETE_STATUTS = "SELECT statut, COUNT(*) FROM Deliberation GROUP BY statut"
+
+
+class StatistiquesCohorte(NamedTuple):
+    """Statistiques de la cohorte, partagées par le tableau de bord, la ligne de commande et le PV.
+
+    statuts : {statut: {"nombre", "pourcentage"}} (pourcentage des lignes de Deliberation)
+    matieres : {matiere: {"effectif", "moyenne", "ecart_type", "min", "p10", "p25", "mediane", "p75", "p90", "max"}}
+    repartitions : {dimension: {valeur: {"total", "deliberes", <statut>: nombre, "taux_admis"}}}
+    """
+    total_candidats: int
+    nb_deliberes: int
+    statuts: Dict[str, dict]
+    matieres: Dict[str, dict]
+    repartitions: Dict[str, Dict[str, dict]]
+    duree: float
+
+    def en_dict(self):
+        """Forme sérialisable en JSON."""
+        return self._asdict()
+
+
+def _pourcentage(nombre, total):
+    return round(nombre * 100 / total, 2) if total else 0.0
+
+
+def _statuts(par_statut, nb_deliberations):
+    """{statut: {"nombre", "pourcentage"}} pour chaque statut affiché."""
+    return {statut: {"nombre": par_statut.get(statut, 0),
+                     "pourcentage": _pourcentage(par_statut.get(statut, 0), nb_deliberations)}
+            for statut in STATUTS}
+
+
+def _valeur(x):
+    """Flottant numpy en nombre JSON ; NaN (aucune note) en None."""
+    return None if np.isnan(x) else round(float(x), 2)
+
+
+def _statistiques_matieres(notes):
+    """notes : tableau (matières, candidats), NaN pour une note absente."""
+    if not notes.shape[1]:
+        notes = np.full((len(COLONNES_TOUR1), 1), np.nan)
+    with warnings.catch_warnings():
+        # Matière sans aucune note : NaN attendu, pas d'avertissement
+        warnings.simplefilter("ignore", RuntimeWarning)
+        effectifs = np.count_nonzero(~np.isnan(notes), axis=1)
+        moyennes = np.nanmean(notes, axis=1)
+        ecarts = np.nanstd(notes, axis=1)
+        minimums, maximums = np.nanmin(notes, axis=1), np.nanmax(notes, axis=1)
+        centiles = np.nanpercentile(notes, CENTILES, axis=1)
+
+    resultat = {}
+    for i, matiere in enumerate(COLONNES_TOUR1):
+        stats = {"effectif": int(effectifs[i]), "moyenne": _valeur(moyennes[i]),
+                 "ecart_type": _valeur(ecarts[i]), "min": _valeur(minimums[i])}
+        stats.update({("mediane" if c == 50 else f"p{c}"): _valeur(centiles[j, i]) for j, c in enumerate(CENTILES)})
+        stats["max"] = _valeur(maximums[i])
+        resultat[matiere] = stats
+    return resultat
+
+
+def _repartition(valeurs, codes_statut):
+    """Effectifs par valeur de la dimension et par statut, en un seul comptage (bincount)."""
+    nb_codes = len(STATUTS) + 1  # Dernier code : non délibéré
+    modalites, groupes = np.unique(
+        np.array([NON_RENSEIGNE if v in (None, "") else str(v) for v in valeurs], dtype=str),
+        return_inverse=True)
+    if not len(modalites):
+        return {}
+    effectifs = np.bincount(groupes * nb_codes + codes_statut,
+                            minlength=len(modalites) * nb_codes).reshape(len(modalites), nb_codes)
+    repartition = {}
+    for modalite, ligne in zip(modalites.tolist(), effectifs.tolist()):
+        deliberes = sum(ligne[:-1])
+        groupe = {"total": sum(ligne), "deliberes": deliberes}
+        groupe.update(zip(STATUTS, ligne[:-1]))
+        groupe["taux_admis"] = _pourcentage(groupe["Admis"], deliberes)
+        repartition[modalite] = groupe
+    return repartition
+
+
+@chronometre(CALCUL)
+def calculer_statistiques(conn: sqlite3.Connection) -> StatistiquesCohorte:
+    """Toutes les statistiques de la cohorte en un seul parcours des candidats.
+
+    Les lignes sont lues une fois, puis chaque indicateur est un calcul vectoriel numpy
+    sur les colonnes : statistiques des notes par matière et répartitions par sexe,
+    type de candidat et établissement. Les effectifs par statut viennent d'un GROUP BY
+    sur Deliberation (index idx_deliberation_statut), base des pourcentages.
+    """
+    debut = time.perf_counter()
+    lignes = conn.execute(_REQUETE_COHORTE).fetchall()
+    total = len(lignes)
+    colonnes = list(zip(*lignes)) if lignes else [()] * (len(DIMENSIONS) + 1 + len(COLONNES_TOUR1))
+    nb_dimensions = len(DIMENSIONS)
+
+    codes_statut = np.array(colonnes[nb_dimensions], dtype=np.intp)
+    par_statut = dict(conn.execute(_REQUETE_STATUTS))
+    nb_deliberes = sum(par_statut.values())
+    statuts = _statuts(par_statut, nb_deliberes)
+
+    notes = np.array(colonnes[nb_dimensions + 1:], dtype=float).reshape(len(COLONNES_TOUR1), total)
+    repartitions = {dimension: _repartition(colonnes[i], codes_statut) for i, dimension in enumerate(DIMENSIONS)}
+
+    return StatistiquesCohorte(total, nb_deliberes, statuts, _statistiques_matieres(notes), repartitions,
+                               time.perf_counter() - debut)
+
+
+class CompteursCohorte(NamedTuple):
+    """Agrégats tenus à jour par déclencheurs (tables Compteurs_*), lus sans parcourir la cohorte.
+
+    statuts : comme StatistiquesCohorte.statuts
+    matieres, matieres_2nd_tour : {matiere: {"effectif", "moyenne", "ecart_type"}}, sur toutes
+        les lignes de Notes_Tour1 et Notes_Tour2
+    etablissements : {etablissement: {"total", "deliberes", "Admis", "taux_admis"}}
+    """
+    total_candidats: int
+    nb_deliberes: int
+    statuts: Dict[str, dict]
+    matieres: Dict[str, dict]
+    matieres_2nd_tour: Dict[str, dict]
+    etablissements: Dict[str, dict]
+
+    def en_dict(self):
+        """Forme sérialisable en JSON."""
+        return self._asdict()
+
+
+def _moments(nombre, somme, somme_carres):
+    """Effectif, moyenne et écart-type (de population, comme numpy) à partir des sommes."""
+    if not nombre:
+        return {"effectif": 0, "moyenne": None, "ecart_type": None}
+    moyenne = somme / nombre
+    # max : les arrondis des sommes peuvent donner une variance infinitésimalement négative
+    ecart_type = math.sqrt(max(somme_carres / nombre - moyenne * moyenne, 0.0))
+    return {"effectif": nombre, "moyenne": round(moyenne, 2), "ecart_type": round(ecart_type, 2)}
+
+
+def lire_compteurs(conn: sqlite3.Connection) -> CompteursCohorte:
+    """Lit les compteurs du tableau de bord : quelques dizaines de lignes, quelle que soit la cohorte."""
+    # La ligne '' (délibérations sans statut) compte dans le total, comme dans calculer_statistiques
+    par_statut = dict(conn.execute("SELECT statut, nombre FROM Compteurs_Statuts"))
+    nb_deliberes = sum(par_statut.values())
+    statuts = _statuts(par_statut, nb_deliberes)
+
+    matieres = {1: {}, 2: {}}
+    for tour, matiere, nombre, somme, somme_carres in conn.execute(
+            "SELECT tour, matiere, nombre, somme, somme_carres FROM Compteurs_Matieres ORDER BY tour, rowid"):
+        matieres[tour][matiere] = _moments(nombre, somme, somme_carres)
+
+    etablissements, total = {}, 0
+    for etablissement, candidats, deliberes, admis in conn.execute(
+            "SELECT etablissement, candidats, deliberes, admis FROM Compteurs_Etablissements ORDER BY etablissement"):
+        total += candidats
+        if candidats or deliberes:
+            groupe = {"total": candidats, "deliberes": deliberes, "Admis": admis,
+                      "taux_admis": _pourcentage(admis, deliberes)}
+            etablissements[etablissement or NON_RENSEIGNE] = groupe
+
+    return CompteursCohorte(total, nb_deliberes, statuts, matieres[1], matieres[2], etablissements)
+
+
+def statistiques_resultats(conn: sqlite3.Connection, statistiques=None) -> Dict[str, dict]:
+    """Retourne le total des candidats et, par statut, le nombre et le pourcentage de délibérés.
+
+    Forme : {"Total Candidats": n, "Admis": {"nombre": .., "pourcentage": ..}, ...}
+    statistiques : StatistiquesCohorte ou CompteursCohorte ; à défaut, les compteurs sont lus.
+    """
+    statistiques = statistiques or lire_compteurs(conn)
+    return {"Total Candidats": statistiques.total_candidats, **statistiques.statuts}
@@ -0,0 +1,70 @@
+import os
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+from benchmark import creer_base_synthetique
+from models.anonymats import attribuer_anonymats_manquants
+from database import create_database
+from models.database_manager import PRAGMAS_PAR_DEFAUT
+
+
+@pytest.fixture
+def chemin_base(tmp_path):
+    """Base vide créée par create_database (toutes les migrations appliquées)."""
+    chemin = str(tmp_path / "bfem.sqlite")
+    create_database(chemin)
+    return chemin
+
+
+@pytest.fixture
+def chemin_synthetique(tmp_path):
+    """Base remplie de 300 candidats aléatoires (notes, 2nd tour, livrets)."""
+    chemin = str(tmp_path / "synthetique.sqlite")
+    creer_base_synthetique(chemin, 300)
+    return chemin
+
+
+def _connexion(chemin):
+    # Mêmes réglages que les connexions de l'application (DatabaseManager) : clés étrangères
+    # non appliquées, REPLACE qui déclenche les déclencheurs DELETE
+    conn = sqlite3.connect(chemin)
+    for pragma, valeur in PRAGMAS_PAR_DEFAUT.items():
+        conn.execute(f"PRAGMA {pragma} = {valeur}")
+    return conn
+
+
+@pytest.fixture
+def conn(chemin_base):
+    with closing(_connexion(chemin_base)) as connexion:
+        yield connexion
+
+
+@pytest.fixture
+def conn_synthetique(chemin_synthetique):
+    with closing(_connexion(chemin_synthetique)) as connexion:
+        yield connexion
+
+
+@pytest.fixture
+def conn_saisie(conn_synthetique):
+    """Vingt candidats avec anonymats, sans notes ni résultats à recalculer."""
+    conn = conn_synthetique
+    with conn:
+        conn.execute("DELETE FROM Candidats WHERE id_candidat > 20")
+        conn.execute("DELETE FROM Notes_Tour1")
+        conn.execute("DELETE FROM Notes_Tour2")
+    attribuer_anonymats_manquants(conn)
+    with conn:
+        conn.execute("DELETE FROM Resultats_A_Recalculer")
+    return conn
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """QApplication sans affichage, partagée par les tests des vues."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+
+    return QApplication.instance() or QApplication([])
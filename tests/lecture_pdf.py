@@ -0,0 +1,26 @@
+import re
+
+
+def verifier_pdf(chemin):
+    """Vérifie la structure d'un PDF produit par FPDF et retourne son nombre de pages.
+
+    En-tête, %%EOF, startxref pointant sur la table xref, et chaque entrée de la table
+    pointant sur l'objet qu'elle référence.
+    """
+    with open(chemin, "rb") as fichier:
+        contenu = fichier.read()
+    assert contenu.startswith(b"%PDF-1.")
+    assert contenu.rstrip().endswith(b"%%EOF")
+
+    debut_xref = int(re.search(rb"startxref\n(\d+)\n%%EOF\s*$", contenu).group(1))
+    assert contenu[debut_xref:].startswith(b"xref\n")
+    entete, *entrees = contenu[debut_xref:].split(b"trailer")[0].splitlines()[1:]
+    premier, nombre = map(int, entete.split())
+    assert len(entrees) == nombre
+    for numero, entree in enumerate(entrees[1:], premier + 1):
+        position = int(entree[:10])
+        assert contenu[position:].startswith(f"{numero} 0 obj".encode()), numero
+
+    nb_pages = int(re.search(rb"/Type /Pages\n/Kids \[[^\]]*\]\n/Count (\d+)", contenu).group(1))
+    assert len(re.findall(rb"/Type /Page\n", contenu)) == nb_pages
+    return nb_pages
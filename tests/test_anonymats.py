@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from models.anonymats import PLAGE_PAR_DEFAUT, attribuer_anonymats_manquants, charger_plage, tirer_numeros
+
+
+def test_numeros_distincts_hors_numeros_utilises():
+    utilises = np.arange(1000, 1500, 3)
+    numeros = tirer_numeros(2000, 1000, 4999, utilises, rng=np.random.default_rng(0))
+    assert len(set(numeros.tolist())) == 2000
+    assert numeros.min() >= 1000 and numeros.max() <= 4999
+    assert not set(numeros.tolist()) & set(utilises.tolist())
+
+
+def test_plage_presque_pleine_entierement_attribuee():
+    utilises = [10, 11, 13, 14, 16, 18, 19]
+    numeros = tirer_numeros(3, 10, 19, utilises + [5, 25], rng=np.random.default_rng(1))
+    assert sorted(numeros.tolist()) == [12, 15, 17]
+
+
+def test_plage_insuffisante():
+    with pytest.raises(ValueError, match="insuffisante"):
+        tirer_numeros(4, 10, 19, [10, 11, 12, 13, 14, 15, 16])
+
+
+def test_attribution_des_anonymats_manquants(conn_synthetique):
+    conn = conn_synthetique
+    premier, dernier = charger_plage()
+    assert attribuer_anonymats_manquants(conn) == 300
+    assert attribuer_anonymats_manquants(conn) == 0
+
+    numeros = [n for (n,) in conn.execute("SELECT numero_anonymat FROM Anonymats")]
+    assert len(numeros) == len(set(numeros)) == 300
+    assert premier <= min(numeros) and max(numeros) <= dernier
+
+
+def test_un_anonymat_par_candidat_pour_les_deux_tours(conn_synthetique):
+    conn = conn_synthetique
+    with conn:
+        conn.execute("DELETE FROM Candidats WHERE id_candidat > 20")
+    assert attribuer_anonymats_manquants(conn) == 20
+    attribues = dict(conn.execute("SELECT id_candidat, numero_anonymat FROM Anonymats"))
+
+    # Candidats ajoutés avant le second tour : eux seuls reçoivent un numéro, les autres gardent le leur
+    with conn:
+        conn.execute("""
+            INSERT INTO Candidats (numero_table, prenom, nom, date_naissance, lieu_naissance, sexe,
+                                   nationalite, choix_epr_facultative, aptitude_sportive)
+            VALUES (100001, 'Awa', 'Diop', '2008-01-01', 'Thiès', 'F', 'SEN', 0, 1)
+        """)
+    assert attribuer_anonymats_manquants(conn) == 1
+    tous = dict(conn.execute("SELECT id_candidat, numero_anonymat FROM Anonymats"))
+    assert {c: tous[c] for c in attribues} == attribues
+    assert len(tous) == len(set(tous.values())) == 21
+    assert conn.execute("SELECT DISTINCT tour FROM Anonymats").fetchall() == [(1,)]
+
+
+def test_plage_lue_dans_la_configuration(tmp_path):
+    config = tmp_path / "config.json"
+    assert charger_plage(str(config)) == PLAGE_PAR_DEFAUT
+    config.write_text('{"anonymats": [5000, 5999]}', encoding="utf-8")
+    assert charger_plage(str(config)) == (5000, 5999)
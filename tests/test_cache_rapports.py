@@ -0,0 +1,63 @@
+import sqlite3
+from contextlib import closing
+
+from models.cache_rapports import cle_document
+from models.rapports_pdf import (
+    construire_liste_anonymats, construire_liste_candidats, enregistrer_pdf
+)
+
+
+def test_cle_stable_tant_que_les_tables_lues_sont_inchangees(conn_synthetique):
+    conn = conn_synthetique
+    cle = cle_document(conn, "liste", ["Candidats"])
+    assert cle and cle == cle_document(conn, "liste", ["Candidats"])
+
+    # Tables hors dépendances (notes non versionnées, utilisateurs) : même clé
+    with conn:
+        conn.execute("UPDATE Notes_Tour1 SET svt = 12 WHERE id_candidat = 1")
+        conn.execute("UPDATE Utilisateurs SET mot_de_passe = 'x'")
+    assert cle_document(conn, "liste", ["Candidats"]) == cle
+
+    with conn:
+        conn.execute("UPDATE Candidats SET nom = 'SARR' WHERE id_candidat = 1")
+    assert cle_document(conn, "liste", ["Candidats"]) != cle
+
+
+def test_cle_distincte_par_document_et_complements(conn_synthetique):
+    conn = conn_synthetique
+    cles = {
+        cle_document(conn, "liste", ["Candidats"]),
+        cle_document(conn, "autre", ["Candidats"]),
+        cle_document(conn, "liste", ["Candidats", "Anonymats"]),
+        cle_document(conn, "liste", ["Candidats"], "01/07/2026"),
+        cle_document(conn, "liste", ["Candidats"], "02/07/2026"),
+    }
+    assert len(cles) == 5
+
+
+def test_sans_cle_pour_une_base_en_memoire_ou_sans_versions():
+    with closing(sqlite3.connect(":memory:")) as conn:
+        assert cle_document(conn, "liste", ["Candidats"]) is None
+    with closing(sqlite3.connect(":memory:")) as conn:
+        conn.execute("CREATE TABLE Versions_Tables (nom_table TEXT PRIMARY KEY, version INTEGER)")
+        assert cle_document(conn, "liste", ["Candidats"]) is None
+
+
+def test_document_servi_depuis_le_cache_puis_reconstruit(conn_synthetique, tmp_path):
+    conn = conn_synthetique
+    premier = enregistrer_pdf(conn, construire_liste_candidats, str(tmp_path / "a.pdf"))
+    second = enregistrer_pdf(conn, construire_liste_candidats, str(tmp_path / "b.pdf"))
+    assert not premier.depuis_cache and second.depuis_cache
+    assert (tmp_path / "a.pdf").read_bytes() == (tmp_path / "b.pdf").read_bytes()
+
+    # Une autre dépendance modifiée n'invalide que les documents qui la lisent
+    with conn:
+        conn.execute("INSERT INTO Anonymats (id_candidat, numero_anonymat, tour) VALUES (1, 4242, 1)")
+    assert enregistrer_pdf(conn, construire_liste_candidats, str(tmp_path / "c.pdf")).depuis_cache
+    assert not enregistrer_pdf(conn, construire_liste_anonymats, str(tmp_path / "d.pdf")).depuis_cache
+
+    with conn:
+        conn.execute("DELETE FROM Candidats WHERE id_candidat = 2")
+    troisieme = enregistrer_pdf(conn, construire_liste_candidats, str(tmp_path / "e.pdf"))
+    assert not troisieme.depuis_cache and troisieme.nb_lignes == premier.nb_lignes - 1
+    assert not enregistrer_pdf(conn, construire_liste_candidats, str(tmp_path / "f.pdf"), cache=False).depuis_cache
@@ -0,0 +1,98 @@
+import json
+import shutil
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+from cli import main
+from models.database_manager import DatabaseManager
+from tests.lecture_pdf import verifier_pdf
+
+
+@pytest.fixture
+def base(chemin_synthetique):
+    """Base synthétique ; les connexions ouvertes par les commandes sont fermées ensuite."""
+    yield chemin_synthetique
+    DatabaseManager.fermer_connexions()
+
+
+def executer(capsys, *argv):
+    """Lance la commande ; retourne (code de sortie, sortie standard, sortie d'erreur)."""
+    code = main(list(argv))
+    sortie = capsys.readouterr()
+    return code, sortie.out, sortie.err
+
+
+def test_base_absente(capsys, tmp_path):
+    code, _, erreur = executer(capsys, "--base", str(tmp_path / "absente.sqlite"), "deliberer")
+    assert code == 1 and "n'existe pas" in erreur
+
+
+def test_deliberation_complete(base, capsys):
+    assert executer(capsys, "--base", base, "anonymats")[:2] == (0, "300 anonymat(s) attribué(s)\n")
+    assert executer(capsys, "--base", base, "anonymats")[1] == "0 anonymat(s) attribué(s)\n"
+
+    code, sortie, _ = executer(capsys, "--base", base, "deliberer")
+    assert code == 0 and sortie.startswith("300 candidat(s) recalculé(s)")
+    assert executer(capsys, "--base", base, "deliberer")[1].startswith("0 candidat(s)")
+    code, sortie, _ = executer(capsys, "--base", base, "finaliser")
+    assert code == 0 and sortie.startswith("300 candidat(s) enregistré(s)")
+
+    code, sortie, _ = executer(capsys, "--base", base, "statistiques", "--json")
+    statistiques = json.loads(sortie)
+    assert code == 0 and statistiques["Total Candidats"] == 300
+    assert sum(statistiques[statut]["nombre"] for statut in ("Admis", "2nd Tour", "Repêchage", "Échec")) == 300
+    code, sortie, _ = executer(capsys, "--base", base, "statistiques", "--detail")
+    assert code == 0 and "mathematiques" in sortie
+
+
+def test_pv_sans_parametres_du_jury(base, capsys, tmp_path):
+    executer(capsys, "--base", base, "finaliser")
+    chemin = tmp_path / "pv.pdf"
+    code, sortie, erreur = executer(capsys, "--base", base, "pdf", "pv", "-o", str(chemin))
+
+    assert code == 1 and sortie == ""
+    assert erreur.startswith("Erreur : Informations du jury non trouvées")
+    assert not chemin.exists()
+
+
+def test_pdf_puis_cache(base, capsys, tmp_path):
+    code, sortie, _ = executer(capsys, "--base", base, "pdf", "candidats", "-o", str(tmp_path / "a.pdf"))
+    assert code == 0 and "300 lignes" in sortie
+    assert verifier_pdf(tmp_path / "a.pdf") > 1
+    code, sortie, _ = executer(capsys, "--base", base, "pdf", "candidats", "-o", str(tmp_path / "b.pdf"))
+    assert code == 0 and "repris du cache" in sortie
+
+
+def test_releves_fusionnes_par_etablissement(base, capsys, tmp_path):
+    executer(capsys, "--base", base, "anonymats")
+    # Les notes synthétiques portent le numéro de table : rattachement aux anonymats attribués
+    with closing(sqlite3.connect(base)) as conn, conn:
+        conn.execute("""
+            UPDATE Notes_Tour1 SET anonymat = (
+                SELECT numero_anonymat FROM Anonymats A WHERE A.id_candidat = Notes_Tour1.id_candidat)
+        """)
+    chemin = tmp_path / "releves.pdf"
+    code, sortie, _ = executer(capsys, "--base", base, "releves", "--etablissement", "Etablissement 1",
+                               "--fusionner", str(chemin))
+    # Candidats 1, 41, ..., 281 : i % 40 == 1
+    assert code == 0 and sortie.startswith("8 relevé(s), 8 pages")
+    assert verifier_pdf(chemin) == 8
+
+    code, _, erreur = executer(capsys, "--base", base, "releves", "--etablissement", "Inconnu",
+                               "-o", str(tmp_path / "vide"))
+    assert code == 1 and "Aucun relevé" in erreur
+
+
+def test_consolider_signale_les_centres_en_erreur(base, capsys, tmp_path):
+    dossier = tmp_path / "centres"
+    dossier.mkdir()
+    shutil.copyfile(base, dossier / "centre.sqlite")
+    (dossier / "corrompu.sqlite").write_bytes(b"pas une base" * 100)
+    synthese = str(tmp_path / "synthese.sqlite")
+
+    code, sortie, erreur = executer(capsys, "consolider", str(dossier), "--synthese", synthese, "--processus", "1")
+    assert code == 1
+    assert sortie.startswith("2 centre(s), 300 candidats consolidés") and "(1 centre(s) en erreur)" in sortie
+    assert "[2/2] corrompu (erreur : DatabaseError" in erreur
@@ -0,0 +1,70 @@
+import pytest
+
+from models.deliberation_engine import finaliser_resultats
+from models.schema import TABLES_COMPTEURS, recalculer_compteurs
+from models.statistiques import calculer_statistiques, lire_compteurs
+
+
+def _compteurs(conn):
+    """Contenu des tables Compteurs_*, sommes arrondies, sans les établissements devenus vides."""
+    contenu = {}
+    for table in TABLES_COMPTEURS:
+        lignes = [tuple(round(v, 6) if isinstance(v, float) else v for v in ligne)
+                  for ligne in conn.execute(f"SELECT * FROM {table} ORDER BY 1, 2")]
+        if table == "Compteurs_Etablissements":
+            lignes = [ligne for ligne in lignes if any(ligne[1:])]
+        contenu[table] = lignes
+    return contenu
+
+
+def _verifier_compteurs(conn):
+    tenus = _compteurs(conn)
+    with conn:
+        recalculer_compteurs(conn.cursor())
+    assert tenus == _compteurs(conn)
+
+
+@pytest.mark.parametrize("cles_etrangeres", ["OFF", "ON"])
+def test_suppression_de_candidats(conn_synthetique, cles_etrangeres):
+    conn = conn_synthetique
+    finaliser_resultats(conn)
+    conn.execute(f"PRAGMA foreign_keys = {cles_etrangeres}")
+    with conn:
+        conn.execute("UPDATE Deliberation SET statut = NULL WHERE id_candidat BETWEEN 20 AND 29")
+        conn.execute("DELETE FROM Candidats WHERE id_candidat <= 25")
+    orphelines = conn.execute("SELECT COUNT(*) FROM Deliberation WHERE id_candidat <= 25").fetchone()[0]
+    # Connexions de l'application (OFF) : les délibérations restent, sans candidat, jusqu'à la
+    # prochaine finalisation ; ON : la cascade ON DELETE du schéma les efface
+    assert orphelines == (25 if cles_etrangeres == "OFF" else 0)
+    _verifier_compteurs(conn)
+
+    finaliser_resultats(conn)
+    assert conn.execute("SELECT COUNT(*) FROM Deliberation WHERE id_candidat <= 25").fetchone() == (0,)
+    _verifier_compteurs(conn)
+
+
+def test_insert_or_replace(conn_synthetique):
+    conn = conn_synthetique
+    finaliser_resultats(conn)
+    with conn:
+        conn.execute("""
+            INSERT OR REPLACE INTO Deliberation (id_candidat, points_tour1, statut)
+            SELECT id_candidat, points_tour1, CASE WHEN statut = 'Admis' THEN 'Échec' ELSE 'Admis' END
+            FROM Deliberation WHERE id_candidat <= 40
+        """)
+        conn.execute("""
+            INSERT OR REPLACE INTO Notes_Tour1 (id_note, id_candidat, anonymat, mathematiques)
+            SELECT id_note, id_candidat, anonymat, 10 FROM Notes_Tour1 WHERE id_candidat <= 40
+        """)
+    _verifier_compteurs(conn)
+
+
+def test_tableau_de_bord_conforme_au_calcul(conn_synthetique):
+    conn = conn_synthetique
+    finaliser_resultats(conn)
+    with conn:
+        conn.execute("UPDATE Deliberation SET statut = NULL WHERE id_candidat <= 10")
+    compteurs, stats = lire_compteurs(conn), calculer_statistiques(conn)
+
+    assert compteurs.nb_deliberes == stats.nb_deliberes == 300
+    assert compteurs.statuts == stats.statuts
@@ -0,0 +1,79 @@
+import sqlite3
+from collections import Counter
+from contextlib import closing
+
+import numpy as np
+import pytest
+
+from benchmark import creer_base_synthetique
+from models.consolidation import BORNES_HISTOGRAMME, STATUTS, consolider, traiter_centre
+from models.deliberation_engine import charger_resultats
+
+
+@pytest.fixture
+def dossier_centres(tmp_path):
+    """Deux centres valides de tailles différentes, une base corrompue et une note non numérique."""
+    dossier = tmp_path / "centres"
+    (dossier / "nord").mkdir(parents=True)
+    creer_base_synthetique(str(dossier / "dakar.sqlite"), 120, graine=1)
+    creer_base_synthetique(str(dossier / "nord" / "thies.sqlite"), 80, graine=2)
+    (dossier / "corrompu.sqlite").write_bytes(b"ceci n'est pas une base SQLite" * 100)
+    creer_base_synthetique(str(dossier / "saisie.db"), 10, graine=3)
+    with closing(sqlite3.connect(dossier / "saisie.db")) as conn, conn:
+        # Comme une base saisie avant l'ajout des contraintes CHECK
+        conn.execute("PRAGMA ignore_check_constraints = ON")
+        conn.execute("UPDATE Notes_Tour1 SET mathematiques = 'abs' WHERE id_candidat = 1")
+    return dossier
+
+
+def _attendus(chemins):
+    statuts, points = Counter(), []
+    for chemin in chemins:
+        with closing(sqlite3.connect(chemin)) as conn:
+            resultats = charger_resultats(conn)
+        statuts.update(r.statut for r in resultats)
+        points += [r.points_tour1 for r in resultats]
+    tranches = np.searchsorted(BORNES_HISTOGRAMME, points, side="right") - 1
+    histogramme = np.bincount(tranches.clip(0, len(BORNES_HISTOGRAMME) - 1), minlength=len(BORNES_HISTOGRAMME))
+    return statuts, histogramme.tolist()
+
+
+def test_erreurs_rapportees_dans_le_bilan(dossier_centres):
+    corrompu = traiter_centre(str(dossier_centres / "corrompu.sqlite"))
+    assert corrompu.erreur.startswith("DatabaseError")
+    # Erreur hors SQLite : la note texte fait échouer la conversion NumPy
+    saisie = traiter_centre(str(dossier_centres / "saisie.db"))
+    assert saisie.erreur.startswith("ValueError")
+    assert (saisie.nb_candidats, saisie.nb_deliberes, sum(saisie.histogramme)) == (0, 0, 0)
+
+
+def test_synthese_des_centres_valides(dossier_centres, tmp_path):
+    base_synthese = str(tmp_path / "synthese.sqlite")
+    rapport = consolider(str(dossier_centres), base_synthese, processus=1)
+
+    assert (rapport.nb_centres, rapport.nb_erreurs, rapport.nb_candidats) == (4, 2, 200)
+    statuts, histogramme = _attendus([dossier_centres / "dakar.sqlite", dossier_centres / "nord" / "thies.sqlite"])
+    with closing(sqlite3.connect(base_synthese)) as conn:
+        erreurs = dict(conn.execute("SELECT centre, erreur IS NOT NULL FROM Centres"))
+        synthese = {statut: (nombre, pourcentage) for statut, nombre, pourcentage
+                    in conn.execute("SELECT statut, nombre, pourcentage FROM Synthese_Statuts")}
+        lignes = conn.execute("SELECT borne_inf, borne_sup, nombre FROM Synthese_Histogramme ORDER BY borne_inf")
+        synthese_histogramme = [tuple(ligne) for ligne in lignes]
+
+    assert erreurs == {"dakar": 0, "nord/thies": 0, "corrompu": 1, "saisie": 1}
+    total = sum(statuts.values())
+    assert total == 200
+    assert synthese == {s: (statuts[s], round(statuts[s] * 100 / total, 2)) for s in STATUTS}
+    bornes = list(zip(BORNES_HISTOGRAMME, BORNES_HISTOGRAMME[1:] + [None]))
+    assert synthese_histogramme == [(inf, sup, n) for (inf, sup), n in zip(bornes, histogramme)]
+
+
+def test_reconsolidation_remplace_les_centres(dossier_centres, tmp_path):
+    base_synthese = str(tmp_path / "synthese.sqlite")
+    consolider(str(dossier_centres), base_synthese, processus=1)
+    (dossier_centres / "corrompu.sqlite").unlink()
+    consolider(str(dossier_centres), base_synthese, processus=2)
+
+    with closing(sqlite3.connect(base_synthese)) as conn:
+        assert conn.execute("SELECT SUM(nombre) FROM Synthese_Statuts").fetchone()[0] == 200
+        assert conn.execute("SELECT SUM(nombre) FROM Synthese_Histogramme").fetchone()[0] == 200
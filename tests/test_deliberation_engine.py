@@ -0,0 +1,21 @@
+from benchmark import deliberation_par_ligne
+from models.deliberation_engine import charger_resultats
+
+
+def test_moteur_identique_au_calcul_par_candidat(conn_synthetique):
+    resultats = charger_resultats(conn_synthetique)
+    obtenus = [(r.points_tour1, r.points_tour2, r.moyenne_cycle, r.bonus_malus, r.statut) for r in resultats]
+    assert obtenus == deliberation_par_ligne(conn_synthetique)
+
+
+def test_resultats_par_numero_de_table(conn_synthetique):
+    numeros = [r.numero_table for r in charger_resultats(conn_synthetique)]
+    assert numeros == sorted(numeros)
+
+
+def test_candidat_sans_notes_ignore(conn_synthetique):
+    with conn_synthetique:
+        conn_synthetique.execute("DELETE FROM Notes_Tour1 WHERE id_candidat = 7")
+    resultats = charger_resultats(conn_synthetique)
+    assert 7 not in {r.id_candidat for r in resultats}
+    assert len(resultats) == len(deliberation_par_ligne(conn_synthetique))
@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Durée d'import cumulée maximale de chaque module de démarrage, en millisecondes
+BUDGET_DEMARRAGE_MS = 400
+
+# Dépendances lourdes que le démarrage ne doit charger qu'à la demande
+IMPORTS_DIFFERES = {"pandas", "numpy", "fpdf", "openpyxl", "PyQt5.QtChart"}
+
+
+def mesurer_import(module):
+    """Importe le module dans un interpréteur neuf avec -X importtime.
+
+    Retourne (durée cumulée en millisecondes, ensemble des modules chargés).
+    """
+    sortie = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=RACINE, capture_output=True, text=True, check=True
+    ).stderr
+    charges, duree = set(), 0
+    for ligne in sortie.splitlines():
+        if not ligne.startswith("import time:") or "|" not in ligne:
+            continue
+        _, cumul, nom = (champ.strip() for champ in ligne.split("|"))
+        if not cumul.isdigit():
+            continue  # Ligne d'en-tête
+        charges.add(nom)
+        if nom == module:
+            duree = int(cumul) / 1000
+    return duree, charges
+
+
+@pytest.mark.parametrize("module", ["views.login_window", "views.main_menu"])
+def test_demarrage_dans_le_budget(module):
+    duree, charges = mesurer_import(module)
+    assert module in charges
+    assert sorted(IMPORTS_DIFFERES & charges) == []
+    assert duree <= BUDGET_DEMARRAGE_MS, f"{module} : {duree:.0f} ms"
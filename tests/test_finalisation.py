@@ -0,0 +1,39 @@
+from models.deliberation_engine import finaliser_resultats, lire_resultats
+
+
+def _deliberations(conn):
+    return {id_candidat: (id_deliberation, statut) for id_deliberation, id_candidat, statut
+            in conn.execute("SELECT id_deliberation, id_candidat, statut FROM Deliberation")}
+
+
+def test_finalisation_enregistre_les_resultats(conn_synthetique):
+    assert finaliser_resultats(conn_synthetique) == 300
+    attendus = {r.id_candidat: r.statut for r in lire_resultats(conn_synthetique)}
+    assert {i: statut for i, (_, statut) in _deliberations(conn_synthetique).items()} == attendus
+
+
+def test_nouvelle_finalisation_met_a_jour_sans_reinserer(conn_synthetique):
+    conn = conn_synthetique
+    finaliser_resultats(conn)
+    avant = _deliberations(conn)
+    with conn:
+        conn.execute("UPDATE Notes_Tour1 SET " + ", ".join(
+            f"{m} = 20" for m in ("compo_francais", "mathematiques", "histoire_geographie", "svt", "pc_lv2",
+                                  "anglais_ecrit")) + " WHERE id_candidat = 3")
+        conn.execute("DELETE FROM Notes_Tour2 WHERE id_candidat = 3")
+    finaliser_resultats(conn)
+    apres = _deliberations(conn)
+
+    assert apres[3] == (avant[3][0], "Admis")
+    assert {i: ligne[0] for i, ligne in apres.items()} == {i: ligne[0] for i, ligne in avant.items()}
+
+
+def test_deliberations_orphelines_retirees(conn_synthetique):
+    conn = conn_synthetique
+    finaliser_resultats(conn)
+    conn.execute("PRAGMA foreign_keys = OFF")
+    with conn:
+        conn.execute("DELETE FROM Candidats WHERE id_candidat = 4")
+    finaliser_resultats(conn)
+    assert 4 not in _deliberations(conn)
+    assert len(_deliberations(conn)) == 299
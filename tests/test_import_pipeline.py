@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+
+from benchmark import feuille_synthetique
+from models.import_pipeline import FEUILLE_CANDIDATS, import_interrompu, importer_dataframe, importer_en_flux
+
+
+def test_import_groupe(conn):
+    rapport = importer_dataframe(conn, feuille_synthetique(200))
+    assert (rapport.nb_candidats, rapport.nb_lignes) == (200, 800)
+    for table in ("Candidats", "Anonymats", "Livret_Scolaire", "Notes_Tour1"):
+        assert conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == 200
+
+
+def test_numeros_de_table_saisis_en_texte(conn):
+    # Cellules au format texte dans le classeur : " 012" est enregistré comme l'entier 12
+    feuille = feuille_synthetique(20)
+    feuille["N° de table"] = feuille["N° de table"].astype(object)
+    feuille.loc[2, "N° de table"] = str(feuille.loc[2, "N° de table"])
+    feuille.loc[11, "N° de table"] = f" 0{feuille.loc[11, 'N° de table']}"
+    rapport = importer_dataframe(conn, feuille)
+
+    assert (rapport.nb_candidats, rapport.nb_lignes) == (20, 80)
+    for table in ("Anonymats", "Livret_Scolaire", "Notes_Tour1"):
+        assert conn.execute(f"""
+            SELECT COUNT(*) FROM {table} T JOIN Candidats C ON C.id_candidat = T.id_candidat
+            WHERE typeof(C.numero_table) = 'integer'
+        """).fetchone()[0] == 20
+
+
+class Interruption(Exception):
+    pass
+
+
+def _feuille_avec_lignes_vides(nb_candidats):
+    """Feuille synthétique avec une ligne vide toutes les 7 lignes."""
+    feuille = feuille_synthetique(nb_candidats)
+    vide = feuille.iloc[:0].reindex([0])
+    morceaux = [part for debut in range(0, nb_candidats, 7) for part in (feuille.iloc[debut:debut + 7], vide)]
+    return pd.concat(morceaux, ignore_index=True)
+
+
+@pytest.mark.parametrize("extension", ["csv", "xlsx"])
+def test_reprise_apres_interruption_avec_lignes_vides(conn, tmp_path, extension):
+    feuille = _feuille_avec_lignes_vides(50)
+    chemin = str(tmp_path / f"candidats.{extension}")
+    if extension == "csv":
+        feuille.to_csv(chemin, index=False)
+        with open(chemin, "a", encoding="utf-8") as fichier:
+            fichier.write("\n\n")  # Lignes entièrement vides en fin de fichier
+    else:
+        feuille.to_excel(chemin, sheet_name=FEUILLE_CANDIDATS, index=False)
+
+    def interrompre(lignes_importees, total):
+        raise Interruption
+
+    with pytest.raises(Interruption):
+        importer_en_flux(conn, chemin, taille_lot=12, progression=interrompre)
+    # La progression compte les lignes non vides, c'est-à-dire les candidats validés
+    deja_importes = conn.execute("SELECT COUNT(*) FROM Candidats").fetchone()[0]
+    assert 0 < import_interrompu(conn, chemin) == deja_importes < 50
+
+    rapport = importer_en_flux(conn, chemin, taille_lot=12)
+    assert rapport.nb_candidats == 50 - deja_importes
+    numeros = [n for (n,) in conn.execute("SELECT numero_table FROM Candidats ORDER BY numero_table")]
+    assert numeros == list(range(1, 51))
+    assert import_interrompu(conn, chemin) == 0
@@ -0,0 +1,90 @@
+import time
+
+import pytest
+
+from models import instrumentation
+from models.database_manager import DatabaseManager
+from models.instrumentation import AFFICHAGE, CALCUL, RENDU, REQUETE
+
+
+@pytest.fixture
+def mesures(tmp_path):
+    """Active les mesures, journal dans le dossier temporaire ; tout est remis en état ensuite."""
+    reglages = dict(instrumentation.REGLAGES_PAR_DEFAUT, journal=str(tmp_path / "performances.log"))
+    instrumentation.fermer_journal()
+    instrumentation.reinitialiser()
+    instrumentation.activer(True, reglages)
+    yield reglages
+    instrumentation.activer(False, reglages)
+    instrumentation.reinitialiser()
+    instrumentation.fermer_journal()
+
+
+def test_connexion_partagee_suit_l_activation(chemin_base, mesures):
+    instrumentation.activer(False, mesures)
+    conn = DatabaseManager.obtenir_connexion(chemin_base)
+    try:
+        conn.execute("SELECT COUNT(*) FROM Candidats").fetchall()
+        assert instrumentation.resume() == []
+
+        # Même connexion, mesurée dès l'activation
+        instrumentation.activer(True, mesures)
+        assert DatabaseManager.obtenir_connexion(chemin_base) is conn
+        conn.execute("SELECT COUNT(*) FROM Candidats").fetchall()
+        operations = {(s.categorie, s.operation) for s in instrumentation.resume()}
+        assert operations == {(REQUETE, "SELECT COUNT(*) FROM Candidats"),
+                              (REQUETE, "SELECT COUNT(*) FROM Candidats (lecture)")}
+    finally:
+        DatabaseManager.fermer_connexions()
+
+
+def test_mesurer_et_chronometre_cumulent(mesures):
+    @instrumentation.chronometre(CALCUL)
+    def calculer(x):
+        return x * 2
+
+    @instrumentation.chronometre(RENDU, "Relevé")
+    def echouer():
+        raise ValueError("interrompu")
+
+    assert [calculer(i) for i in range(3)] == [0, 2, 4]
+    with pytest.raises(ValueError):
+        echouer()
+    for _ in range(2):
+        with instrumentation.mesurer(AFFICHAGE, "Remplissage"):
+            time.sleep(0.01)
+
+    statistiques = {(s.categorie, s.operation): s for s in instrumentation.resume()}
+    assert set(statistiques) == {(CALCUL, calculer.__qualname__), (RENDU, "Relevé"), (AFFICHAGE, "Remplissage")}
+    assert statistiques[CALCUL, calculer.__qualname__].appels == 3
+    assert statistiques[RENDU, "Relevé"].appels == 1  # Mesuré malgré l'exception
+    remplissage = statistiques[AFFICHAGE, "Remplissage"]
+    assert remplissage.appels == 2 and remplissage.total >= 0.02 and remplissage.maximum >= 0.01
+    assert remplissage.moyenne == pytest.approx(remplissage.total / 2)
+    assert instrumentation.resume()[0] == remplissage  # Le plus coûteux en tête
+    assert set(instrumentation.totaux_par_categorie()) == {CALCUL, RENDU, AFFICHAGE}
+
+
+def test_journal_au_dela_du_seuil(tmp_path, mesures):
+    instrumentation.activer(True, dict(mesures, seuil_ms=5))
+    instrumentation.enregistrer(CALCUL, "rapide", 0.001)
+    instrumentation.enregistrer(CALCUL, "lent", 0.050)
+    lignes = (tmp_path / "performances.log").read_text(encoding="utf-8").splitlines()
+    assert len(lignes) == 1 and lignes[0].endswith(f"{CALCUL}\tlent\t50.00 ms")
+    assert {s.operation for s in instrumentation.resume()} == {"rapide", "lent"}
+
+
+def test_sans_effet_si_inactive(mesures):
+    instrumentation.activer(False, mesures)
+
+    @instrumentation.chronometre(CALCUL)
+    def calculer():
+        return 42
+
+    # Contexte partagé, sans chronométrage
+    assert instrumentation.mesurer(AFFICHAGE, "a") is instrumentation.mesurer(RENDU, "b")
+    with instrumentation.mesurer(AFFICHAGE, "Remplissage"):
+        pass
+    assert calculer() == 42
+    assert calculer.__name__ == "calculer"
+    assert instrumentation.resume() == [] and instrumentation.totaux_par_categorie() == {}
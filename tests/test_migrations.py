@@ -0,0 +1,60 @@
+import sqlite3
+
+import pytest
+
+from models import migrations
+from models.migrations import Migration, appliquer_migrations, requetes_en_balayage_complet, version_schema
+from models.schema import (
+    DECLENCHEURS, DECLENCHEURS_COMPTEURS, DECLENCHEURS_RECHERCHE, DECLENCHEURS_VERSIONS, INDEX, TABLES,
+    index_existant, verifier_schema
+)
+
+
+def _normaliser(sql):
+    return " ".join(sql.replace("IF NOT EXISTS ", "").split())
+
+
+def test_base_migree_conforme_au_schema_de_reference(conn):
+    assert verifier_schema(conn) == []
+    existantes = {nom for (nom,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert set(TABLES) <= existantes
+
+    attendus = {**DECLENCHEURS, **DECLENCHEURS_VERSIONS, **DECLENCHEURS_RECHERCHE, **DECLENCHEURS_COMPTEURS}
+    declencheurs = dict(conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'"))
+    assert set(declencheurs) == set(attendus)
+    for nom, definition in attendus.items():
+        assert _normaliser(declencheurs[nom]) == _normaliser(definition), nom
+
+    cur = conn.cursor()
+    for nom, table, colonnes in INDEX:
+        assert index_existant(cur, table, colonnes) or cur.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (nom,)).fetchone(), nom
+    # Aucun index retiré de la référence ne subsiste (chacun coûte une écriture par ligne modifiée)
+    index = {nom for (nom,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'")}
+    assert index <= {nom for nom, _, _ in INDEX}
+
+
+def test_requetes_critiques_sans_balayage_complet(conn, conn_synthetique):
+    assert requetes_en_balayage_complet(conn) == {}
+    assert requetes_en_balayage_complet(conn_synthetique) == {}
+
+
+def test_migrations_deja_appliquees_ignorees(conn):
+    assert appliquer_migrations(conn) == []
+    assert version_schema(conn) == migrations.MIGRATIONS[-1].version
+
+
+def test_migration_en_echec_annulee_entierement(conn, monkeypatch):
+    def defaillante(cur):
+        cur.execute("CREATE TABLE Table_Partielle (id INTEGER)")
+        cur.execute("CREATE INDEX idx_table_partielle ON Table_Partielle (id)")
+        raise sqlite3.OperationalError("échec simulé")
+
+    version = version_schema(conn)
+    monkeypatch.setattr(migrations, "MIGRATIONS",
+                        migrations.MIGRATIONS + [Migration(version + 1, "Défaillante", defaillante)])
+    with pytest.raises(sqlite3.OperationalError):
+        appliquer_migrations(conn)
+
+    assert version_schema(conn) == version
+    assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'Table_Partielle'").fetchone() is None
@@ -0,0 +1,63 @@
+import pytest
+
+
+@pytest.fixture
+def vue(qapp):
+    """Vue de 450 lignes (id, nom) par pages de 200 ; appels compte les textes produits."""
+    from views.view.modele_table import VueTableLazy
+
+    appels = []
+
+    def nom(ligne):
+        appels.append(ligne[0])
+        return ligne[1]
+
+    table = VueTableLazy([("Id", 0), ("Nom", nom)])
+    table.modele.taille_page = 200
+    table.modele.definir_lignes([(i, f"NOM{i}") for i in range(1, 451)])
+    table.appels = appels
+    table.resize(400, 300)
+    yield table
+    table.close()
+
+
+def test_lignes_exposees_par_pages(vue):
+    modele = vue.modele
+    assert (modele.rowCount(), modele.nombre_total()) == (200, 450)
+    assert vue.appels == []  # Aucun texte produit avant l'affichage
+
+    insertions = []
+    modele.rowsInserted.connect(lambda parent, debut, fin: insertions.append((debut, fin)))
+    while modele.canFetchMore():
+        modele.fetchMore()
+    assert insertions == [(200, 399), (400, 449)]
+    assert modele.rowCount() == 450
+    assert modele.texte(449, 1) == "NOM450" and vue.appels == [450]
+
+
+def test_defilement_en_bas_expose_la_page_suivante(vue, qapp):
+    vue.show()
+    qapp.processEvents()
+    # Seules les cellules visibles sont formatées
+    assert 0 < len(vue.appels) < 50
+    assert vue.modele.rowCount() == 200
+
+    vue.scrollToBottom()
+    qapp.processEvents()
+    assert vue.modele.rowCount() == 400
+
+
+def test_filtre_et_remplacement_sur_toutes_les_lignes(vue):
+    modele = vue.modele
+    modele.filtrer(lambda ligne: ligne[0] % 2 == 0)
+    assert (modele.rowCount(), modele.nombre_total()) == (200, 225)
+
+    modifications = []
+    modele.dataChanged.connect(lambda debut, fin: modifications.append(debut.row()))
+    # Ligne exposée (10) puis ligne filtrée mais pas encore exposée (440)
+    modele.remplacer_lignes([(10, "DIOP"), (440, "FALL"), (999, "ABSENT")], cle=lambda ligne: ligne[0])
+    assert modifications == [4]
+    assert modele.texte(4, 1) == "DIOP"
+    modele.filtrer(None)
+    assert modele.ligne(439) == (440, "FALL")
+    assert modele.rowCount() == 200
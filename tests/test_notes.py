@@ -0,0 +1,122 @@
+import sqlite3
+
+import pytest
+
+from models.bareme import COLONNES_TOUR1
+from models.deliberation_engine import finaliser_resultats
+from models.notes import enregistrer_notes, lire_grille, lire_notes_candidats, matiere_applicable, valider_note
+
+
+def _anonymat(conn, id_candidat):
+    return str(conn.execute("SELECT numero_anonymat FROM Anonymats WHERE id_candidat = ?",
+                            (id_candidat,)).fetchone()[0])
+
+
+def _a_recalculer(conn):
+    return {id_candidat for (id_candidat,) in conn.execute("SELECT id_candidat FROM Resultats_A_Recalculer")}
+
+
+@pytest.mark.parametrize("texte, note", [("12", 12), (" 13,5 ", 13.5), ("0", 0), ("20", 20), ("", None)])
+def test_saisie_valide(texte, note):
+    assert valider_note(texte) == note
+
+
+@pytest.mark.parametrize("texte, message", [("abs", "n'est pas une note"), ("20,5", "comprise"), ("-1", "comprise")])
+def test_saisie_refusee(texte, message):
+    with pytest.raises(ValueError, match=message):
+        valider_note(texte)
+
+
+def test_matieres_non_applicables(conn_saisie):
+    with conn_saisie:
+        conn_saisie.execute("UPDATE Candidats SET aptitude_sportive = 0, choix_epr_facultative = 0 WHERE id_candidat = 1")
+        conn_saisie.execute("UPDATE Candidats SET aptitude_sportive = 1, choix_epr_facultative = 1 WHERE id_candidat = 2")
+    lignes = {ligne.id_candidat: ligne for ligne in lire_grille(conn_saisie)}
+
+    assert not matiere_applicable(lignes[1], "eps") and not matiere_applicable(lignes[1], "epreuve_facultative")
+    assert matiere_applicable(lignes[2], "eps") and matiere_applicable(lignes[2], "epreuve_facultative")
+    assert matiere_applicable(lignes[1], "mathematiques")
+
+
+def test_lot_cree_puis_met_a_jour_sans_effacer_les_autres_matieres(conn_saisie):
+    conn = conn_saisie
+    a1, a2 = _anonymat(conn, 1), _anonymat(conn, 2)
+    assert enregistrer_notes(conn, 1, [(a1, 1, "mathematiques", 12), (a1, 1, "svt", 8),
+                                       (a2, 2, "mathematiques", 15)]) == 3
+    assert enregistrer_notes(conn, 1, [(a1, 1, "mathematiques", 14)]) == 1
+
+    notes = {ligne.id_candidat: ligne.notes for ligne in lire_grille(conn) if ligne.id_candidat in (1, 2)}
+    assert (notes[1]["mathematiques"], notes[1]["svt"]) == (14, 8)
+    assert (notes[2]["mathematiques"], notes[2]["svt"]) == (15, None)
+    assert conn.execute("SELECT COUNT(*) FROM Notes_Tour1").fetchone()[0] == 2
+
+
+def test_lot_marque_les_candidats_a_recalculer(conn_saisie):
+    conn = conn_saisie
+    enregistrer_notes(conn, 1, [(_anonymat(conn, 3), 3, "svt", 11)])
+    assert _a_recalculer(conn) == {3}
+    with conn:
+        conn.execute("DELETE FROM Resultats_A_Recalculer")
+
+    # Mise à jour par ON CONFLICT : le candidat est marqué une seule fois
+    enregistrer_notes(conn, 1, [(_anonymat(conn, 3), 3, "svt", 12), (_anonymat(conn, 4), 4, "svt", 9)])
+    assert _a_recalculer(conn) == {3, 4}
+    assert conn.execute("SELECT COUNT(*) FROM Resultats_A_Recalculer").fetchone()[0] == 2
+
+
+def test_lot_refuse_en_entier(conn_saisie):
+    conn = conn_saisie
+    a5 = _anonymat(conn, 5)
+    with pytest.raises(ValueError, match="Matière inconnue"):
+        enregistrer_notes(conn, 2, [(a5, 5, "mathematiques_2nd_tour", 10), (a5, 5, "svt", 10)])
+    # Note hors bornes arrivée sans validation : CHECK de la table, toute la transaction est annulée
+    with pytest.raises(sqlite3.IntegrityError):
+        enregistrer_notes(conn, 1, [(a5, 5, "svt", 10), (a5, 5, "mathematiques", 25)])
+
+    assert conn.execute("SELECT COUNT(*) FROM Notes_Tour1").fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM Notes_Tour2").fetchone()[0] == 0
+    assert not _a_recalculer(conn)
+
+
+def test_grille_du_second_tour(conn_saisie):
+    conn = conn_saisie
+    enregistrer_notes(conn, 1, [(_anonymat(conn, i), i, "mathematiques", 10) for i in (6, 7, 8)])
+    assert lire_grille(conn, 2) == []
+    finaliser_resultats(conn)
+    with conn:
+        conn.execute("UPDATE Deliberation SET statut = '2nd Tour' WHERE id_candidat IN (6, 7)")
+
+    a6 = _anonymat(conn, 6)
+    enregistrer_notes(conn, 2, [(a6, 6, "mathematiques_2nd_tour", 13)])
+    grille = lire_grille(conn, 2)
+    assert [ligne.id_candidat for ligne in grille] == sorted([6, 7], key=lambda i: int(_anonymat(conn, i)))
+    notes = {ligne.id_candidat: ligne.notes for ligne in grille}
+    assert notes[6] == {"francais_2nd_tour": None, "mathematiques_2nd_tour": 13, "pc_lv2_2nd_tour": None}
+    assert set(notes[7].values()) == {None}
+
+
+def test_notes_candidats_typees(conn_saisie):
+    conn = conn_saisie
+    enregistrer_notes(conn, 1, [(_anonymat(conn, 1), 1, "mathematiques", 12.5), (_anonymat(conn, 1), 1, "eps", 14)])
+    enregistrer_notes(conn, 2, [(_anonymat(conn, 1), 1, "francais_2nd_tour", 9)])
+    lignes = lire_notes_candidats(conn)
+
+    assert [ligne.numero_table for ligne in lignes] == list(range(1, 21))
+    premiere = lignes[0]
+    assert premiere.anonymat == int(_anonymat(conn, 1))
+    assert premiere.notes_tour1[COLONNES_TOUR1.index("mathematiques")] == 12.5
+    assert len(premiere.notes_tour1) == len(COLONNES_TOUR1) - 2
+    assert (premiere.eps, premiere.epreuve_facultative) == (14, None)
+    assert premiere.notes_tour2 == (9, None, None)
+    assert set(lignes[1].notes_tour1) == {None} and set(lignes[1].notes_tour2) == {None}
+
+
+def test_lecture_ciblee_par_paquets(conn_saisie, monkeypatch):
+    monkeypatch.setattr("models.notes.TAILLE_PAQUET_IDS", 3)
+    completes = {ligne.id_candidat: ligne for ligne in lire_notes_candidats(conn_saisie)}
+    ids = [2, 19, 7, 11, 4, 999]
+
+    lignes = lire_notes_candidats(conn_saisie, ids)
+    assert sorted(ligne.id_candidat for ligne in lignes) == [2, 4, 7, 11, 19]
+    assert all(ligne == completes[ligne.id_candidat] for ligne in lignes)
+    assert lire_notes_candidats(conn_saisie, []) == []
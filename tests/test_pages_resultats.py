@@ -0,0 +1,46 @@
+import pytest
+
+from models.deliberation_engine import compter_resultats, lire_resultats, page_resultats
+
+
+@pytest.fixture
+def resultats(conn_synthetique):
+    """Résultats matérialisés de la base synthétique (numéros de table 1 à 300), par numéro de table."""
+    return lire_resultats(conn_synthetique)
+
+
+def _pages(conn, taille, **filtres):
+    lignes, decalage = [], 0
+    while True:
+        page = page_resultats(conn, limite=taille, decalage=decalage, **filtres)
+        lignes += page
+        if len(page) < taille:
+            return lignes
+        decalage += taille
+
+
+def test_pages_successives(conn_synthetique, resultats):
+    assert compter_resultats(conn_synthetique) == 300
+    assert _pages(conn_synthetique, 70) == resultats
+
+
+def test_filtre_par_statut(conn_synthetique, resultats):
+    statut = resultats[0].statut
+    attendus = [r for r in resultats if r.statut == statut]
+    assert compter_resultats(conn_synthetique, statut=statut) == len(attendus)
+    assert _pages(conn_synthetique, 25, statut=statut) == attendus
+
+
+@pytest.mark.parametrize("recherche", ["1", "12", "30", "300", "0", "012", "00", "301"])
+def test_recherche_par_debut_du_numero_de_table(conn_synthetique, resultats, recherche):
+    attendus = [r for r in resultats if str(r.numero_table).startswith(recherche)]
+    assert compter_resultats(conn_synthetique, recherche=recherche) == len(attendus)
+    assert _pages(conn_synthetique, 50, recherche=recherche) == attendus
+
+
+def test_recherche_par_nom_et_statut(conn_synthetique, resultats):
+    statut = resultats[11].statut
+    attendus = [r for r in resultats if r.nom_complet.startswith("NOM12") and r.statut == statut]
+    assert attendus
+    assert compter_resultats(conn_synthetique, statut=statut, recherche="nom12") == len(attendus)
+    assert page_resultats(conn_synthetique, statut=statut, recherche="nom12") == attendus
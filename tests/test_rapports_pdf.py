@@ -0,0 +1,45 @@
+import pytest
+
+from models.anonymats import attribuer_anonymats_manquants
+from models.deliberation_engine import finaliser_resultats
+from models.rapports_pdf import (
+    construire_liste_anonymats, construire_liste_candidats, construire_pv_deliberation,
+    construire_resultats_deliberation, enregistrer_pdf
+)
+from tests.lecture_pdf import verifier_pdf
+
+
+@pytest.mark.parametrize("construire", [
+    construire_liste_candidats, construire_liste_anonymats, construire_resultats_deliberation
+])
+def test_liste_ecrite_au_fil_des_pages(conn_synthetique, tmp_path, construire):
+    conn = conn_synthetique
+    attribuer_anonymats_manquants(conn)
+    finaliser_resultats(conn)
+    chemin = str(tmp_path / "liste.pdf")
+    progressions = []
+    rapport = enregistrer_pdf(conn, construire, chemin, cache=False,
+                              progression=lambda fait, total: progressions.append((fait, total)))
+
+    assert rapport.nb_lignes == 300
+    assert rapport.nb_pages > 5
+    assert verifier_pdf(chemin) == rapport.nb_pages
+    assert progressions[-1] == (300, 300)
+
+
+def test_meme_document_en_memoire_et_en_flux(conn_synthetique, tmp_path):
+    # Sans fichier, le document est tenu en mémoire puis écrit par output(chemin)
+    pdf = construire_liste_candidats(conn_synthetique)
+    pdf.output(str(tmp_path / "memoire.pdf"))
+    rapport = enregistrer_pdf(conn_synthetique, construire_liste_candidats, str(tmp_path / "flux.pdf"), cache=False)
+
+    assert verifier_pdf(tmp_path / "memoire.pdf") == verifier_pdf(tmp_path / "flux.pdf") == pdf.page_no()
+    assert rapport.nb_pages == pdf.page_no()
+
+
+def test_document_impossible_sans_fichier_partiel(conn_synthetique, tmp_path):
+    finaliser_resultats(conn_synthetique)
+    chemin = tmp_path / "pv.pdf"
+    with pytest.raises(ValueError, match="jury"):
+        enregistrer_pdf(conn_synthetique, construire_pv_deliberation, str(chemin), cache=False)
+    assert not chemin.exists()
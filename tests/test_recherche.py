@@ -0,0 +1,68 @@
+import pytest
+
+from models.recherche import rechercher_candidats, requete_fts
+
+CANDIDATS = [
+    (101, "Awa", "Ndiaye", "Thiès", "CEM Mbour"),
+    (102, "Ousmane", "Ndiayé", "Saint-Louis", "CEM Thiès"),
+    (103, "Fatou", "Diop", "Dakar", "Lycée Blaise Diagne"),
+    (1201, "Moussa", "Sèye", "Kaolack", "CEM Kaolack"),
+]
+
+
+@pytest.fixture
+def conn_candidats(conn):
+    with conn:
+        conn.executemany("""
+            INSERT INTO Candidats (numero_table, prenom, nom, date_naissance, lieu_naissance, sexe,
+                                   etablissement, nationalite, choix_epr_facultative, aptitude_sportive)
+            VALUES (?, ?, ?, '2008-01-01', ?, 'M', ?, 'SEN', 0, 1)
+        """, CANDIDATS)
+    return conn
+
+
+def _numeros(conn, texte):
+    ids = rechercher_candidats(conn, texte)
+    if ids is None:
+        return None
+    return sorted(n for (i, n) in conn.execute("SELECT id_candidat, numero_table FROM Candidats") if i in ids)
+
+
+def test_requete_fts():
+    assert requete_fts("ndiay ous") == '"ndiay"* AND "ous"*'
+    assert requete_fts('  "; --') == ""
+
+
+@pytest.mark.parametrize("texte, attendus", [
+    ("ndiaye", [101, 102]),            # Accents ignorés dans les deux sens
+    ("NDIAYÉ", [101, 102]),
+    ("ndia", [101, 102]),               # Préfixe
+    ("ndiaye thies", [101, 102]),       # Tous les mots requis, sur des colonnes différentes
+    ("ndiaye saint", [102]),
+    ("seye", [1201]),
+    ("1201", [1201]),
+    ("lycee diag", [103]),
+    ("inconnu", []),
+])
+def test_recherche_plein_texte(conn_candidats, texte, attendus):
+    assert _numeros(conn_candidats, texte) == attendus
+
+
+def test_saisie_vide_sans_filtre(conn_candidats):
+    assert rechercher_candidats(conn_candidats, "  ") is None
+
+
+def test_index_tenu_a_jour(conn_candidats):
+    conn = conn_candidats
+    with conn:
+        conn.execute("UPDATE Candidats SET nom = 'Fall' WHERE numero_table = 101")
+        conn.execute("DELETE FROM Candidats WHERE numero_table = 103")
+    assert _numeros(conn, "ndiaye") == [102]
+    assert _numeros(conn, "fall") == [101]
+    assert _numeros(conn, "diop") == []
+
+
+def test_repli_like_sans_fts5(conn_candidats):
+    conn = conn_candidats
+    conn.execute("DROP TABLE Candidats_FTS")
+    assert _numeros(conn, "ndiaye thi") == [101]  # LIKE : sensible aux accents, 102 est « Ndiayé »
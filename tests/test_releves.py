@@ -0,0 +1,88 @@
+import os
+
+import pytest
+
+from models.notes import enregistrer_notes
+from models.releves import (
+    generer_releves_fichiers, generer_releves_fusionnes, lire_releves, lister_etablissements, nom_fichier_releve
+)
+from tests.lecture_pdf import verifier_pdf
+
+
+@pytest.fixture
+def conn_releves(conn_saisie):
+    """Candidats 1 à 12 notés au 1er tour, 2 et 5 au 2nd ; trois établissements."""
+    conn = conn_saisie
+    anonymats = dict(conn.execute("SELECT id_candidat, numero_anonymat FROM Anonymats"))
+    with conn:
+        conn.execute("UPDATE Candidats SET etablissement = CASE id_candidat % 3 "
+                     "WHEN 0 THEN 'CEM Thiès' WHEN 1 THEN 'Lycée Blaise Diagne' ELSE 'CEM Kaolack' END")
+    enregistrer_notes(conn, 1, [(anonymats[i], i, "mathematiques", i) for i in range(1, 13)])
+    enregistrer_notes(conn, 2, [(anonymats[i], i, "francais_2nd_tour", 10 + i) for i in (2, 5)])
+    return conn
+
+
+def test_releves_par_etablissement(conn_releves):
+    assert lister_etablissements(conn_releves) == ["CEM Kaolack", "CEM Thiès", "Lycée Blaise Diagne"]
+
+    releves = lire_releves(conn_releves, 1, etablissement="CEM Thiès")
+    assert [r.numero_table for r in releves] == [3, 6, 9, 12]
+    assert {r.etablissement for r in releves} == {"CEM Thiès"}
+    assert [r.notes[5] for r in releves] == [3, 6, 9, 12]  # mathematiques
+
+    # Tous établissements : regroupés par établissement puis par numéro de table
+    tous = lire_releves(conn_releves, 1)
+    assert len(tous) == 12
+    assert [r.etablissement for r in tous] == sorted(r.etablissement for r in tous)
+    assert lire_releves(conn_releves, 1, etablissement="CEM Thiès", numero_table=6)[0].numero_table == 6
+
+
+def test_releves_du_second_tour(conn_releves):
+    releves = lire_releves(conn_releves, 2)
+    assert sorted(r.numero_table for r in releves) == [2, 5]
+    assert {r.numero_table: r.notes for r in releves}[5] == (15, None, None)
+    assert lire_releves(conn_releves, 2, etablissement="CEM Thiès") == []
+
+
+@pytest.mark.parametrize("processus", [1, 2])
+def test_un_fichier_par_candidat(conn_releves, tmp_path, monkeypatch, processus):
+    # Paquets de 5 : plusieurs paquets, donc le pool de processus quand processus > 1
+    monkeypatch.setattr("models.releves.TAILLE_PAQUET", 5)
+    releves = lire_releves(conn_releves, 1)
+    progressions = []
+    rapport = generer_releves_fichiers(releves, 1, str(tmp_path / "releves"), processus=processus,
+                                       progression=lambda fait, total: progressions.append((fait, total)))
+
+    assert (rapport.nb_releves, rapport.nb_pages) == (12, 12)
+    assert sorted(os.listdir(tmp_path / "releves")) == sorted(nom_fichier_releve(r, 1) for r in releves)
+    assert all(verifier_pdf(tmp_path / "releves" / nom_fichier_releve(r, 1)) == 1 for r in releves)
+    # Un appel par paquet terminé, dans l'ordre d'achèvement des paquets
+    assert len(progressions) == 3 and progressions[-1] == (12, 12)
+
+
+def test_releves_fichiers_du_second_tour(conn_releves, tmp_path):
+    rapport = generer_releves_fichiers(lire_releves(conn_releves, 2), 2, str(tmp_path / "tour2"), processus=1)
+    assert rapport.nb_pages == 2
+    assert sorted(os.listdir(tmp_path / "tour2")) == ["Releve_Notes_2_2nd_Tour.pdf", "Releve_Notes_5_2nd_Tour.pdf"]
+
+
+def test_releves_fusionnes(conn_releves, tmp_path):
+    chemin = str(tmp_path / "releves_thies.pdf")
+    releves = lire_releves(conn_releves, 1, etablissement="CEM Thiès")
+    rapport = generer_releves_fusionnes(releves, 1, chemin)
+
+    assert (rapport.nb_releves, rapport.nb_pages, rapport.destination) == (4, 4, chemin)
+    assert verifier_pdf(chemin) == 4
+
+
+def test_releves_fusionnes_annules(conn_releves, tmp_path):
+    chemin = tmp_path / "releves.pdf"
+
+    def annuler(fait, total):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        generer_releves_fusionnes(lire_releves(conn_releves, 1), 1, str(chemin), progression=annuler)
+    assert not chemin.exists()
+    with pytest.raises(ValueError, match="Aucun relevé"):
+        generer_releves_fusionnes(lire_releves(conn_releves, 2, etablissement="CEM Thiès"), 2, str(chemin))
@@ -0,0 +1,50 @@
+from models.deliberation_engine import (
+    charger_resultats, lire_resultats, rafraichir_resultats, resultats_a_recalculer
+)
+
+
+def _a_recalculer(conn):
+    return {id_candidat for (id_candidat,) in conn.execute("SELECT id_candidat FROM Resultats_A_Recalculer")}
+
+
+def test_premier_calcul_puis_rien_a_recalculer(conn_synthetique):
+    assert rafraichir_resultats(conn_synthetique) == 300
+    assert not resultats_a_recalculer(conn_synthetique)
+    assert rafraichir_resultats(conn_synthetique) == 0
+    assert lire_resultats(conn_synthetique) == charger_resultats(conn_synthetique)
+
+
+def test_declencheurs_marquent_le_candidat_modifie(conn_synthetique):
+    conn = conn_synthetique
+    rafraichir_resultats(conn)
+    candidat_tour2 = conn.execute("SELECT MAX(id_candidat) FROM Notes_Tour2").fetchone()[0]
+    with conn:
+        conn.execute("UPDATE Notes_Tour1 SET mathematiques = 20 WHERE id_candidat = 5")
+        conn.execute("UPDATE Livret_Scolaire SET moyenne_cycle = 17 WHERE id_candidat = 8")
+        conn.execute("DELETE FROM Notes_Tour2 WHERE id_candidat = ?", (candidat_tour2,))
+        conn.execute("UPDATE Candidats SET nom = 'SECK' WHERE id_candidat = 12")
+    assert _a_recalculer(conn) == {5, 8, 12, candidat_tour2}
+
+
+def test_upsert_marque_le_candidat(conn_synthetique):
+    conn = conn_synthetique
+    rafraichir_resultats(conn)
+    with conn:
+        conn.execute("""
+            INSERT INTO Notes_Tour1 (id_candidat, anonymat, svt) VALUES (9, '9', 3)
+            ON CONFLICT (anonymat) DO UPDATE SET svt = excluded.svt
+        """)
+    assert _a_recalculer(conn) == {9}
+
+
+def test_recalcul_incremental_identique_au_calcul_complet(conn_synthetique):
+    conn = conn_synthetique
+    rafraichir_resultats(conn)
+    with conn:
+        conn.execute("UPDATE Notes_Tour1 SET mathematiques = 0, compo_francais = 0 WHERE id_candidat <= 40")
+        conn.execute("INSERT INTO Notes_Tour2 (id_candidat, anonymat, francais_2nd_tour, mathematiques_2nd_tour, "
+                     "pc_lv2_2nd_tour) VALUES (41, 'T2-41', 15, 15, 15) ON CONFLICT DO NOTHING")
+        conn.execute("DELETE FROM Candidats WHERE id_candidat = 42")
+    assert rafraichir_resultats(conn) == 42
+    assert lire_resultats(conn) == charger_resultats(conn)
+    assert 42 not in {r.id_candidat for r in lire_resultats(conn)}
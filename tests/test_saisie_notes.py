@@ -0,0 +1,69 @@
+import pytest
+
+from models.notes import enregistrer_notes, lire_notes_candidats
+
+
+@pytest.fixture
+def ecran(qapp, conn_saisie, monkeypatch):
+    """Écran de saisie ouvert sur conn_saisie ; lectures[i] est le paramètre ids du i-ème chargement."""
+    from views.view import saisie_notes
+
+    lectures = []
+
+    def lire(conn, ids=None):
+        lectures.append(None if ids is None else list(ids))
+        return lire_notes_candidats(conn, ids)
+
+    monkeypatch.setattr(saisie_notes, "obtenir_connexion", lambda: conn_saisie)
+    monkeypatch.setattr(saisie_notes, "lire_notes_candidats", lire)
+    fenetre = saisie_notes.SaisieNotes()
+    fenetre.lectures = lectures
+    yield fenetre
+    fenetre.close()
+
+
+def _anonymat(conn, id_candidat):
+    return conn.execute("SELECT numero_anonymat FROM Anonymats WHERE id_candidat = ?", (id_candidat,)).fetchone()[0]
+
+
+def test_chargement_unique_et_cellules_formatees(ecran, conn_saisie):
+    modele = ecran.table.modele
+    assert ecran.lectures == [None]
+    assert modele.nombre_total() == 20
+    assert modele.texte(0, 3) == modele.texte(0, 4) == modele.texte(0, 5) == "Non Saisi"
+    assert modele.texte(0, 2) == str(_anonymat(conn_saisie, 1))
+
+
+def test_rafraichissement_cible_d_une_ligne(ecran, conn_saisie):
+    modele = ecran.table.modele
+    avant = [modele.ligne(row) for row in range(modele.nombre_total())]
+    reinitialisations, modifications = [], []
+    modele.modelReset.connect(lambda: reinitialisations.append(True))
+    modele.dataChanged.connect(lambda debut, fin: modifications.append((debut.row(), fin.row())))
+
+    enregistrer_notes(conn_saisie, 1, [(_anonymat(conn_saisie, 5), 5, "mathematiques", 13.5),
+                                       (_anonymat(conn_saisie, 5), 5, "eps", 12)])
+    ecran.rafraichir_candidats([5, None])
+
+    # Une seule lecture ciblée, sans réinitialisation du modèle
+    assert ecran.lectures == [None, [5]]
+    assert reinitialisations == []
+    assert modifications == [(4, 4)]
+    assert modele.texte(4, 3).split(" | ")[5] == "13.5"
+    assert modele.texte(4, 5) == "12 / -"
+    # Les autres lignes sont les mêmes objets qu'avant : rien n'a été relu
+    assert all(modele.ligne(row) is avant[row] for row in range(20) if row != 4)
+
+
+def test_rafraichissement_conserve_le_filtre(ecran, conn_saisie):
+    modele = ecran.table.modele
+    modele.filtrer(lambda ligne: ligne.id_candidat in (3, 8))
+    enregistrer_notes(conn_saisie, 2, [(_anonymat(conn_saisie, 8), 8, "pc_lv2_2nd_tour", 7)])
+    ecran.rafraichir_candidats([8])
+
+    assert modele.nombre_total() == 2
+    assert modele.ligne(1).id_candidat == 8
+    assert modele.texte(1, 4) == "- | - | 7"
+    # Aucune lecture pour une liste vide d'identifiants
+    ecran.rafraichir_candidats([None])
+    assert ecran.lectures == [None, [8]]
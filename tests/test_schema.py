@@ -0,0 +1,48 @@
+import sqlite3
+from contextlib import closing
+
+from database import create_database
+from models.schema import (
+    DECLENCHEURS, DECLENCHEURS_COMPTEURS, DECLENCHEURS_RECHERCHE, DECLENCHEURS_VERSIONS, verifier_schema
+)
+
+
+def test_table_degradee_reconstruite(tmp_path):
+    chemin = str(tmp_path / "ancienne.sqlite")
+    with closing(sqlite3.connect(chemin)) as conn:
+        # Candidats créée sans contraintes par une ancienne version : doublon de numéro de table
+        conn.execute("""
+            CREATE TABLE Candidats (
+                id_candidat INTEGER PRIMARY KEY AUTOINCREMENT, numero_table INTEGER, prenom TEXT, nom TEXT,
+                date_naissance DATE, lieu_naissance TEXT, sexe CHAR(1), type_candidat TEXT,
+                etablissement TEXT, nationalite TEXT, choix_epr_facultative BOOLEAN,
+                epreuve_facultative TEXT, aptitude_sportive BOOLEAN
+            )
+        """)
+        conn.executemany("""
+            INSERT INTO Candidats (numero_table, prenom, nom, date_naissance, lieu_naissance, sexe,
+                                   etablissement, nationalite, choix_epr_facultative, aptitude_sportive)
+            VALUES (?, 'Awa', ?, '2008-01-01', 'Thiès', 'F', 'CEM Thiès', 'SEN', 0, 1)
+        """, [(1, "Diop"), (1, "Doublon"), (2, "Ndiaye")])
+        conn.commit()
+
+    create_database(chemin)
+
+    with closing(sqlite3.connect(chemin)) as conn:
+        assert verifier_schema(conn) == []
+        assert conn.execute("SELECT nom FROM Candidats ORDER BY numero_table").fetchall() == [("Diop",), ("Ndiaye",)]
+        # Les déclencheurs de Candidats, supprimés avec l'ancienne table, sont recréés
+        declencheurs = {nom for (nom,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'Candidats'")}
+        attendus = {nom for definitions in (DECLENCHEURS, DECLENCHEURS_VERSIONS, DECLENCHEURS_RECHERCHE,
+                                            DECLENCHEURS_COMPTEURS)
+                    for nom, definition in definitions.items() if " ON Candidats" in definition}
+        assert declencheurs == attendus
+        assert conn.execute("SELECT candidats FROM Compteurs_Etablissements WHERE etablissement = 'CEM Thiès'"
+                            ).fetchone() == (2,)
+        assert conn.execute("SELECT rowid FROM Candidats_FTS WHERE Candidats_FTS MATCH 'ndiaye'").fetchall() == \
+            conn.execute("SELECT id_candidat FROM Candidats WHERE nom = 'Ndiaye'").fetchall()
+
+
+def test_base_conforme_inchangee(conn):
+    assert verifier_schema(conn) == []
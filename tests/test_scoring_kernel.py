@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from benchmark import comparer_noyau
+from models.deliberation_engine import calculer_resultat
+from models.scoring_kernel import calculer_cohorte
+
+
+def notes(valeur, eps=None, facultative=None, **autres):
+    """Notes du 1er tour : toutes les matières à valeur (sauf celles de autres), puis EPS et facultative."""
+    matieres = [valeur] * 10
+    for index, note in autres.items():
+        matieres[int(index[1:])] = note
+    return matieres + [eps, facultative]
+
+
+# (notes du 1er tour, notes du 2nd tour ou None, moyenne du cycle) ; coefficients du 1er tour : 18 au total
+CAS = {
+    "toutes absentes": (notes(None), None, 10),
+    "matière absente": (notes(12, m0=None, m5=None), None, 10),
+    "EPS absente (inapte)": (notes(10), None, 10),
+    "EPS en malus": (notes(10, eps=6), None, 10),
+    "EPS en bonus": (notes(10, eps=15.5), None, 10),
+    "EPS à 10": (notes(9, eps=10), None, 10),
+    "facultative à 10": (notes(10, eps=10, facultative=10), None, 10),
+    "facultative sous 10": (notes(10, eps=10, facultative=4), None, 10),
+    "facultative au-dessus de 10": (notes(8, facultative=13.5), None, 10),
+    "admis à 180": (notes(10), None, 0),
+    "repêchage sous 180": (notes(10, eps=9.5), None, 0),
+    "repêchage à 171": (notes(9.5), None, 0),
+    "2nd tour sous 171": (notes(9.5, eps=9.75), None, 0),
+    "2nd tour à 153": (notes(8.5), None, 0),
+    "repêchage sous 153": (notes(8.5, eps=9.5), None, 0),
+    "repêchage à 144": (notes(8), None, 0),
+    "échec sous 144": (notes(8, eps=9.5), None, 11.99),
+    "repêchage par la moyenne du cycle": (notes(8, eps=9.5), None, 12),
+    "2nd tour admis à 60": (notes(9), [7.5, 7.5, 7.5], 10),
+    "2nd tour échec sous 60": (notes(9), [7.25, 7.25, 7.25], 10),
+    "2nd tour avec note absente": (notes(9), [20, 12, None], 10),
+    "2nd tour sans aucune note": (notes(9), [None, None, None], 15),
+}
+
+
+def calculer_par_noyau(cas):
+    notes_tour1 = np.array([[np.nan if n is None else n for n in t1] for t1, _, _ in cas], dtype=float)
+    presence_tour2 = np.array([t2 is not None for _, t2, _ in cas])
+    notes_tour2 = np.array([[np.nan if n is None else n for n in (t2 or [None] * 3)] for _, t2, _ in cas],
+                           dtype=float)
+    moyenne_cycle = np.array([moyenne for _, _, moyenne in cas], dtype=float)
+    total_points, points_tour2, bonus_malus, statuts = calculer_cohorte(
+        notes_tour1, notes_tour2, presence_tour2, moyenne_cycle)
+    return [
+        (total, None if tour2 != tour2 else tour2, moyenne, bonus, statut)
+        for total, tour2, moyenne, bonus, statut in zip(
+            total_points.tolist(), points_tour2.tolist(), moyenne_cycle.tolist(),
+            bonus_malus.tolist(), statuts.tolist())
+    ]
+
+
+def test_noyau_identique_au_calcul_scalaire():
+    cas = list(CAS.values())
+    for libelle, obtenu, (t1, t2, moyenne) in zip(CAS, calculer_par_noyau(cas), cas):
+        assert obtenu == calculer_resultat(t1, t2, moyenne), libelle
+
+
+@pytest.mark.parametrize("libelle, statut", [
+    ("admis à 180", "Admis"),
+    ("repêchage sous 180", "Repêchage"),
+    ("repêchage à 171", "Repêchage"),
+    ("2nd tour sous 171", "2nd Tour"),
+    ("2nd tour à 153", "2nd Tour"),
+    ("repêchage sous 153", "Repêchage"),
+    ("repêchage à 144", "Repêchage"),
+    ("échec sous 144", "Échec"),
+    ("repêchage par la moyenne du cycle", "Repêchage"),
+    ("2nd tour admis à 60", "Admis"),
+    ("2nd tour échec sous 60", "Échec"),
+])
+def test_seuils_des_statuts(libelle, statut):
+    assert calculer_par_noyau([CAS[libelle]])[0][4] == statut
+
+
+def test_noyau_identique_sur_cohorte_aleatoire():
+    comparer_noyau(5000, graine=3)  # SystemExit en cas de divergence
@@ -0,0 +1,33 @@
+import numpy as np
+
+from models.deliberation_engine import COLONNES_TOUR1, finaliser_resultats
+from models.statistiques import STATUTS, calculer_statistiques
+
+
+def test_pourcentages_rapportes_a_toutes_les_deliberations(conn_synthetique):
+    conn = conn_synthetique
+    finaliser_resultats(conn)
+    with conn:
+        conn.execute("UPDATE Deliberation SET statut = NULL WHERE id_candidat <= 10")
+    stats = calculer_statistiques(conn)
+
+    attendus = dict(conn.execute("SELECT statut, COUNT(*) FROM Deliberation GROUP BY statut"))
+    assert stats.nb_deliberes == 300
+    for statut in STATUTS:
+        nombre = attendus.get(statut, 0)
+        assert stats.statuts[statut] == {"nombre": nombre, "pourcentage": round(nombre * 100 / 300, 2)}
+
+
+def test_notes_lues_par_candidat(conn_synthetique):
+    conn = conn_synthetique
+    # Base sans anonymats ; un candidat avec une seconde ligne de notes
+    with conn:
+        conn.execute("INSERT INTO Notes_Tour1 (id_candidat, anonymat, mathematiques) VALUES (1, 'doublon', 0)")
+    stats = calculer_statistiques(conn)
+
+    assert stats.total_candidats == 300
+    for matiere in COLONNES_TOUR1:
+        valeurs = np.array([v for (v,) in conn.execute(
+            f"SELECT {matiere} FROM Notes_Tour1 WHERE anonymat != 'doublon'")], dtype=float)
+        assert stats.matieres[matiere]["effectif"] == np.count_nonzero(~np.isnan(valeurs))
+        assert stats.matieres[matiere]["moyenne"] == round(float(np.nanmean(valeurs)), 2)
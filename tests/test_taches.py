@@ -0,0 +1,53 @@
+import threading
+
+from PyQt5.QtCore import Qt
+
+from controllers.task_controller import Tache
+from models.database_manager import obtenir_connexion
+
+# Requête assez longue pour être interrompue en cours d'exécution
+REQUETE_LONGUE = """
+    WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 100000000)
+    SELECT COUNT(*) FROM n
+"""
+
+
+def _executer(tache):
+    """Exécute la tâche dans un thread à part ; retourne les signaux reçus et le thread."""
+    recus = []
+    for nom in ("termine", "erreur", "annulee"):
+        getattr(tache.signaux, nom).connect(lambda *args, nom=nom: recus.append(nom), Qt.DirectConnection)
+    thread = threading.Thread(target=tache.run, daemon=True)
+    thread.start()
+    return recus, thread
+
+
+def test_annulation_interrompt_la_requete_en_cours(chemin_base):
+    demarree = threading.Event()
+
+    def fonction(conn, tache):
+        # Signale le démarrage depuis l'intérieur de la requête
+        conn.set_progress_handler(lambda: demarree.set(), 1000)
+        try:
+            return conn.execute(REQUETE_LONGUE).fetchone()
+        finally:
+            conn.set_progress_handler(None, 0)
+
+    tache = Tache(fonction, db_name=chemin_base)
+    recus, thread = _executer(tache)
+    assert demarree.wait(5)
+    tache.annuler()
+    thread.join(10)
+    assert not thread.is_alive()
+    assert recus == ["annulee"]
+
+
+def test_annulation_apres_la_fin_sans_effet_sur_la_connexion(chemin_base):
+    tache = Tache(lambda conn, tache: conn.execute("SELECT 1").fetchone()[0], db_name=chemin_base)
+    resultats = []
+    tache.signaux.termine.connect(resultats.append, Qt.DirectConnection)
+    tache.run()
+    tache.annuler()
+    # La connexion du thread, réutilisée par la tâche suivante, n'est pas interrompue
+    assert obtenir_connexion(chemin_base).execute("SELECT COUNT(*) FROM Candidats").fetchone() == (0,)
+    assert resultats == [1]
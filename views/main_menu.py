@@ -1,28 +1,24 @@
 import sys
 import traceback
 import os
-import pandas as pd
 import sqlite3
-import random
+import subprocess
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QDesktopWidget, QPushButton,
     QLabel, QMessageBox, QFrame, QSpacerItem, QSizePolicy, QGridLayout, QToolBar,
-    QAction, QMenu, QApplication
+    QAction, QMenu, QApplication, QProgressDialog
 )
 from PyQt5.QtGui import QFont, QIcon, QColor, QPalette, QLinearGradient, QPainter, QPixmap
 from PyQt5.QtCore import Qt, QSize, QDateTime, QPropertyAnimation, QEasingCurve
-from views.user_management import UserManagement
 from views.login_window import LoginWindow
-from views.view.gestion_candidats import GestionCandidats
-from views.view.parametre_jury_dialog import ParametreJuryDialog
-from views.view.gestion_anonymats import GestionAnonymats
-from views.view.saisie_notes import SaisieNotes
-from views.view.gestion_deliberations import GestionDeliberation
-from views.view.gestion_repechages import GestionRepechage
-from views.view.statistiques import Statistiques
-from views.view.pdf_generator import PDFGenerator
-from views.view.releve_notes_generator import ReleveNotesGenerator
 from database import obtenir_jury_connecte
+from models.database_manager import obtenir_connexion
+from models.schema import creer_tables
+from controllers.task_controller import gestionnaire_taches
+from models.instrumentation import AFFICHAGE, chronometre
+
+# Les fenêtres secondaires (et pandas, fpdf, QtChart qu'elles chargent) sont importées
+# à la première ouverture, dans les méthodes open_* : le menu s'affiche sans les attendre.
 
 # Constantes pour les styles
 PRIMARY_COLOR = "#2C3E50"
@@ -87,6 +83,8 @@ class NavBar(QToolBar):
         file_menu.addAction("Ouvrir...", lambda: None)
         file_menu.addSeparator()
         file_menu.addAction("Exporter...", lambda: None)
+        file_menu.addSeparator()
+        self.action_diagnostics = file_menu.addAction("Diagnostics des performances")
 
         file_button = QPushButton("Fichier")
         file_button.setStyleSheet(f"""
@@ -133,6 +131,7 @@ class NavBar(QToolBar):
         # Connecter le bouton de déconnexion à la méthode logout
         if parent is not None:
             self.logout_button.clicked.connect(parent.logout)
+            self.action_diagnostics.triggered.connect(parent.open_diagnostics)
 
 class Footer(QFrame):
     """Pied de page personnalisé avec un design moderne"""
@@ -336,6 +335,7 @@ class MainMenu(QMainWindow):
         self.buttons['import_data'].clicked.connect(self.import_test_data)
         self.buttons['quit'].clicked.connect(self.quit_application)
 
+    @chronometre(AFFICHAGE)
     def open_user_management(self):
         """Ouvre la fenêtre de gestion des utilisateurs"""
         if self.role != "Jury":
@@ -347,264 +347,193 @@ class MainMenu(QMainWindow):
             )
             return
 
+        from views.user_management import UserManagement
+
         self.user_management_window = UserManagement()
         self.user_management_window.show()
 
+    @chronometre(AFFICHAGE)
     def open_gestion_candidats(self):
         """Ouvre la fenêtre de gestion des candidats"""
+        from views.view.gestion_candidats import GestionCandidats
+
         self.gestion_candidats_window = GestionCandidats()
         self.gestion_candidats_window.show()
 
+    @chronometre(AFFICHAGE)
     def open_parametre_jury(self):
         """Ouvre la fenêtre de paramétrage du jury"""
+        from views.view.parametre_jury_dialog import ParametreJuryDialog
+
         self.parametre_jury_window = ParametreJuryDialog()
         self.parametre_jury_window.show()
 
+    @chronometre(AFFICHAGE)
     def open_gestion_anonymats(self):
         """Ouvre la fenêtre de gestion Anonymats"""
+        from views.view.gestion_anonymats import GestionAnonymats
+
         self.gestion_anonymats_window = GestionAnonymats()
         self.gestion_anonymats_window.show()
 
+    @chronometre(AFFICHAGE)
     def open_saisie_notes(self):
         """Ouvre la fenêtre de saisie des notes"""
+        from views.view.saisie_notes import SaisieNotes
+
         self.open_saisie_notes_window = SaisieNotes()
         self.open_saisie_notes_window.show()
 
+    @chronometre(AFFICHAGE)
     def open_suivi_deliberation(self):
         """Ouvre la fenêtre de suivi des délibérations"""
+        from views.view.gestion_deliberations import GestionDeliberation
+
         self.open_suivi_deliberation_window = GestionDeliberation()
         self.open_suivi_deliberation_window.show()
 
+    @chronometre(AFFICHAGE)
     def open_suivi_repechage(self):
         """Ouvre la fenêtre de suivi des repêchages"""
+        from views.view.gestion_repechages import GestionRepechage
+
         self.open_suivi_repechage_window = GestionRepechage()
         self.open_suivi_repechage_window.show()
 
+    @chronometre(AFFICHAGE)
     def open_statistiques(self):
         """Ouvre la fenêtre des statistiques des résultats"""
+        from views.view.statistiques import Statistiques
+
         self.open_statistiques_window = Statistiques()
         self.open_statistiques_window.show()
 
+    @chronometre(AFFICHAGE)
     def open_pdf_generator(self):
         """Ouvre la fenêtre de l'impression des résultats"""
+        from views.view.pdf_generator import PDFGenerator
+
         self.open_pdf_generator_window = PDFGenerator()
         self.open_pdf_generator_window.show()
 
+    @chronometre(AFFICHAGE)
     def open_notes_generator(self):
         """Ouvre le générateur de relevés de notes"""
+        from views.view.releve_notes_generator import ReleveNotesGenerator
+
         self.open_notes_generator_window = ReleveNotesGenerator()
         self.open_notes_generator_window.show()
 
+    def open_diagnostics(self):
+        """Ouvre le panneau des mesures de performance"""
+        from views.view.diagnostics import Diagnostics
+
+        self.diagnostics_window = Diagnostics()
+        self.diagnostics_window.show()
+
     def import_test_data(self):
-        """Importe les données de test depuis le fichier Excel avec gestion des anonymats."""
-        conn = None
+        """Importe les données de test depuis le fichier Excel avec gestion des anonymats.
+
+        L'import s'exécute en arrière-plan ; la fenêtre de progression permet de l'annuler.
+        """
+        # pandas n'est chargé qu'au premier import
+        from models.import_pipeline import importer_fichier_excel, importer_en_flux, import_en_flux_conseille
+
         try:
-            # Chemin du fichier Excel
+            # Chemin du fichier Excel (ou de son export CSV)
             file_path = os.path.join(os.getcwd(), "BD_BFEM.xlsx")
+            if not os.path.exists(file_path) and os.path.exists(os.path.join(os.getcwd(), "BD_BFEM.csv")):
+                file_path = os.path.join(os.getcwd(), "BD_BFEM.csv")
 
             if not os.path.exists(file_path):
                 QMessageBox.critical(self, "Erreur", f"Le fichier n'existe pas à l'emplacement spécifié: {file_path}")
                 return
 
-            # Charger le fichier Excel
-            data = pd.read_excel(file_path, sheet_name=None)
-            feuille_candidats = "Feuille 1"
+            # Vérifier et créer les tables si nécessaire (le suivi des imports en fait partie)
+            conn = obtenir_connexion()
+            with conn:
+                creer_tables(conn.cursor(), ["Candidats", "Anonymats", "Livret_Scolaire", "Notes_Tour1",
+                                             "Import_Progression"])
 
-            if feuille_candidats not in data:
-                QMessageBox.critical(self, "Erreur", f"La feuille '{feuille_candidats}' est introuvable dans le fichier Excel.")
+            en_flux = import_en_flux_conseille(conn, file_path)
+            reprendre = self.demander_reprise(conn, file_path) if en_flux else False
+            if reprendre is None:
                 return
-
-            # Connexion à la base de données
-            conn = sqlite3.connect('bfem_db.sqlite')
-            cur = conn.cursor()
-
-            # Vérifier et créer les tables si nécessaire
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS Notes_Tour1 (
-                    id_candidat INTEGER,
-                    anonymat INTEGER,
-                    compo_francais REAL,
-                    dictee REAL,
-                    etude_de_texte REAL,
-                    instruction_civique REAL,
-                    histoire_geographie REAL,
-                    mathematiques REAL,
-                    pc_lv2 REAL,
-                    svt REAL,
-                    anglais_ecrit REAL,
-                    anglais_oral REAL,
-                    eps REAL,
-                    epreuve_facultative REAL
-                )
-            """)
-
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS Anonymats (
-                    id_candidat INTEGER,
-                    numero_anonymat INTEGER,
-                    tour INTEGER
-                )
-            """)
-
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS Livret_Scolaire (
-                    id_candidat INTEGER,
-                    nombre_de_fois INTEGER,
-                    moyenne_6e REAL,
-                    moyenne_5e REAL,
-                    moyenne_4e REAL,
-                    moyenne_3e REAL,
-                    moyenne_cycle REAL
-                )
-            """)
-
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS Candidats (
-                    id_candidat INTEGER PRIMARY KEY AUTOINCREMENT,
-                    numero_table INTEGER,
-                    prenom TEXT,
-                    nom TEXT,
-                    date_naissance TEXT,
-                    lieu_naissance TEXT,
-                    sexe TEXT,
-                    type_candidat TEXT,
-                    etablissement TEXT,
-                    nationalite TEXT,
-                    choix_epr_facultative BOOLEAN,
-                    epreuve_facultative TEXT,
-                    aptitude_sportive BOOLEAN
-                )
-            """)
-
-            # Nettoyer les tables existantes
-            cur.execute("DELETE FROM Notes_Tour1")
-            cur.execute("DELETE FROM Anonymats")
-            cur.execute("DELETE FROM Livret_Scolaire")
-            cur.execute("DELETE FROM Candidats")
-
-            # Convertir les dates en format string
-            df = data[feuille_candidats].copy()
-            df['Date de nais.'] = pd.to_datetime(df['Date de nais.']).dt.strftime('%Y-%m-%d')
-
-            # Fonction pour normaliser l'épreuve facultative
-            def normaliser_epreuve_facultative(valeur):
-                if pd.isna(valeur) or valeur == '':
-                    return 'Neutre'
-                valeur = str(valeur).upper().strip()
-                mapping = {
-                    'COUT': 'COUTURE',
-                    'DESS': 'DESSIN',
-                    'MUSI': 'MUSIQUE'
-                }
-                for key, mapped_value in mapping.items():
-                    if valeur.startswith(key):
-                        return mapped_value
-                return 'Neutre'
-
-            # Insérer les candidats
-            for index, row in df.iterrows():
-                numero_table = row['N° de table']
-                choix_epr_facultative = row.get('choix_epr_facultative', False)
-                epreuve_facultative = normaliser_epreuve_facultative(row['Epreuve Facultative'])
-
-                # Insérer le candidat
-                cur.execute("""
-                    INSERT INTO Candidats (
-                        numero_table, prenom, nom, date_naissance, lieu_naissance,
-                        sexe, type_candidat, etablissement, nationalite,
-                        choix_epr_facultative, epreuve_facultative, aptitude_sportive
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    numero_table, row['Prenom (s)'], row['NOM'], row['Date de nais.'],
-                    row['Lieu de nais.'], row['Sexe'], row['Type de candidat'], row['Etablissement'],
-                    row['Nationnallité'], choix_epr_facultative, epreuve_facultative,
-                    row['Etat Sportif']
-                ))
-
-            # Trier les candidats par numéro de table
-            df = df.sort_values(by='N° de table')
-
-            # Générer les anonymats
-            numeros_utilises = set()
-            for index, row in df.iterrows():
-                numero_table = row['N° de table']
-                while True:
-                    anonymat = random.randint(1000, 9999)
-                    if anonymat not in numeros_utilises:
-                        numeros_utilises.add(anonymat)
-                        break
-
-                # Récupérer l'ID du candidat
-                cur.execute("SELECT id_candidat FROM Candidats WHERE numero_table = ?", (numero_table,))
-                result = cur.fetchone()
-                if result:
-                    id_candidat = result[0]
-                else:
-                    print(f"Aucun candidat trouvé pour le numéro de table {numero_table}")
-                    continue
-
-                # Insérer l'anonymat
-                cur.execute("""
-                    INSERT INTO Anonymats (id_candidat, numero_anonymat, tour)
-                    VALUES (?, ?, 1)
-                """, (id_candidat, anonymat))
-
-                # Insérer les données du livret scolaire
-                moyennes = [
-                    float(row['Moy_6e']) if pd.notna(row['Moy_6e']) else 0,
-                    float(row['Moy_5e']) if pd.notna(row['Moy_5e']) else 0,
-                    float(row['Moy_4e']) if pd.notna(row['Moy_4e']) else 0,
-                    float(row['Moy_3e']) if pd.notna(row['Moy_3e']) else 0
-                ]
-                moyenne_cycle = sum(moyennes) / len([m for m in moyennes if m > 0]) if any(m > 0 for m in moyennes) else 0
-
-                cur.execute("""
-                    INSERT INTO Livret_Scolaire (
-                        id_candidat, nombre_de_fois, moyenne_6e, moyenne_5e, moyenne_4e, moyenne_3e, moyenne_cycle
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    numero_table, row['Nb fois'],
-                    float(row['Moy_6e']) if pd.notna(row['Moy_6e']) else None,
-                    float(row['Moy_5e']) if pd.notna(row['Moy_5e']) else None,
-                    float(row['Moy_4e']) if pd.notna(row['Moy_4e']) else None,
-                    float(row['Moy_3e']) if pd.notna(row['Moy_3e']) else None,
-                    moyenne_cycle
-                ))
-
-                # Insérer les notes du premier tour
-                cur.execute("""
-                    INSERT INTO Notes_Tour1 (
-                        id_candidat, anonymat, compo_francais, dictee, etude_de_texte, instruction_civique,
-                        histoire_geographie, mathematiques, pc_lv2, svt, anglais_ecrit, anglais_oral,
-                        eps, epreuve_facultative
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    id_candidat,
-                    anonymat,
-                    float(row['Note CF']) if pd.notna(row['Note CF']) else None,
-                    float(row['Note Ort']) if pd.notna(row['Note Ort']) else None,
-                    float(row['Note TSQ']) if pd.notna(row['Note TSQ']) else None,
-                    float(row['Note IC']) if pd.notna(row['Note IC']) else None,
-                    float(row['Note HG']) if pd.notna(row['Note HG']) else None,
-                    float(row['Note MATH']) if pd.notna(row['Note MATH']) else None,
-                    float(row['Note PC/LV2']) if pd.notna(row['Note PC/LV2']) else None,
-                    float(row['Note SVT']) if pd.notna(row['Note SVT']) else None,
-                    float(row['Note ANG1']) if pd.notna(row['Note ANG1']) else None,
-                    float(row['Note ANG2']) if pd.notna(row['Note ANG2']) else None,
-                    float(row['Note EPS']) if pd.notna(row['Note EPS']) else None,
-                    float(row['Note Ep Fac']) if pd.notna(row['Note Ep Fac']) else None
-                ))
-
-            # Valider les modifications
-            conn.commit()
-            QMessageBox.information(self, "Import des données", "Données importées avec succès !")
-
         except Exception as e:
             error_message = f"Erreur lors de l'importation des données : {str(e)}\n\n{traceback.format_exc()}"
             QMessageBox.critical(self, "Erreur", error_message)
-        finally:
-            if conn:
-                conn.close()
+            return
+
+        def importer(conn, tache):
+            if en_flux:
+                # Chaque lot est validé : une annulation conserve les lots déjà importés
+                return importer_en_flux(conn, file_path, reprendre=reprendre,
+                                        progression=lambda fait, total: tache.progression(fait, total))
+            # Chargement groupé dans une seule transaction
+            return importer_fichier_excel(conn, file_path)
+
+        dialogue = QProgressDialog("Import des candidats...", "Annuler", 0, 0, self)
+        dialogue.setWindowTitle("Import des données")
+        dialogue.setWindowModality(Qt.WindowModal)
+        dialogue.setMinimumDuration(0)
+        dialogue.setAutoClose(False)
+        dialogue.setAutoReset(False)
+
+        def progression(lignes_importees, total):
+            if total:
+                dialogue.setMaximum(total)
+                dialogue.setValue(min(lignes_importees, total))
+            dialogue.setLabelText(f"{lignes_importees} lignes importées...")
+
+        def termine(rapport):
+            dialogue.close()
+            QMessageBox.information(
+                self, "Import des données",
+                f"Données importées avec succès !\n\n"
+                f"{rapport.nb_candidats} candidats, {rapport.nb_lignes} lignes en {rapport.duree:.2f} s "
+                f"({rapport.lignes_par_seconde:,.0f} lignes/s)"
+            )
+
+        def erreur(e):
+            dialogue.close()
+            if isinstance(e, ValueError):
+                QMessageBox.critical(self, "Erreur", str(e))
+            else:
+                QMessageBox.critical(self, "Erreur", f"Erreur lors de l'importation des données : {str(e)}")
+
+        def annulee():
+            dialogue.close()
+            message = "Import annulé."
+            if en_flux:
+                message += "\nLes lots déjà validés sont conservés : l'import pourra être repris."
+            QMessageBox.information(self, "Import des données", message)
+
+        tache = gestionnaire_taches().soumettre(
+            importer, progression=progression, termine=termine, erreur=erreur, annulee=annulee
+        )
+        dialogue.canceled.connect(tache.annuler)
+        dialogue.show()
+
+    def demander_reprise(self, conn, file_path):
+        """Propose de reprendre un import interrompu de ce fichier.
+
+        Retourne True (reprendre), False (recommencer) ou None (abandon).
+        """
+        from models.import_pipeline import import_interrompu
+
+        deja_importees = import_interrompu(conn, file_path)
+        if not deja_importees:
+            return False
+        reponse = QMessageBox.question(
+            self, "Import interrompu",
+            f"Un import précédent de ce fichier s'est arrêté après {deja_importees} lignes.\n"
+            f"Voulez-vous le reprendre ? (Non = recommencer depuis le début)",
+            QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel,
+            QMessageBox.Yes
+        )
+        if reponse == QMessageBox.Cancel:
+            return None
+        return reponse == QMessageBox.Yes
 
     def quit_application(self):
         """Quitte l'application"""
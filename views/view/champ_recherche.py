@@ -0,0 +1,40 @@
+import sqlite3
+from PyQt5.QtWidgets import QLineEdit, QMessageBox
+from PyQt5.QtCore import QTimer, pyqtSignal
+from models.recherche import rechercher_candidats
+
+# Délai après la dernière frappe avant de lancer la recherche (ms)
+DELAI_RECHERCHE = 250
+
+
+class ChampRecherche(QLineEdit):
+    """Champ de recherche de candidats partagé par les écrans.
+
+    recherche(texte) n'est émis qu'après une courte pause de frappe, pas à chaque touche.
+    """
+    recherche = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setPlaceholderText("Rechercher par nom, prénom, lieu de naissance, établissement ou numéro de table...")
+        self.setClearButtonEnabled(True)
+        self.minuteur = QTimer(self)
+        self.minuteur.setSingleShot(True)
+        self.minuteur.setInterval(DELAI_RECHERCHE)
+        self.minuteur.timeout.connect(self.emettre)
+        self.textChanged.connect(self.minuteur.start)
+        self.returnPressed.connect(self.emettre)
+
+    def emettre(self):
+        self.minuteur.stop()
+        self.recherche.emit(self.text())
+
+
+def filtrer_tableau(table, conn, texte, colonne_id):
+    """Filtre une VueTableLazy sur les candidats trouvés ; colonne_id est l'index de id_candidat dans la ligne."""
+    try:
+        ids = rechercher_candidats(conn, texte)
+    except sqlite3.Error as e:
+        QMessageBox.critical(table.window(), "Erreur", f"Erreur lors de la recherche des candidats : {e}")
+        return
+    table.modele.filtrer(None if ids is None else (lambda ligne: ligne[colonne_id] in ids))
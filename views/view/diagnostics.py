@@ -0,0 +1,113 @@
+import sys
+from PyQt5.QtWidgets import (
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QCheckBox, QTableWidget, QTableWidgetItem, QHeaderView
+)
+from PyQt5.QtGui import QFont
+from PyQt5.QtCore import Qt, QTimer
+from models import instrumentation
+from models.instrumentation import AFFICHAGE, CALCUL, RENDU, REQUETE
+
+# Couleurs inspirées du MainMenu
+PRIMARY_COLOR = "#2C3E50"
+ACCENT_COLOR = "#1ABC9C"
+TEXT_COLOR = "#FFFFFF"
+
+# Rafraîchissement automatique du tableau, en millisecondes
+INTERVALLE_RAFRAICHISSEMENT = 2000
+
+
+class Diagnostics(QMainWindow):
+    """Mesures de performance collectées par models.instrumentation.
+
+    Le bandeau répartit le temps entre requêtes, calcul, affichage et rendu PDF ; le
+    tableau détaille les opérations de la plus coûteuse à la moins coûteuse.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Diagnostics des performances")
+        self.setGeometry(250, 150, 1000, 600)
+        self.setStyleSheet(f"background-color: {PRIMARY_COLOR}; color: {TEXT_COLOR}; font-family: 'Roboto';")
+
+        self.central_widget = QWidget()
+        self.setCentralWidget(self.central_widget)
+        self.layout = QVBoxLayout(self.central_widget)
+
+        titre = QLabel("Diagnostics des performances")
+        titre.setFont(QFont("Roboto", 16, QFont.Bold))
+        titre.setAlignment(Qt.AlignCenter)
+        self.layout.addWidget(titre)
+
+        # Activation et actions
+        barre = QHBoxLayout()
+        self.case_active = QCheckBox("Mesures actives")
+        self.case_active.setChecked(instrumentation.est_actif())
+        self.case_active.toggled.connect(self.basculer_mesures)
+        barre.addWidget(self.case_active)
+        barre.addStretch()
+        for texte, action in (("Rafraîchir", self.rafraichir), ("Réinitialiser", self.reinitialiser)):
+            bouton = QPushButton(texte)
+            bouton.setStyleSheet(f"background-color: {ACCENT_COLOR}; color: {TEXT_COLOR}; padding: 8px; border-radius: 5px;")
+            bouton.clicked.connect(action)
+            barre.addWidget(bouton)
+        self.layout.addLayout(barre)
+
+        # Répartition du temps par catégorie
+        self.repartition = QLabel()
+        self.repartition.setFont(QFont("Roboto", 11))
+        self.layout.addWidget(self.repartition)
+
+        self.table = QTableWidget(0, 6)
+        self.table.setHorizontalHeaderLabels(
+            ["Catégorie", "Opération", "Appels", "Total (ms)", "Moyenne (ms)", "Max (ms)"])
+        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setStyleSheet("background-color: white; color: black;")
+        self.layout.addWidget(self.table)
+
+        self.note = QLabel(f"Journal : {instrumentation.charger_reglages()['journal']}")
+        self.layout.addWidget(self.note)
+
+        self.minuteur = QTimer(self)
+        self.minuteur.timeout.connect(self.rafraichir)
+        self.minuteur.start(INTERVALLE_RAFRAICHISSEMENT)
+        self.rafraichir()
+
+    def basculer_mesures(self, actif):
+        instrumentation.activer(actif)
+        if actif:
+            self.note.setText("Mesures actives : les requêtes de toutes les fenêtres sont mesurées.")
+
+    def reinitialiser(self):
+        instrumentation.reinitialiser()
+        self.rafraichir()
+
+    def rafraichir(self):
+        """Recharge les compteurs dans le bandeau et le tableau."""
+        totaux = instrumentation.totaux_par_categorie()
+        self.repartition.setText("   ".join(
+            f"{categorie} : {totaux.get(categorie, 0) * 1000:.0f} ms"
+            for categorie in (REQUETE, CALCUL, AFFICHAGE, RENDU)
+        ))
+
+        statistiques = instrumentation.resume()
+        self.table.setRowCount(len(statistiques))
+        for row, statistique in enumerate(statistiques):
+            valeurs = [
+                statistique.categorie, statistique.operation, str(statistique.appels),
+                f"{statistique.total * 1000:.1f}", f"{statistique.moyenne * 1000:.2f}",
+                f"{statistique.maximum * 1000:.1f}"
+            ]
+            for col, valeur in enumerate(valeurs):
+                item = QTableWidgetItem(valeur)
+                if col != 1:
+                    item.setTextAlignment(Qt.AlignCenter)
+                self.table.setItem(row, col, item)
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    window = Diagnostics()
+    window.show()
+    sys.exit(app.exec_())
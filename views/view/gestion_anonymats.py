@@ -1,12 +1,15 @@
 import sqlite3
-import random
 import sys
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QPushButton,
-    QTableWidget, QTableWidgetItem, QMessageBox, QLabel, QHeaderView
+    QMessageBox, QLabel, QHeaderView
 )
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import Qt
+from controllers.task_controller import gestionnaire_taches
+from models.anonymats import attribuer_anonymats_manquants
+from models.database_manager import obtenir_connexion
+from views.view.modele_table import VueTableLazy
 
 # Styles inspirés du MainMenu
 PRIMARY_COLOR = "#2C3E50"
@@ -49,9 +52,7 @@ class GestionAnonymats(QMainWindow):
         self.layout.addWidget(self.btn_generer, alignment=Qt.AlignCenter)
 
         # Tableau pour afficher les anonymats
-        self.table = QTableWidget()
-        self.table.setColumnCount(3)
-        self.table.setHorizontalHeaderLabels(["Numéro Table", "Nom Candidat", "Numéro Anonymat"])
+        self.table = VueTableLazy([("Numéro Table", 0), ("Nom Candidat", 1), ("Numéro Anonymat", 2)])
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.table.setStyleSheet("background-color: white; border-radius: 5px; color: black;")
         self.layout.addWidget(self.table)
@@ -61,67 +62,37 @@ class GestionAnonymats(QMainWindow):
 
     def charger_anonymats(self):
         """Charge les anonymats existants dans le tableau."""
-        self.table.setRowCount(0)
         try:
-            conn = sqlite3.connect("bfem_db.sqlite")
-            cur = conn.cursor()
+            cur = obtenir_connexion().cursor()
             cur.execute("""
                 SELECT Candidats.numero_table, Candidats.nom || ' ' || Candidats.prenom, Anonymats.numero_anonymat
                 FROM Anonymats
                 JOIN Candidats ON Anonymats.id_candidat = Candidats.id_candidat
                 ORDER BY Candidats.numero_table
             """)
-            anonymats = cur.fetchall()
-            conn.close()
-
-            for row, anonymat in enumerate(anonymats):
-                self.table.insertRow(row)
-                for col, value in enumerate(anonymat):
-                    self.table.setItem(row, col, QTableWidgetItem(str(value)))
+            self.table.modele.definir_lignes(cur.fetchall())
         except sqlite3.Error as e:
             QMessageBox.critical(self, "Erreur", f"Erreur lors du chargement des anonymats : {e}")
 
     def generer_anonymats(self):
         """Génère les anonymats pour les candidats sans anonymat."""
-        try:
-            conn = sqlite3.connect("bfem_db.sqlite")
-            cur = conn.cursor()
-
-            # Récupérer les candidats sans anonymat
-            cur.execute("""
-                SELECT id_candidat FROM Candidats
-                WHERE id_candidat NOT IN (SELECT id_candidat FROM Anonymats)
-            """)
-            candidats = cur.fetchall()
+        self.btn_generer.setEnabled(False)
 
-            if not candidats:
+        def terminer(nb_crees):
+            self.btn_generer.setEnabled(True)
+            if not nb_crees:
                 QMessageBox.information(self, "Info", "Tous les candidats ont déjà un anonymat.")
-                conn.close()
                 return
-
-            # Récupérer les numéros d'anonymat déjà utilisés
-            cur.execute("SELECT numero_anonymat FROM Anonymats")
-            numeros_utilises = {row[0] for row in cur.fetchall()}
-
-            # Générer des numéros d'anonymat uniques
-            nb_candidats = len(candidats)
-            numeros_disponibles = set(range(1, nb_candidats + 100))  # Marge de sécurité
-            numeros_disponibles -= numeros_utilises
-            numeros_anonymat = random.sample(sorted(numeros_disponibles), nb_candidats)
-
-            # Insérer les nouveaux anonymats
-            for i, (id_candidat,) in enumerate(candidats):
-                cur.execute("""
-                    INSERT INTO Anonymats (id_candidat, numero_anonymat, tour)
-                    VALUES (?, ?, 1)
-                """, (id_candidat, numeros_anonymat[i]))
-
-            conn.commit()
-            conn.close()
             QMessageBox.information(self, "Succès", "Anonymats générés avec succès.")
             self.charger_anonymats()
-        except sqlite3.Error as e:
-            QMessageBox.critical(self, "Erreur", f"Erreur lors de la génération des anonymats : {e}")
+
+        def echouer(erreur):
+            self.btn_generer.setEnabled(True)
+            QMessageBox.critical(self, "Erreur", f"Erreur lors de la génération des anonymats : {erreur}")
+
+        # Génération hors du thread graphique
+        gestionnaire_taches().soumettre(lambda conn, tache: attribuer_anonymats_manquants(conn),
+                                        termine=terminer, erreur=echouer)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -2,13 +2,16 @@ import sys
 import sqlite3
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QTableWidget, QTableWidgetItem, QPushButton, QMessageBox, QDialog,
+    QPushButton, QMessageBox, QDialog,
     QLabel, QLineEdit, QDateEdit, QComboBox, QFormLayout, QSpinBox,
     QFrame
 )
 from PyQt5.QtCore import QDate, Qt
 from PyQt5.QtGui import QFont, QColor, QPalette
 from views.view.gestion_livet_dialog import GestionLivretDialog
+from views.view.modele_table import VueTableLazy
+from views.view.champ_recherche import ChampRecherche, filtrer_tableau
+from models.database_manager import obtenir_connexion
 
 # Constantes de couleurs (reprises du menu principal)
 PRIMARY_COLOR = "#2C3E50"
@@ -28,7 +31,7 @@ APP_STYLE = f"""
     QFrame {{
         background-color: {BACKGROUND_COLOR};
     }}
-    QTableWidget {{
+    QTableView {{
         background-color: white;
         border: 1px solid {SECONDARY_COLOR};
         border-radius: 8px;
@@ -42,11 +45,11 @@ APP_STYLE = f"""
         font-family: 'Roboto';
         font-size: 14px;
     }}
-    QTableWidget::item {{
+    QTableView::item {{
         padding: 8px;
         font-family: 'Roboto';
     }}
-    QTableWidget::item:selected {{
+    QTableView::item:selected {{
         background-color: {ACCENT_COLOR};
         color: {TEXT_COLOR};
     }}
@@ -95,7 +98,7 @@ class GestionCandidats(QMainWindow):
         self.setStyleSheet(APP_STYLE)
 
         # Connexion à la base de données
-        self.conn = sqlite3.connect("bfem_db.sqlite")
+        self.conn = obtenir_connexion()
         self.cur = self.conn.cursor()
 
         # Widget central
@@ -127,11 +130,14 @@ class GestionCandidats(QMainWindow):
         
         self.layout.addWidget(self.header_frame)
 
+        # Recherche plein texte
+        self.champ_recherche = ChampRecherche()
+        self.champ_recherche.setStyleSheet("background-color: white; color: black; padding: 8px; border-radius: 5px;")
+        self.champ_recherche.recherche.connect(self.rechercher)
+        self.layout.addWidget(self.champ_recherche)
+
         # Tableau des candidats
-        self.table = QTableWidget()
-        self.table.setColumnCount(len(COLUMNS))
-        self.table.setHorizontalHeaderLabels(COLUMNS)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table = VueTableLazy([(titre, i) for i, titre in enumerate(COLUMNS)])
         self.layout.addWidget(self.table)
 
         # Conteneur pour les boutons
@@ -169,15 +175,19 @@ class GestionCandidats(QMainWindow):
 
     def charger_candidats(self):
         """Charge les candidats depuis la base de données"""
-        self.table.setRowCount(0)
         try:
             self.cur.execute("SELECT * FROM Candidats")
-            for row_idx, row_data in enumerate(self.cur.fetchall()):
-                self.table.insertRow(row_idx)
-                for col_idx, cell_data in enumerate(row_data):
-                    self.table.setItem(row_idx, col_idx, QTableWidgetItem(str(cell_data)))
+            self.table.modele.definir_lignes(self.cur.fetchall())
         except sqlite3.Error as e:
             QMessageBox.critical(self, "Erreur", f"Erreur lors du chargement des candidats : {e}")
+            return
+        # Les candidats ajoutés ou modifiés sont soumis à la recherche en cours
+        if self.champ_recherche.text():
+            self.rechercher()
+
+    def rechercher(self):
+        """Ne garde que les candidats correspondant à la recherche (id_candidat en colonne 0)."""
+        filtrer_tableau(self.table, self.conn, self.champ_recherche.text(), 0)
 
     def ajouter_candidat(self):
         dialog = AjouterCandidatDialog(self)
@@ -188,7 +198,7 @@ class GestionCandidats(QMainWindow):
         if self.table.currentRow() == -1:
             QMessageBox.warning(self, "Sélection requise", "Veuillez sélectionner un candidat à modifier.")
             return
-        id_candidat = self.table.item(self.table.currentRow(), 0).text()
+        id_candidat = self.table.texte(self.table.currentRow(), 0)
         dialog = ModifierCandidatDialog(self, id_candidat)
         if dialog.exec_() == QDialog.Accepted:
             self.charger_candidats()
@@ -199,9 +209,9 @@ class GestionCandidats(QMainWindow):
             return
         if QMessageBox.question(self, "Confirmation", "Voulez-vous vraiment supprimer ce candidat ?") == QMessageBox.Yes:
             try:
-                id_candidat = self.table.item(self.table.currentRow(), 0).text()
-                self.cur.execute("DELETE FROM Candidats WHERE id_candidat = ?", (id_candidat,))
-                self.conn.commit()
+                id_candidat = self.table.texte(self.table.currentRow(), 0)
+                with self.conn:
+                    self.cur.execute("DELETE FROM Candidats WHERE id_candidat = ?", (id_candidat,))
                 self.charger_candidats()
             except sqlite3.Error as e:
                 QMessageBox.critical(self, "Erreur", f"Erreur lors de la suppression : {e}")
@@ -210,14 +220,10 @@ class GestionCandidats(QMainWindow):
         if self.table.currentRow() == -1:
             QMessageBox.warning(self, "Sélection requise", "Veuillez sélectionner un candidat.")
             return
-        id_candidat = self.table.item(self.table.currentRow(), 0).text()
+        id_candidat = self.table.texte(self.table.currentRow(), 0)
         dialog = GestionLivretDialog(self, id_candidat)
         dialog.exec_()
 
-    def closeEvent(self, event):
-        self.conn.close()
-        event.accept()
-
 class BaseCandidatDialog(QDialog):
     def __init__(self, parent=None, title=""):
         super().__init__(parent)
@@ -238,7 +244,7 @@ class AjouterCandidatDialog(QDialog):
         self.setStyleSheet(APP_STYLE)  # Appliquer le style CSS
 
         # Connexion à la base de données
-        self.conn = sqlite3.connect("bfem_db.sqlite")
+        self.conn = obtenir_connexion()
         self.cur = self.conn.cursor()
 
         # Layout principal
@@ -314,14 +320,14 @@ class AjouterCandidatDialog(QDialog):
 
         # Insertion dans la base de données
         try:
-            self.cur.execute(
-                "INSERT INTO Candidats (numero_table, prenom, nom, date_naissance, lieu_naissance, "
-                "sexe, type_candidat, etablissement, nationalite, choix_epr_facultative, epreuve_facultative, aptitude_sportive) "
-                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                (numero_table, prenom, nom, date_naissance, lieu_naissance, sexe, type_candidat,
-                 etablissement, nationalite, choix_epr_facultative, epreuve_facultative, aptitude_sportive)
-            )
-            self.conn.commit()
+            with self.conn:
+                self.cur.execute(
+                    "INSERT INTO Candidats (numero_table, prenom, nom, date_naissance, lieu_naissance, "
+                    "sexe, type_candidat, etablissement, nationalite, choix_epr_facultative, epreuve_facultative, aptitude_sportive) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (numero_table, prenom, nom, date_naissance, lieu_naissance, sexe, type_candidat,
+                     etablissement, nationalite, choix_epr_facultative, epreuve_facultative, aptitude_sportive)
+                )
             QMessageBox.information(self, "Succès", "Candidat ajouté avec succès")
             self.accept()
         except sqlite3.IntegrityError:
@@ -376,14 +382,14 @@ class ModifierCandidatDialog(AjouterCandidatDialog):
                 return
 
             # Mise à jour dans la base de données
-            self.parent().cur.execute(
-                "UPDATE Candidats SET numero_table = ?, prenom = ?, nom = ?, date_naissance = ?, "
-                "lieu_naissance = ?, sexe = ?, type_candidat = ?, etablissement = ?, nationalite = ?, "
-                "choix_epr_facultative = ?, epreuve_facultative = ?, aptitude_sportive = ? WHERE id_candidat = ?",
-                (numero_table, prenom, nom, date_naissance, lieu_naissance, sexe, type_candidat,
-                 etablissement, nationalite, choix_epr_facultative, epreuve_facultative, aptitude_sportive, self.id_candidat)
-            )
-            self.parent().conn.commit()
+            with self.parent().conn:
+                self.parent().cur.execute(
+                    "UPDATE Candidats SET numero_table = ?, prenom = ?, nom = ?, date_naissance = ?, "
+                    "lieu_naissance = ?, sexe = ?, type_candidat = ?, etablissement = ?, nationalite = ?, "
+                    "choix_epr_facultative = ?, epreuve_facultative = ?, aptitude_sportive = ? WHERE id_candidat = ?",
+                    (numero_table, prenom, nom, date_naissance, lieu_naissance, sexe, type_candidat,
+                     etablissement, nationalite, choix_epr_facultative, epreuve_facultative, aptitude_sportive, self.id_candidat)
+                )
             self.accept()
         except sqlite3.IntegrityError:
             QMessageBox.warning(self, "Erreur", "Le numéro de table doit être unique.")
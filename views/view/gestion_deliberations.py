@@ -1,19 +1,34 @@
 import sys
 import sqlite3
+import time
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem,
-    QPushButton, QMessageBox, QHBoxLayout, QLabel, QComboBox, QLineEdit
+    QApplication, QMainWindow, QWidget, QVBoxLayout,
+    QPushButton, QMessageBox, QHBoxLayout, QLabel, QComboBox
 )
 from PyQt5.QtGui import QFont
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from views.view.saisie_notes import SaisieNotesDialog
 from views.view.saisie_notes import SaisieNotes
+from controllers.task_controller import gestionnaire_taches
+from models.database_manager import obtenir_connexion
+from views.view.modele_table import VueTableLazy
+from views.view.champ_recherche import ChampRecherche
+from models.deliberation_engine import (
+    charger_resultat_candidat, compter_resultats, determiner_statut, finaliser_resultats,
+    page_resultats, rafraichir_resultats, resultats_a_recalculer
+)
 # Couleurs inspirées du MainMenu
 PRIMARY_COLOR = "#2C3E50"
 ACCENT_COLOR = "#1ABC9C"
 TEXT_COLOR = "#FFFFFF"
 HOVER_COLOR = "#2980B9"
 
+# Intervalle de vérification des nouvelles notes pour le classement en direct (ms)
+INTERVALLE_SUIVI_NOTES = 3000
+
+# Candidats affichés par page ; filtre et recherche sont exécutés par SQLite
+TAILLE_PAGE_RESULTATS = 100
+
 class GestionDeliberation(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -22,7 +37,7 @@ class GestionDeliberation(QMainWindow):
         self.setStyleSheet(f"background-color: {PRIMARY_COLOR}; color: {TEXT_COLOR}; font-family: 'Roboto';")
 
         # Connexion à la base de données
-        self.conn = sqlite3.connect("bfem_db.sqlite")
+        self.conn = obtenir_connexion()
         self.cur = self.conn.cursor()
 
         # Widget central
@@ -39,8 +54,16 @@ class GestionDeliberation(QMainWindow):
         self.title.setAlignment(Qt.AlignCenter)
         self.layout.addWidget(self.title)
 
+        # Vrai pendant qu'une opération longue tourne dans le pool de tâches
+        self.tache_en_cours = False
+
+        # Pagination : seule la page courante est lue et affichée
+        self.page = 0
+        self.nb_resultats = 0
+
         # Tableau des candidats
         self.setup_table()
+        self.setup_pagination()
 
         # Filtres et contrôles
         self.setup_controls()
@@ -51,27 +74,50 @@ class GestionDeliberation(QMainWindow):
         # Charger les candidats
         self.charger_candidats()
 
+        # Classement en direct : seuls les candidats dont les notes ont changé sont recalculés
+        self.timer_suivi = QTimer(self)
+        self.timer_suivi.timeout.connect(self.suivre_nouvelles_notes)
+        self.timer_suivi.start(INTERVALLE_SUIVI_NOTES)
+
     def setup_table(self):
         """Configure le tableau des candidats."""
-        self.table = QTableWidget()
-        self.table.setColumnCount(9)
-        headers = [
-            "Numéro Table",
-            "Nom Candidat",
-            "Points 1er Tour",
-            "Points 2nd Tour",
-            "Moyenne Cycle",
-            "Bonus/Malus",
-            "Total Points",
-            "Statut",
-            "Actions"
+        colonnes = [
+            ("Numéro Table", lambda r: r.numero_table),
+            ("Nom Candidat", lambda r: r.nom_complet),
+            ("Points 1er Tour", lambda r: r.points_tour1),
+            ("Points 2nd Tour", lambda r: r.points_tour2 if r.points_tour2 else "N/A"),
+            ("Moyenne Cycle", lambda r: r.moyenne_cycle),
+            ("Bonus/Malus", lambda r: r.bonus_malus),
+            ("Total Points", lambda r: r.points_tour1 + r.bonus_malus),
+            ("Statut", lambda r: r.statut),
+            ("Actions", lambda r: "Détails")
         ]
-        self.table.setHorizontalHeaderLabels(headers)
-        
+        # Les ResultatCandidat servent directement de lignes : aucun objet par cellule
+        self.table = VueTableLazy(colonnes)
+        self.table.ajouter_bouton(8, HOVER_COLOR, TEXT_COLOR, self.afficher_details)
         self.table.setStyleSheet("background-color: white; color: black; border-radius: 5px;")
         self.table.horizontalHeader().setStretchLastSection(True)
         self.layout.addWidget(self.table)
 
+    def setup_pagination(self):
+        """Configure la navigation entre les pages de résultats."""
+        pagination_layout = QHBoxLayout()
+
+        self.btn_page_precedente = QPushButton("◀ Précédent")
+        self.btn_page_suivante = QPushButton("Suivant ▶")
+        self.label_page = QLabel()
+        self.label_page.setAlignment(Qt.AlignCenter)
+        for btn in [self.btn_page_precedente, self.btn_page_suivante]:
+            btn.setStyleSheet(f"background-color: {ACCENT_COLOR}; color: {TEXT_COLOR}; padding: 5px; border-radius: 5px;")
+
+        self.btn_page_precedente.clicked.connect(lambda: self.changer_page(-1))
+        self.btn_page_suivante.clicked.connect(lambda: self.changer_page(1))
+
+        pagination_layout.addWidget(self.btn_page_precedente)
+        pagination_layout.addWidget(self.label_page, 1)
+        pagination_layout.addWidget(self.btn_page_suivante)
+        self.layout.addLayout(pagination_layout)
+
     def setup_controls(self):
             """Configure les filtres et contrôles."""
             controls_layout = QHBoxLayout()
@@ -80,9 +126,8 @@ class GestionDeliberation(QMainWindow):
             self.statut_filter.addItems(["Tous", "Admis", "2nd Tour", "Repêchage", "Échec"])
             self.statut_filter.currentTextChanged.connect(self.appliquer_filtres)
 
-            self.search_box = QLineEdit()
-            self.search_box.setPlaceholderText("Rechercher un candidat...")
-            self.search_box.textChanged.connect(self.appliquer_filtres)
+            self.search_box = ChampRecherche()
+            self.search_box.recherche.connect(self.appliquer_filtres)
 
             for widget in [QLabel("Filtrer par statut:"), self.statut_filter,
                         QLabel("Rechercher:"), self.search_box]:
@@ -124,159 +169,83 @@ class GestionDeliberation(QMainWindow):
 
     def calculer_points_et_statut(self, id_candidat):
         """Calcule les points et détermine le statut d'un candidat."""
-        self.cur.execute("""
-            SELECT compo_francais, dictee, etude_de_texte, instruction_civique,
-                histoire_geographie, mathematiques, pc_lv2, svt,
-                anglais_ecrit, anglais_oral, eps, epreuve_facultative
-            FROM Notes_Tour1
-            WHERE id_candidat = ?
-        """, (id_candidat,))
-        notes_tour1 = self.cur.fetchone()
-
-        if not notes_tour1:
-            return None, None, None, 0, "Notes manquantes"
-
-        self.cur.execute("""
-            SELECT francais_2nd_tour, mathematiques_2nd_tour, pc_lv2_2nd_tour
-            FROM Notes_Tour2
-            WHERE id_candidat = ?
-        """, (id_candidat,))
-        notes_tour2 = self.cur.fetchone()
-
-        self.cur.execute("""
-            SELECT moyenne_cycle
-            FROM Livret_Scolaire
-            WHERE id_candidat = ?
-        """, (id_candidat,))
-        moyenne_cycle = self.cur.fetchone()
-        moyenne_cycle = moyenne_cycle[0] if moyenne_cycle else 0
-
-        coefficients_tour1 = {
-            "compo_francais": 2, "dictee": 1, "etude_de_texte": 1,
-            "instruction_civique": 1, "histoire_geographie": 2,
-            "mathematiques": 4, "pc_lv2": 2, "svt": 2,
-            "anglais_ecrit": 2, "anglais_oral": 1
-        }
-
-        points_tour1 = sum(notes_tour1[i] * coef
-                        for i, (matiere, coef) in enumerate(coefficients_tour1.items())
-                        if notes_tour1[i] is not None)
-
-        bonus_malus = 0
-
-        if notes_tour1[10] is not None:
-            if notes_tour1[10] > 10:
-                bonus_malus += (notes_tour1[10] - 10)
-            else:
-                bonus_malus -= (10 - notes_tour1[10])
-
-        if notes_tour1[11] is not None and notes_tour1[11] > 10:
-            bonus_malus += (notes_tour1[11] - 10)
-
-        points_tour2 = None
-        if notes_tour2:
-            coefficients_tour2 = {
-                "francais_2nd_tour": 2,
-                "mathematiques_2nd_tour": 4,
-                "pc_lv2_2nd_tour": 2
-            }
-            points_tour2 = sum(notes_tour2[i] * coef
-                            for i, coef in enumerate(coefficients_tour2.values())
-                            if notes_tour2[i] is not None)
-
-        total_points = points_tour1 + bonus_malus
-        statut = self.determiner_statut(total_points, points_tour2, moyenne_cycle)
-
-        return total_points, points_tour2, moyenne_cycle, bonus_malus, statut
+        return charger_resultat_candidat(self.cur, id_candidat)
 
     def determiner_statut(self, points_tour1, points_tour2, moyenne_cycle):
         """Détermine le statut d'un candidat selon les règles RM4-RM9."""
-        if points_tour2 is not None:
-            if points_tour2 >= 60:
-                return "Admis"
-            return "Échec"
-
-        if points_tour1 >= 180:
-            return "Admis"
-        elif 153 <= points_tour1 < 171:
-            return "2nd Tour"
-        elif 171 <= points_tour1 < 180:
-            return "Repêchage"
-        elif 144 <= points_tour1 < 153:
-            return "Repêchage"
-        elif moyenne_cycle >= 12:
-            return "Repêchage"
-        else:
-            return "Échec"
+        return determiner_statut(points_tour1, points_tour2, moyenne_cycle)
+
+    def executer_en_arriere_plan(self, fonction, termine, message, contexte_erreur):
+        """Exécute fonction(conn) dans le pool de tâches ; l'écran reste utilisable."""
+        self.tache_en_cours = True
+        self.activer_boutons(False)
+        self.statusBar().showMessage(message)
+
+        def terminer(resultat):
+            self.tache_en_cours = False
+            self.activer_boutons(True)
+            self.statusBar().clearMessage()
+            termine(resultat)
+
+        def echouer(erreur):
+            self.tache_en_cours = False
+            self.activer_boutons(True)
+            self.statusBar().clearMessage()
+            QMessageBox.critical(self, "Erreur", f"{contexte_erreur} : {erreur}")
+
+        gestionnaire_taches().soumettre(lambda conn, tache: fonction(conn),
+                                        termine=terminer, erreur=echouer)
+
+    def activer_boutons(self, actif):
+        for btn in [self.btn_deliberer, self.btn_second_tour,
+                    self.btn_gerer_2nd_tour, self.btn_finaliser]:
+            btn.setEnabled(actif)
 
     def charger_candidats(self):
-        """Charge et affiche tous les candidats."""
-        self.table.setRowCount(0)
-        self.cur.execute("""
-            SELECT C.id_candidat, C.numero_table, C.nom || ' ' || C.prenom
-            FROM Candidats C
-            ORDER BY C.numero_table
-        """)
-        candidats = self.cur.fetchall()
-
-        for row, (id_candidat, numero_table, nom_complet) in enumerate(candidats):
-            points_tour1, points_tour2, moyenne_cycle, bonus_malus, statut = \
-                self.calculer_points_et_statut(id_candidat)
-
-            if points_tour1 is None:
-                continue
-
-            self.table.insertRow(row)
-
-            items = [
-                numero_table,
-                nom_complet,
-                points_tour1,
-                points_tour2 if points_tour2 else "N/A",
-                moyenne_cycle,
-                bonus_malus,
-                points_tour1 + bonus_malus,
-                statut
-            ]
-
-            for col, item in enumerate(items):
-                table_item = QTableWidgetItem(str(item))
-                table_item.setTextAlignment(Qt.AlignCenter)
-                self.table.setItem(row, col, table_item)
-
-            btn_action = QPushButton("Détails")
-            btn_action.setStyleSheet(f"background-color: {HOVER_COLOR}; color: {TEXT_COLOR};")
-            btn_action.clicked.connect(lambda _, r=row: self.afficher_details(r))
-            self.table.setCellWidget(row, 8, btn_action)
-      
-    def appliquer_filtres(self):
-        """Applique les filtres de recherche et de statut."""
-        filtre_statut = self.statut_filter.currentText()
-        texte_recherche = self.search_box.text().lower()
-
-        for row in range(self.table.rowCount()):
-            masquer = False
-            
-            # Vérifier le filtre de statut
-            if filtre_statut != "Tous":
-                statut_item = self.table.item(row, 7)
-                if statut_item and statut_item.text() != filtre_statut:
-                    masquer = True
-
-            # Vérifier le filtre de recherche
-            if texte_recherche:
-                nom_item = self.table.item(row, 1)
-                numero_item = self.table.item(row, 0)
-                
-                nom = nom_item.text().lower() if nom_item else ""
-                numero = numero_item.text().lower() if numero_item else ""
-                
-                if texte_recherche not in nom and texte_recherche not in numero:
-                    masquer = True
+        """Met à jour les résultats puis affiche la page courante."""
+        # Résultats matérialisés, recalculés uniquement pour les candidats modifiés
+        self.executer_en_arriere_plan(rafraichir_resultats, lambda _: self.afficher_page(),
+                                      "Chargement des résultats...",
+                                      "Erreur lors du chargement des résultats")
+
+    def suivre_nouvelles_notes(self):
+        """Rafraîchit l'affichage quand des notes ont été saisies ou modifiées."""
+        if self.tache_en_cours:
+            return
+        try:
+            if resultats_a_recalculer(self.conn):
+                self.charger_candidats()
+        except sqlite3.Error as e:
+            self.timer_suivi.stop()
+            QMessageBox.critical(self, "Erreur", f"Erreur lors du suivi des notes : {e}")
 
-            # Appliquer le masquage
-            self.table.setRowHidden(row, masquer)
+    def appliquer_filtres(self):
+        """Applique les filtres de recherche et de statut, en revenant à la première page."""
+        self.page = 0
+        self.afficher_page()
+
+    def changer_page(self, sens):
+        self.page += sens
+        self.afficher_page()
+
+    def afficher_page(self):
+        """Lit dans la base la page courante des résultats filtrés."""
+        statut = self.statut_filter.currentText()
+        filtres = (None if statut == "Tous" else statut, self.search_box.text())
+        try:
+            self.nb_resultats = compter_resultats(self.conn, *filtres)
+            nb_pages = max(1, -(-self.nb_resultats // TAILLE_PAGE_RESULTATS))
+            self.page = min(max(self.page, 0), nb_pages - 1)
+            self.table.modele.definir_lignes(page_resultats(
+                self.conn, *filtres, limite=TAILLE_PAGE_RESULTATS,
+                decalage=self.page * TAILLE_PAGE_RESULTATS))
+        except sqlite3.Error as e:
+            QMessageBox.critical(self, "Erreur", f"Erreur lors de la recherche des candidats : {e}")
+            return
 
+        self.label_page.setText(f"Page {self.page + 1} / {nb_pages} — {self.nb_resultats} candidat(s)")
+        self.btn_page_precedente.setEnabled(self.page > 0)
+        self.btn_page_suivante.setEnabled(self.page < nb_pages - 1)
 
     def lancer_deliberation(self):
         """Lance le processus de délibération pour tous les candidats."""
@@ -288,35 +257,38 @@ class GestionDeliberation(QMainWindow):
         )
 
         if choix == QMessageBox.Yes:
-            self.charger_candidats()
-            QMessageBox.information(self, "Succès", "Délibération effectuée avec succès.")
+            def terminer(nb_recalcules):
+                self.charger_candidats()
+                QMessageBox.information(self, "Succès", f"Délibération effectuée avec succès.\n"
+                                                        f"{nb_recalcules} candidat(s) recalculé(s).")
+
+            self.executer_en_arriere_plan(rafraichir_resultats, terminer, "Délibération en cours...",
+                                          "Erreur lors de la délibération")
 
     def valider_second_tour(self):
-        selection = self.table.selectedItems()
-        if not selection:
+        rows = self.table.lignes_selectionnees()
+        if not rows:
             QMessageBox.warning(self, "Attention", "Veuillez sélectionner des candidats.")
             return
 
-        rows = set(item.row() for item in selection)
-        for row in rows:
-            if self.table.item(row, 7).text() == "2nd Tour":
-                numero_table = self.table.item(row, 0).text()
-                
-                # Mise à jour de la base de données
-                self.cur.execute("""
-                    UPDATE Deliberation 
-                    SET statut = '2nd Tour'
-                    WHERE id_candidat IN (
-                        SELECT id_candidat 
-                        FROM Candidats 
-                        WHERE numero_table = ?
-                    )
-                """, (numero_table,))
-                
-                # Mise à jour immédiate de l'interface
-                self.table.item(row, 7).setText("2nd Tour")
-        
-        self.conn.commit()  # Important : commit les changements
+        # Une transaction pour toute la sélection, validée en sortie du bloc
+        with self.conn:
+            for row in rows:
+                resultat = self.table.modele.ligne(row)
+                if resultat.statut == "2nd Tour":
+                    numero_table = resultat.numero_table
+
+                    # Mise à jour de la base de données
+                    self.cur.execute("""
+                        UPDATE Deliberation 
+                        SET statut = '2nd Tour'
+                        WHERE id_candidat IN (
+                            SELECT id_candidat 
+                            FROM Candidats 
+                            WHERE numero_table = ?
+                        )
+                    """, (numero_table,))
+
         self.charger_candidats()  # Recharger pour refléter les changements
         QMessageBox.information(self, "Succès", "Candidats validés pour le second tour.")
     
@@ -349,8 +321,8 @@ class GestionDeliberation(QMainWindow):
                 # Ouvrir directement la fenêtre en mode second tour
                 dialog = SaisieNotesDialog(self.fenetre_saisie, candidats_2nd_tour[0][2] if candidats_2nd_tour[0][2] else "", modification=False)
                 dialog.tour_combo.setCurrentText("Second Tour")
-                dialog.exec_()  # Utiliser exec_ au lieu de show()
-                self.fenetre_saisie.charger_candidats()  # Recharger les candidats après la saisie
+                if dialog.exec_():  # Utiliser exec_ au lieu de show()
+                    self.fenetre_saisie.rafraichir_candidats([dialog.id_candidat])
                 self.fenetre_saisie.show()
                 
         except sqlite3.Error as e:
@@ -367,54 +339,32 @@ class GestionDeliberation(QMainWindow):
         )
 
         if choix == QMessageBox.Yes:
-            try:
-                for row in range(self.table.rowCount()):
-                    numero_table = self.table.item(row, 0).text()
-                    points_tour1 = float(self.table.item(row, 2).text())
-                    points_tour2 = self.table.item(row, 3).text()
-                    points_tour2 = float(points_tour2) if points_tour2 != "N/A" else None
-                    statut = self.table.item(row, 7).text()
-
-                    # Récupérer l'id_candidat à partir du numéro de table
-                    self.cur.execute("""
-                        SELECT id_candidat 
-                        FROM Candidats 
-                        WHERE numero_table = ?
-                    """, (numero_table,))
-                    id_candidat = self.cur.fetchone()[0]
+            debut = time.perf_counter()
 
-                    # Insérer ou mettre à jour dans la table Deliberation
-                    self.cur.execute("""
-                        INSERT OR REPLACE INTO Deliberation 
-                        (id_candidat, points_tour1, points_tour2, statut)
-                        VALUES (?, ?, ?, ?)
-                    """, (id_candidat, points_tour1, points_tour2, statut))
-                
-                self.conn.commit()
-                QMessageBox.information(self, "Succès", "Délibération finalisée avec succès.")
-            except sqlite3.Error as e:
-                QMessageBox.critical(self, "Erreur", f"Erreur lors de la finalisation : {e}")
+            def terminer(nb_candidats):
+                duree = time.perf_counter() - debut
+                QMessageBox.information(self, "Succès", f"Délibération finalisée avec succès.\n"
+                                                        f"{nb_candidats} candidats enregistrés en {duree:.2f} s.")
+
+            # Écriture groupée depuis les résultats calculés, pas depuis le texte du tableau
+            self.executer_en_arriere_plan(finaliser_resultats, terminer, "Finalisation en cours...",
+                                          "Erreur lors de la finalisation")
 
     def afficher_details(self, row):
         """Affiche les détails d'un candidat."""
         details = "\n".join([
-            f"Numéro Table: {self.table.item(row, 0).text()}",
-            f"Nom: {self.table.item(row, 1).text()}",
-            f"Points 1er Tour: {self.table.item(row, 2).text()}",
-            f"Points 2nd Tour: {self.table.item(row, 3).text()}",
-            f"Moyenne Cycle: {self.table.item(row, 4).text()}",
-            f"Bonus/Malus: {self.table.item(row, 5).text()}",
-            f"Total Points: {self.table.item(row, 6).text()}",
-            f"Statut: {self.table.item(row, 7).text()}"
+            f"Numéro Table: {self.table.texte(row, 0)}",
+            f"Nom: {self.table.texte(row, 1)}",
+            f"Points 1er Tour: {self.table.texte(row, 2)}",
+            f"Points 2nd Tour: {self.table.texte(row, 3)}",
+            f"Moyenne Cycle: {self.table.texte(row, 4)}",
+            f"Bonus/Malus: {self.table.texte(row, 5)}",
+            f"Total Points: {self.table.texte(row, 6)}",
+            f"Statut: {self.table.texte(row, 7)}"
         ])
 
         QMessageBox.information(self, "Détails du Candidat", details)
 
-    def closeEvent(self, event):
-        """Ferme la connexion à la base de données lors de la fermeture de l'application."""
-        self.conn.close()
-        event.accept()
-
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = GestionDeliberation()
@@ -213,14 +213,14 @@ class GestionLivretDialog(QDialog):
                 self.student_id
             )
 
-            cursor.execute("""
-                INSERT OR REPLACE INTO Livret_Scolaire 
-                (nombre_de_fois, moyenne_6e, moyenne_5e, moyenne_4e, moyenne_3e, 
-                moyenne_cycle, id_candidat)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, record_data)
-
-            self.parent().conn.commit()
+            with self.parent().conn:
+                cursor.execute("""
+                    INSERT OR REPLACE INTO Livret_Scolaire 
+                    (nombre_de_fois, moyenne_6e, moyenne_5e, moyenne_4e, moyenne_3e, 
+                    moyenne_cycle, id_candidat)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, record_data)
+
             self.recordSaved.emit(self.student_id)
             QMessageBox.information(
                 self,
@@ -6,6 +6,8 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import Qt
+from models.database_manager import obtenir_connexion
+from models.instrumentation import AFFICHAGE, mesurer
 
 # Couleurs inspirées du MainMenu
 PRIMARY_COLOR = "#2C3E50"
@@ -21,7 +23,7 @@ class GestionRepechage(QMainWindow):
         self.setStyleSheet(f"background-color: {PRIMARY_COLOR}; color: {TEXT_COLOR}; font-family: 'Roboto';")
 
         # Connexion à la base de données
-        self.conn = sqlite3.connect("bfem_db.sqlite")
+        self.conn = obtenir_connexion()
         self.cur = self.conn.cursor()
 
         # Widget central
@@ -68,34 +70,33 @@ class GestionRepechage(QMainWindow):
         """)
         candidats = self.cur.fetchall()
 
-        print("Candidats en repêchage récupérés :", candidats)  # Log pour vérifier les données
-
-        for row, candidat in enumerate(candidats):
-            self.table.insertRow(row)
-            for col, value in enumerate(candidat[:-1]):  # Exclure l'id_candidat de l'affichage
-                item = QTableWidgetItem(str(value) if value is not None else "N/A")
-                item.setTextAlignment(Qt.AlignCenter)
-                self.table.setItem(row, col, item)
-
-            # Créer un widget pour contenir les boutons "Valider" et "Rejeter"
-            widget = QWidget()
-            layout = QHBoxLayout()
-            widget.setLayout(layout)
-
-            # Bouton Valider
-            btn_valider = QPushButton("Valider")
-            btn_valider.setStyleSheet(f"background-color: {HOVER_COLOR}; color: {TEXT_COLOR}; border-radius: 5px;")
-            btn_valider.clicked.connect(lambda _, r=row, id=candidat[-1]: self.valider_repechage(r, id))
-            layout.addWidget(btn_valider)
-
-            # Bouton Rejeter
-            btn_rejeter = QPushButton("Rejeter")
-            btn_rejeter.setStyleSheet("background-color: #e74c3c; color: white; border-radius: 5px;")
-            btn_rejeter.clicked.connect(lambda _, r=row, id=candidat[-1]: self.rejeter_repechage(r, id))
-            layout.addWidget(btn_rejeter)
-
-            # Ajouter le widget contenant les boutons dans la cellule du tableau
-            self.table.setCellWidget(row, 5, widget)
+        with mesurer(AFFICHAGE, "Remplissage GestionRepechage"):
+            for row, candidat in enumerate(candidats):
+                self.table.insertRow(row)
+                for col, value in enumerate(candidat[:-1]):  # Exclure l'id_candidat de l'affichage
+                    item = QTableWidgetItem(str(value) if value is not None else "N/A")
+                    item.setTextAlignment(Qt.AlignCenter)
+                    self.table.setItem(row, col, item)
+
+                # Créer un widget pour contenir les boutons "Valider" et "Rejeter"
+                widget = QWidget()
+                layout = QHBoxLayout()
+                widget.setLayout(layout)
+
+                # Bouton Valider
+                btn_valider = QPushButton("Valider")
+                btn_valider.setStyleSheet(f"background-color: {HOVER_COLOR}; color: {TEXT_COLOR}; border-radius: 5px;")
+                btn_valider.clicked.connect(lambda _, r=row, id=candidat[-1]: self.valider_repechage(r, id))
+                layout.addWidget(btn_valider)
+
+                # Bouton Rejeter
+                btn_rejeter = QPushButton("Rejeter")
+                btn_rejeter.setStyleSheet("background-color: #e74c3c; color: white; border-radius: 5px;")
+                btn_rejeter.clicked.connect(lambda _, r=row, id=candidat[-1]: self.rejeter_repechage(r, id))
+                layout.addWidget(btn_rejeter)
+
+                # Ajouter le widget contenant les boutons dans la cellule du tableau
+                self.table.setCellWidget(row, 5, widget)
 
     def valider_repechage(self, row, id_candidat):
         """Valide le repêchage d'un candidat spécifique."""
@@ -107,12 +108,12 @@ class GestionRepechage(QMainWindow):
         if confirm == QMessageBox.Yes:
             try:
                 # Mettre à jour le statut dans la base de données
-                self.cur.execute("""
-                    UPDATE Deliberation
-                    SET statut = 'Admis'
-                    WHERE id_candidat = ?
-                """, (id_candidat,))
-                self.conn.commit()
+                with self.conn:
+                    self.cur.execute("""
+                        UPDATE Deliberation
+                        SET statut = 'Admis'
+                        WHERE id_candidat = ?
+                    """, (id_candidat,))
 
                 # Mettre à jour l'interface
                 self.table.item(row, 4).setText('Admis')  # Mettre à jour la colonne "Statut"
@@ -130,12 +131,12 @@ class GestionRepechage(QMainWindow):
         if confirm == QMessageBox.Yes:
             try:
                 # Mettre à jour le statut dans la base de données
-                self.cur.execute("""
-                    UPDATE Deliberation
-                    SET statut = 'Échec'
-                    WHERE id_candidat = ?
-                """, (id_candidat,))
-                self.conn.commit()
+                with self.conn:
+                    self.cur.execute("""
+                        UPDATE Deliberation
+                        SET statut = 'Échec'
+                        WHERE id_candidat = ?
+                    """, (id_candidat,))
 
                 # Mettre à jour l'interface
                 self.table.item(row, 4).setText('Échec')  # Mettre à jour la colonne "Statut"
@@ -161,15 +162,6 @@ class GestionRepechage(QMainWindow):
         except sqlite3.Error as e:
             QMessageBox.critical(self, "Erreur", f"Erreur lors de la finalisation du repêchage : {e}")
 
-    def closeEvent(self, event):
-        """Ferme la connexion à la base de données lors de la fermeture de l'application."""
-        if self.conn:
-            try:
-                self.conn.close()
-            except sqlite3.Error:
-                pass
-        event.accept()
-
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = GestionRepechage()
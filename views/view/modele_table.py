@@ -0,0 +1,184 @@
+from PyQt5.QtWidgets import QTableView, QStyledItemDelegate, QAbstractItemView
+from PyQt5.QtGui import QColor, QPainter, QPen
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QEvent, QVariant, pyqtSignal
+from models.instrumentation import AFFICHAGE, mesurer
+
+# Nombre de lignes exposées à la vue à chaque défilement en bas de tableau (lignes déjà en mémoire)
+TAILLE_PAGE = 200
+
+
+class ModeleTableLazy(QAbstractTableModel):
+    """Modèle de tableau partagé par les grilles de candidats.
+
+    Les lignes restent des tuples (ou NamedTuple) bruts ; le texte d'une cellule n'est
+    produit que lorsqu'elle est affichée.
+
+    Toutes les lignes sont en mémoire (definir_lignes) : filtre et rafraîchissement ciblé
+    travaillent sur la liste complète. canFetchMore / fetchMore n'exposent à la vue que
+    TAILLE_PAGE lignes de plus à chaque défilement en bas, sans relire la base, pour que
+    la vue ne dimensionne pas toutes les lignes d'un coup. Pour ne lire la base que page
+    par page, l'écran passe par une requête paginée (page_resultats dans GestionDeliberation).
+
+    colonnes : liste de (titre, extracteur) où l'extracteur est l'index de la valeur
+    dans la ligne, ou une fonction ligne -> valeur.
+    """
+
+    def __init__(self, colonnes, taille_page=TAILLE_PAGE, parent=None):
+        super().__init__(parent)
+        self.titres = [titre for titre, _ in colonnes]
+        self.extracteurs = [
+            extracteur if callable(extracteur) else (lambda ligne, i=extracteur: ligne[i])
+            for _, extracteur in colonnes
+        ]
+        self.taille_page = taille_page
+        self._lignes = []
+        self._visibles = []  # Lignes retenues par le filtre courant
+        self._nb_exposees = 0
+        self._predicat = None
+
+    # --- Données ---
+
+    def definir_lignes(self, lignes):
+        """Remplace le contenu du tableau (le filtre courant est conservé)."""
+        self._lignes = list(lignes)
+        self.filtrer(self._predicat)
+
+    def filtrer(self, predicat=None):
+        """Ne garde que les lignes pour lesquelles predicat(ligne) est vrai (None : toutes)."""
+        with mesurer(AFFICHAGE, f"Remplissage {self.nom_ecran()}"):
+            self.beginResetModel()
+            self._predicat = predicat
+            self._visibles = self._lignes if predicat is None else [l for l in self._lignes if predicat(l)]
+            self._nb_exposees = min(self.taille_page, len(self._visibles))
+            self.endResetModel()
+
+    def remplacer_lignes(self, lignes, cle):
+        """Remplace les lignes de même clé (cle(ligne)) sans recharger le tableau.
+
+        Seules les cellules des lignes remplacées sont redessinées ; filtre et défilement sont conservés.
+        """
+        remplacantes = {cle(ligne): ligne for ligne in lignes}
+        if not remplacantes:
+            return
+        for i, ligne in enumerate(self._lignes):
+            nouvelle = remplacantes.get(cle(ligne))
+            if nouvelle is not None:
+                self._lignes[i] = nouvelle
+        for row, ligne in enumerate(self._visibles):
+            nouvelle = remplacantes.get(cle(ligne))
+            if nouvelle is not None:
+                self._visibles[row] = nouvelle
+                if row < self._nb_exposees:
+                    self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.titres) - 1))
+
+    def nom_ecran(self):
+        """Nom de la fenêtre qui affiche le tableau, pour les mesures de performance."""
+        vue = self.parent()
+        return type(vue.window()).__name__ if vue is not None else type(self).__name__
+
+    def ligne(self, row):
+        """Ligne brute affichée à la position row."""
+        return self._visibles[row]
+
+    def valeur(self, row, col):
+        """Valeur (non formatée) de la cellule."""
+        return self.extracteurs[col](self._visibles[row])
+
+    def texte(self, row, col):
+        valeur = self.valeur(row, col)
+        return "" if valeur is None else str(valeur)
+
+    def nombre_total(self):
+        """Nombre de lignes retenues par le filtre, exposées ou non à la vue."""
+        return len(self._visibles)
+
+    # --- Interface Qt ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._nb_exposees
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.titres)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return QVariant()
+        if role == Qt.DisplayRole:
+            return self.texte(index.row(), index.column())
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return QVariant()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return QVariant()
+        if orientation == Qt.Horizontal:
+            return self.titres[section]
+        return str(section + 1)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._nb_exposees < len(self._visibles)
+
+    def fetchMore(self, parent=QModelIndex()):
+        """Expose la page suivante des lignes déjà chargées."""
+        if parent.isValid():
+            return
+        nb_ajoutees = min(self.taille_page, len(self._visibles) - self._nb_exposees)
+        if nb_ajoutees <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._nb_exposees, self._nb_exposees + nb_ajoutees - 1)
+        self._nb_exposees += nb_ajoutees
+        self.endInsertRows()
+
+
+class DelegueBouton(QStyledItemDelegate):
+    """Dessine un bouton dans chaque cellule de la colonne, sans créer de widget."""
+    clique = pyqtSignal(int)
+
+    def __init__(self, couleur_fond, couleur_texte, parent=None):
+        super().__init__(parent)
+        self.couleur_fond = QColor(couleur_fond)
+        self.couleur_texte = QColor(couleur_texte)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        rectangle = option.rect.adjusted(4, 3, -4, -3)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(self.couleur_fond)
+        painter.drawRoundedRect(rectangle, 5, 5)
+        painter.setPen(QPen(self.couleur_texte))
+        painter.drawText(rectangle, Qt.AlignCenter, index.data())
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and option.rect.contains(event.pos()):
+            self.clique.emit(index.row())
+            return True
+        return False
+
+
+class VueTableLazy(QTableView):
+    """QTableView associée à un ModeleTableLazy, avec les raccourcis de QTableWidget utilisés par les écrans."""
+
+    def __init__(self, colonnes, parent=None):
+        super().__init__(parent)
+        self.modele = ModeleTableLazy(colonnes, parent=self)
+        self.setModel(self.modele)
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+
+    def ajouter_bouton(self, colonne, couleur_fond, couleur_texte, action):
+        """Colonne de boutons dessinés ; action(row) est appelée au clic."""
+        delegue = DelegueBouton(couleur_fond, couleur_texte, self)
+        delegue.clique.connect(action)
+        self.setItemDelegateForColumn(colonne, delegue)
+
+    def currentRow(self):
+        index = self.currentIndex()
+        return index.row() if index.isValid() else -1
+
+    def lignes_selectionnees(self):
+        return sorted({index.row() for index in self.selectionModel().selectedIndexes()})
+
+    def texte(self, row, col):
+        return self.modele.texte(row, col)
@@ -7,6 +7,8 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont, QPalette, QColor
 from database import obtenir_jury_connecte
+from models.database_manager import obtenir_connexion
+from models.schema import creer_tables
 
 class ParametreJuryDialog(QDialog):
     def __init__(self, parent=None):
@@ -153,7 +155,7 @@ class ParametreJuryDialog(QDialog):
 
     def connect_to_db(self):
         try:
-            self.conn = sqlite3.connect('bfem_db.sqlite', timeout=10)
+            self.conn = obtenir_connexion()
             self.cur = self.conn.cursor()
             self.create_table_if_not_exists()
         except sqlite3.Error as e:
@@ -161,20 +163,8 @@ class ParametreJuryDialog(QDialog):
 
     def create_table_if_not_exists(self):
         try:
-            self.cur.execute("""
-                CREATE TABLE IF NOT EXISTS Parametres_Jury (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    id_utilisateur INTEGER NOT NULL,
-                    region TEXT NOT NULL,
-                    ief TEXT NOT NULL,
-                    localite TEXT NOT NULL,
-                    centre_examen TEXT NOT NULL,
-                    president_jury TEXT NOT NULL,
-                    telephone TEXT NOT NULL,
-                    FOREIGN KEY (id_utilisateur) REFERENCES Utilisateurs(id_utilisateur)
-                )
-            """)
-            self.conn.commit()
+            with self.conn:
+                creer_tables(self.cur, ["Parametres_Jury"])
         except sqlite3.Error as e:
             self.show_error("Erreur de création", f"Impossible de créer la table: {str(e)}")
 
@@ -225,14 +215,14 @@ class ParametreJuryDialog(QDialog):
         )
 
         try:
-            self.cur.execute("""
-                INSERT INTO Parametres_Jury (
-                    id_utilisateur, region, ief, localite, 
-                    centre_examen, president_jury, telephone
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, data)
-            self.conn.commit()
+            with self.conn:
+                self.cur.execute("""
+                    INSERT INTO Parametres_Jury (
+                        id_utilisateur, region, ief, localite, 
+                        centre_examen, president_jury, telephone
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, data)
             QMessageBox.information(self, "Succès", "Paramètres du jury enregistrés avec succès.")
             self.accept()
         except sqlite3.Error as e:
@@ -242,10 +232,3 @@ class ParametreJuryDialog(QDialog):
     def show_error(self, title, message):
         QMessageBox.critical(self, title, message)
 
-    def closeEvent(self, event):
-        self.close_connection()
-        super().closeEvent(event)
-
-    def close_connection(self):
-      if hasattr(self, 'conn') and self.conn:  # Vérifie si self.conn existe
-        self.conn.close()
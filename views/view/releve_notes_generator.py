@@ -1,12 +1,21 @@
 import sys
 import sqlite3
+import time
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QTableWidget, QTableWidgetItem, QPushButton, QMessageBox, QComboBox, QLabel, QFileDialog
+    QPushButton, QMessageBox, QComboBox, QLabel, QFileDialog, QProgressDialog
 )
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import Qt
-from fpdf import FPDF
+from controllers.task_controller import gestionnaire_taches
+from models.instrumentation import RENDU, mesurer
+from models.database_manager import obtenir_connexion
+from views.view.modele_table import VueTableLazy
+from views.view.champ_recherche import ChampRecherche, filtrer_tableau
+from models.releves import (
+    LIBELLES_TOURS, construire_releve, generer_releves_fichiers, generer_releves_fusionnes,
+    lire_releves, lister_etablissements
+)
 
 # Couleurs inspirées du MainMenu
 PRIMARY_COLOR = "#2C3E50"
@@ -22,7 +31,7 @@ class ReleveNotesGenerator(QMainWindow):
         self.setStyleSheet(f"background-color: {PRIMARY_COLOR}; color: {TEXT_COLOR}; font-family: 'Roboto';")
 
         # Connexion à la base de données
-        self.conn = sqlite3.connect("bfem_db.sqlite")
+        self.conn = obtenir_connexion()
         self.cur = self.conn.cursor()
 
         # Widget central
@@ -47,10 +56,14 @@ class ReleveNotesGenerator(QMainWindow):
         self.tour_combo.currentIndexChanged.connect(self.charger_candidats)
         self.layout.addWidget(self.tour_combo)
 
+        # Recherche plein texte
+        self.champ_recherche = ChampRecherche()
+        self.champ_recherche.setStyleSheet("background-color: white; color: black; padding: 8px; border-radius: 5px;")
+        self.champ_recherche.recherche.connect(self.rechercher)
+        self.layout.addWidget(self.champ_recherche)
+
         # Tableau des candidats
-        self.table = QTableWidget()
-        self.table.setColumnCount(3)
-        self.table.setHorizontalHeaderLabels(["Numéro Table", "Nom Candidat", "Anonymat"])
+        self.table = VueTableLazy([("Numéro Table", 0), ("Nom Candidat", 1), ("Anonymat", 2)])
         self.table.setStyleSheet("background-color: white; color: black; border-radius: 5px;")
         self.layout.addWidget(self.table)
 
@@ -62,30 +75,52 @@ class ReleveNotesGenerator(QMainWindow):
         self.btn_generer.clicked.connect(self.generer_releve_notes)
         self.layout.addWidget(self.btn_generer, alignment=Qt.AlignCenter)
 
+        # Génération de tous les relevés du tour
+        lot_layout = QHBoxLayout()
+        self.etablissement_combo = QComboBox()
+        self.etablissement_combo.addItem("Tous les établissements", None)
+        try:
+            for etablissement in lister_etablissements(self.conn):
+                self.etablissement_combo.addItem(etablissement, etablissement)
+        except sqlite3.Error as e:
+            QMessageBox.critical(self, "Erreur", f"Erreur lors du chargement des établissements : {e}")
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItems(["Un fichier par candidat", "Un seul PDF"])
+        self.btn_generer_tous = QPushButton("Générer tous les relevés")
+        self.btn_generer_tous.setFont(QFont("Roboto", 12))
+        self.btn_generer_tous.setStyleSheet(f"background-color: {HOVER_COLOR}; color: {TEXT_COLOR}; padding: 10px; border-radius: 5px;")
+        self.btn_generer_tous.setCursor(Qt.PointingHandCursor)
+        self.btn_generer_tous.clicked.connect(self.generer_tous_les_releves)
+        for widget in [QLabel("Établissement :"), self.etablissement_combo, self.mode_combo, self.btn_generer_tous]:
+            lot_layout.addWidget(widget)
+        self.layout.addLayout(lot_layout)
+
         # Charger la liste des candidats
         self.charger_candidats()
 
+    def tour(self):
+        return 1 if self.tour_combo.currentText() == "Premier Tour" else 2
+
     def charger_candidats(self):
         """Charge les candidats et leurs anonymats en fonction du tour sélectionné."""
-        self.table.setRowCount(0)
         tour_selected = self.tour_combo.currentText() == "Premier Tour"
         table = "Notes_Tour1" if tour_selected else "Notes_Tour2"
 
         self.cur.execute(f"""
-            SELECT C.numero_table, C.nom || ' ' || C.prenom, A.numero_anonymat
+            SELECT C.numero_table, C.nom || ' ' || C.prenom, A.numero_anonymat, C.id_candidat
             FROM Candidats C
             JOIN Anonymats A ON C.id_candidat = A.id_candidat
             WHERE EXISTS (
                 SELECT 1 FROM {table} WHERE anonymat = A.numero_anonymat
             )
         """)
-        candidats = self.cur.fetchall()
-        for row, candidat in enumerate(candidats):
-            self.table.insertRow(row)
-            for col, value in enumerate(candidat):
-                item = QTableWidgetItem(str(value))
-                item.setTextAlignment(Qt.AlignCenter)
-                self.table.setItem(row, col, item)
+        self.table.modele.definir_lignes(self.cur.fetchall())
+        if self.champ_recherche.text():
+            self.rechercher()
+
+    def rechercher(self):
+        """Ne garde que les candidats correspondant à la recherche (id_candidat en dernière colonne)."""
+        filtrer_tableau(self.table, self.conn, self.champ_recherche.text(), 3)
 
     def generer_releve_notes(self):
         """Génère le relevé de notes en PDF pour le candidat sélectionné."""
@@ -95,82 +130,98 @@ class ReleveNotesGenerator(QMainWindow):
             return
 
         # Récupérer les informations du candidat
-        numero_table = self.table.item(selected_row, 0).text()
-        nom_candidat = self.table.item(selected_row, 1).text()
-        anonymat = self.table.item(selected_row, 2).text()
+        numero_table = self.table.modele.ligne(selected_row)[0]
+        nom_candidat = self.table.texte(selected_row, 1)
+        tour = self.tour()
 
-        # Récupérer les notes en fonction du tour sélectionné
-        tour_selected = self.tour_combo.currentText() == "Premier Tour"
-        table = "Notes_Tour1" if tour_selected else "Notes_Tour2"
-
-        self.cur.execute(f"""
-            SELECT * FROM {table} WHERE anonymat = ?
-        """, (anonymat,))
-        notes = self.cur.fetchone()
-
-        if not notes:
+        try:
+            releves = lire_releves(self.conn, tour, numero_table=numero_table)
+        except sqlite3.Error as e:
+            QMessageBox.critical(self, "Erreur", f"Erreur lors de la lecture des notes : {e}")
+            return
+        if not releves:
             QMessageBox.warning(self, "Erreur", "Aucune note trouvée pour ce candidat.")
             return
 
-        # Créer le PDF
-        pdf = FPDF()
-        pdf.add_page()
-
-        # Ajouter un logo (si disponible)
-        try:
-            pdf.image("logo.png", x=10, y=8, w=30)  # Remplacez "logo.png" par le chemin de votre logo
-        except:
-            pass
-
-        # Titre du relevé de notes
-        pdf.set_font("Arial", "B", 16)
-        pdf.cell(0, 10, f"Relevé de Notes - {nom_candidat}", 0, 1, "C")
-        pdf.ln(10)
-
-        # Informations du candidat
-        pdf.set_font("Arial", "", 12)
-        pdf.cell(0, 10, f"Numéro de Table: {numero_table}", 0, 1)
-        pdf.cell(0, 10, f"Anonymat: {anonymat}", 0, 1)
-        pdf.ln(10)
-
-        # Tableau des notes
-        pdf.set_font("Arial", "B", 12)
-        pdf.cell(0, 10, "Notes:", 0, 1)
-        pdf.ln(5)
-
-        # En-têtes du tableau
-        pdf.set_font("Arial", "B", 10)
-        headers = ["Matière", "Note"]
-        col_widths = [100, 50]
-        for header, width in zip(headers, col_widths):
-            pdf.cell(width, 10, header, 1, 0, "C")
-        pdf.ln()
-
-        # Contenu du tableau
-        pdf.set_font("Arial", "", 10)
-        for matiere, note in zip(self.cur.description, notes):
-            if matiere[0] not in ["anonymat", "id_candidat"]:  # Ignorer les colonnes non pertinentes
-                pdf.cell(col_widths[0], 10, matiere[0].replace("_", " ").capitalize(), 1, 0, "L")
-                pdf.cell(col_widths[1], 10, str(note), 1, 0, "C")
-                pdf.ln()
-
         # Demander à l'utilisateur où enregistrer le fichier
         filename, _ = QFileDialog.getSaveFileName(
             self,
             "Enregistrer le relevé de notes",
-            f"Relevé_Notes_{nom_candidat}_{'1er_Tour' if tour_selected else '2nd_Tour'}.pdf",
+            f"Relevé_Notes_{nom_candidat}_{LIBELLES_TOURS[tour]}.pdf",
             "Fichiers PDF (*.pdf)"
         )
 
         if filename:
-            self.save_pdf(pdf, filename)
+            self.save_pdf(construire_releve(releves[0], tour), filename)
             QMessageBox.information(self, "Succès", f"Relevé de notes généré avec succès : {filename}")
         else:
             QMessageBox.warning(self, "Annulé", "Enregistrement du fichier annulé.")
 
+    def generer_tous_les_releves(self):
+        """Génère les relevés de tous les candidats notés du tour (ou d'un établissement).
+
+        Un fichier par candidat (rendus en parallèle dans un pool de processus) ou un seul PDF.
+        """
+        tour = self.tour()
+        etablissement = self.etablissement_combo.currentData()
+        par_candidat = self.mode_combo.currentIndex() == 0
+        if par_candidat:
+            destination = QFileDialog.getExistingDirectory(self, "Dossier des relevés de notes")
+        else:
+            destination, _ = QFileDialog.getSaveFileName(
+                self, "Enregistrer les relevés de notes",
+                f"Releves_Notes_{LIBELLES_TOURS[tour]}.pdf", "Fichiers PDF (*.pdf)")
+        if not destination:
+            return
+
+        def generer(conn, tache):
+            releves = lire_releves(conn, tour, etablissement)
+            tache.progression(0, len(releves))
+            if par_candidat:
+                return generer_releves_fichiers(releves, tour, destination, progression=tache.progression)
+            return generer_releves_fusionnes(releves, tour, destination, progression=tache.progression)
+
+        dialogue = QProgressDialog("Génération des relevés...", "Annuler", 0, 0, self)
+        dialogue.setWindowTitle("Relevés de notes")
+        dialogue.setWindowModality(Qt.WindowModal)
+        dialogue.setMinimumDuration(0)
+        dialogue.setAutoClose(False)
+        dialogue.setAutoReset(False)
+        debut = time.perf_counter()
+
+        def progression(fait, total):
+            dialogue.setMaximum(total)
+            dialogue.setValue(fait)
+            ecoule = time.perf_counter() - debut
+            dialogue.setLabelText(f"{fait} / {total} relevés" + (f" ({fait / ecoule:,.0f} pages/s)" if ecoule else ""))
+
+        def termine(rapport):
+            dialogue.close()
+            QMessageBox.information(
+                self, "Succès",
+                f"{rapport.nb_releves} relevé(s), {rapport.nb_pages} page(s) en {rapport.duree:.2f} s "
+                f"({rapport.pages_par_seconde:,.0f} pages/s)\n{rapport.destination}"
+            )
+
+        def erreur(e):
+            dialogue.close()
+            message = str(e) if isinstance(e, ValueError) else f"Erreur lors de la génération des relevés : {e}"
+            QMessageBox.critical(self, "Erreur", message)
+
+        def annulee():
+            dialogue.close()
+            QMessageBox.information(self, "Relevés de notes", "Génération annulée.")
+
+        tache = gestionnaire_taches().soumettre(
+            generer, progression=progression, termine=termine, erreur=erreur, annulee=annulee
+        )
+        dialogue.canceled.connect(tache.annuler)
+        dialogue.show()
+
     def save_pdf(self, pdf, filename):
         """Sauvegarde le PDF généré."""
-        pdf.output(filename)
+        with mesurer(RENDU, "Écriture du relevé de notes"):
+            pdf.output(filename)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -2,11 +2,15 @@ import sys
 import sqlite3
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QTableWidget, QTableWidgetItem, QPushButton, QMessageBox, QDialog,
+    QPushButton, QMessageBox, QDialog,
     QLabel, QLineEdit, QFormLayout, QComboBox, QSpinBox
 )
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import Qt
+from models.database_manager import obtenir_connexion
+from models.notes import enregistrer_notes as ecrire_notes, lire_notes_candidats
+from views.view.modele_table import VueTableLazy
+from views.view.champ_recherche import ChampRecherche, filtrer_tableau
 
 
 # Couleurs inspirées du MainMenu
@@ -15,6 +19,18 @@ ACCENT_COLOR = "#1ABC9C"
 TEXT_COLOR = "#FFFFFF"
 HOVER_COLOR = "#2980B9"
 
+
+def formater_note(note):
+    return "-" if note is None else f"{note:g}"
+
+
+def formater_notes(*notes):
+    """Affiche des notes séparées par des barres verticales, « Non Saisi » si aucune ne l'est."""
+    if all(note is None for note in notes):
+        return "Non Saisi"
+    return " | ".join(formater_note(note) for note in notes)
+
+
 class SaisieNotes(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -23,7 +39,7 @@ class SaisieNotes(QMainWindow):
         self.setStyleSheet(f"background-color: {PRIMARY_COLOR}; color: {TEXT_COLOR}; font-family: 'Roboto';")
 
         # Connexion à la base de données
-        self.conn = sqlite3.connect("bfem_db.sqlite")
+        self.conn = obtenir_connexion()
         self.cur = self.conn.cursor()
 
         # Widget central
@@ -40,10 +56,24 @@ class SaisieNotes(QMainWindow):
         self.title.setStyleSheet(f"color: {TEXT_COLOR}; padding: 10px; text-align: center;")
         self.layout.addWidget(self.title, alignment=Qt.AlignCenter)
 
+        # Recherche plein texte
+        self.champ_recherche = ChampRecherche()
+        self.champ_recherche.setStyleSheet("background-color: white; color: black; padding: 8px; border-radius: 5px;")
+        self.champ_recherche.recherche.connect(self.rechercher)
+        self.layout.addWidget(self.champ_recherche)
+
         # Tableau des candidats et leurs notes
-        self.table = QTableWidget()
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels(["Numéro Table", "Nom Candidat", "Anonymat", "1er Tour", "2nd Tour", "EPS & Fac", "Actions"])
+        # Notes typées (NotesCandidat) ; le texte n'est produit que pour les cellules affichées
+        colonnes = [
+            ("Numéro Table", lambda ligne: ligne.numero_table),
+            ("Nom Candidat", lambda ligne: ligne.nom_complet),
+            ("Anonymat", lambda ligne: ligne.anonymat),
+            ("1er Tour", lambda ligne: formater_notes(*ligne.notes_tour1)),
+            ("2nd Tour", lambda ligne: formater_notes(*ligne.notes_tour2)),
+            ("EPS & Fac", lambda ligne: formater_notes(ligne.eps, ligne.epreuve_facultative).replace(" | ", " / ")),
+        ]
+        self.table = VueTableLazy(colonnes + [("Actions", lambda ligne: "Modifier")])
+        self.table.ajouter_bouton(6, HOVER_COLOR, TEXT_COLOR, self.ouvrir_modification_notes)
         self.table.setStyleSheet("background-color: white; color: black; border-radius: 5px;")
         self.layout.addWidget(self.table)
 
@@ -53,50 +83,48 @@ class SaisieNotes(QMainWindow):
         self.btn_saisir.setStyleSheet(f"background-color: {ACCENT_COLOR}; color: {TEXT_COLOR}; padding: 10px; border-radius: 5px;")
         self.btn_saisir.setCursor(Qt.PointingHandCursor)
         self.btn_saisir.clicked.connect(self.ouvrir_saisie_notes)
-        self.layout.addWidget(self.btn_saisir, alignment=Qt.AlignCenter)
+
+        # Bouton de saisie par lot (tableur anonymats × matières)
+        self.btn_saisie_lot = QPushButton("Saisie par lot")
+        self.btn_saisie_lot.setFont(QFont("Roboto", 12))
+        self.btn_saisie_lot.setStyleSheet(f"background-color: {HOVER_COLOR}; color: {TEXT_COLOR}; padding: 10px; border-radius: 5px;")
+        self.btn_saisie_lot.setCursor(Qt.PointingHandCursor)
+        self.btn_saisie_lot.clicked.connect(self.ouvrir_saisie_lot)
+
+        boutons = QHBoxLayout()
+        boutons.addStretch()
+        boutons.addWidget(self.btn_saisir)
+        boutons.addWidget(self.btn_saisie_lot)
+        boutons.addStretch()
+        self.layout.addLayout(boutons)
 
         # Charger la liste des candidats
         self.charger_candidats()
 
     def charger_candidats(self):
-        """Charge les candidats et leurs notes depuis la base de données."""
-        self.table.setRowCount(0)
-        self.cur.execute("""
-            SELECT C.numero_table, C.nom || ' ' || C.prenom, A.numero_anonymat,
-                   COALESCE(N1.notes_tour1, 'Non Saisi'),
-                   COALESCE(N2.notes_tour2, 'Non Saisi'),
-                   COALESCE(N1.eps || ' / ' || N1.epreuve_facultative, 'Non Saisi')
-            FROM Candidats C
-            LEFT JOIN Anonymats A ON C.id_candidat = A.id_candidat
-            LEFT JOIN (
-                SELECT anonymat,
-                    compo_francais || ',' || dictee || ',' || etude_de_texte || ',' ||
-                    instruction_civique || ',' || histoire_geographie || ',' ||
-                    mathematiques || ',' || pc_lv2 || ',' || svt || ',' ||
-                    anglais_ecrit || ',' || anglais_oral AS notes_tour1,
-                    eps, epreuve_facultative
-                FROM Notes_Tour1
-            ) N1 ON A.numero_anonymat = N1.anonymat
-            LEFT JOIN (
-                SELECT anonymat,
-                    francais_2nd_tour || ',' || mathematiques_2nd_tour || ',' || pc_lv2_2nd_tour AS notes_tour2
-                FROM Notes_Tour2
-            ) N2 ON A.numero_anonymat = N2.anonymat
-        """)
-        candidats = self.cur.fetchall()
-        for row, candidat in enumerate(candidats):
-            self.table.insertRow(row)
-            for col, value in enumerate(candidat):
-                formatted_value = str(value).replace(',', ' | ') if isinstance(value, str) else str(value)
-                item = QTableWidgetItem(formatted_value)
-                item.setTextAlignment(Qt.AlignCenter)  # Centrer le texte
-                self.table.setItem(row, col, item)
-
-            # Bouton Modifier
-            btn_modifier = QPushButton("Modifier")
-            btn_modifier.setStyleSheet(f"background-color: {HOVER_COLOR}; color: {TEXT_COLOR}; border-radius: 5px;")
-            btn_modifier.clicked.connect(lambda _, r=row: self.ouvrir_modification_notes(r))
-            self.table.setCellWidget(row, 6, btn_modifier)
+        """Charge tous les candidats et leurs notes (ouverture de l'écran)."""
+        try:
+            self.table.modele.definir_lignes(lire_notes_candidats(self.conn))
+        except sqlite3.Error as e:
+            QMessageBox.critical(self, "Erreur", f"Erreur lors du chargement des notes : {e}")
+            return
+        if self.champ_recherche.text():
+            self.rechercher()
+
+    def rafraichir_candidats(self, ids):
+        """Relit uniquement les candidats dont les notes viennent d'être enregistrées."""
+        ids = [id_candidat for id_candidat in ids if id_candidat is not None]
+        if not ids:
+            return
+        try:
+            self.table.modele.remplacer_lignes(lire_notes_candidats(self.conn, ids),
+                                               cle=lambda ligne: ligne.id_candidat)
+        except sqlite3.Error as e:
+            QMessageBox.critical(self, "Erreur", f"Erreur lors du chargement des notes : {e}")
+
+    def rechercher(self):
+        """Ne garde que les candidats correspondant à la recherche."""
+        filtrer_tableau(self.table, self.conn, self.champ_recherche.text(), 0)
 
     def ouvrir_saisie_notes(self):
         """Ouvre la boîte de dialogue pour saisir les notes."""
@@ -104,17 +132,25 @@ class SaisieNotes(QMainWindow):
         if selected_row == -1:
             QMessageBox.warning(self, "Erreur", "Veuillez sélectionner un candidat.")
             return
-        anonymat = self.table.item(selected_row, 2).text()
+        anonymat = self.table.texte(selected_row, 2)
         dialog = SaisieNotesDialog(self, anonymat, modification=False)
         if dialog.exec_():
-            self.charger_candidats()
+            self.rafraichir_candidats([dialog.id_candidat])
+
+    def ouvrir_saisie_lot(self):
+        """Ouvre la saisie en tableur ; chaque lot enregistré met à jour ses lignes ici."""
+        from views.view.saisie_notes_lot import SaisieNotesLot
+
+        self.fenetre_saisie_lot = SaisieNotesLot()
+        self.fenetre_saisie_lot.notes_enregistrees.connect(self.rafraichir_candidats)
+        self.fenetre_saisie_lot.show()
 
     def ouvrir_modification_notes(self, row):
         """Ouvre la boîte de dialogue pour modifier les notes d'un candidat."""
-        anonymat = self.table.item(row, 2).text()
+        anonymat = self.table.texte(row, 2)
         dialog = SaisieNotesDialog(self, anonymat, modification=True)
         if dialog.exec_():
-            self.charger_candidats()
+            self.rafraichir_candidats([dialog.id_candidat])
 
 class SaisieNotesDialog(QDialog):
     def __init__(self, parent, anonymat, modification=False):
@@ -125,6 +161,7 @@ class SaisieNotesDialog(QDialog):
         self.modification = modification
         self.conn = parent.conn
         self.cur = parent.cur
+        self.id_candidat = None  # Connu après l'enregistrement, pour le rafraîchissement ciblé
 
         # Récupérer les informations du candidat
         self.cur.execute("""
@@ -231,7 +268,7 @@ class SaisieNotesDialog(QDialog):
             if not result:
                 QMessageBox.critical(self, "Erreur", "Aucun candidat trouvé pour cet anonymat.")
                 return
-            id_candidat = result[0]
+            id_candidat = self.id_candidat = result[0]
 
             # Préparer les données pour l'insertion ou la mise à jour
             tour_selected = self.tour_combo.currentText() == "Premier Tour"
@@ -251,35 +288,9 @@ class SaisieNotesDialog(QDialog):
                 for matiere in self.matieres_tour2:
                     notes_data[matiere] = self.notes[matiere].value()
 
-            # Déterminer la table à utiliser
-            table = "Notes_Tour1" if tour_selected else "Notes_Tour2"
-
-            # Vérifier si des notes existent déjà pour ce tour
-            self.cur.execute(f"SELECT COUNT(*) FROM {table} WHERE anonymat = ?", (self.anonymat,))
-            if self.cur.fetchone()[0] > 0:
-                # Mettre à jour les notes existantes
-                set_clause = ", ".join([f"{matiere} = ?" for matiere in notes_data.keys()])
-                values = list(notes_data.values())
-                values.append(self.anonymat)
-                self.cur.execute(f"""
-                    UPDATE {table}
-                    SET {set_clause}
-                    WHERE anonymat = ?
-                """, values)
-            else:
-                # Insérer de nouvelles notes
-                columns = ", ".join(notes_data.keys())
-                placeholders = ", ".join(["?"] * len(notes_data))
-                values = list(notes_data.values())
-                values.insert(0, self.anonymat)
-                values.insert(1, id_candidat)
-                self.cur.execute(f"""
-                    INSERT INTO {table} (anonymat, id_candidat, {columns})
-                    VALUES (?, ?, {placeholders})
-                """, values)
-
-            # Valider la transaction
-            self.conn.commit()
+            # UPSERT par anonymat, en une transaction
+            ecrire_notes(self.conn, 1 if tour_selected else 2,
+                         [(self.anonymat, id_candidat, matiere, note) for matiere, note in notes_data.items()])
 
             # Afficher un message de succès
             QMessageBox.information(self, "Succès", "Notes enregistrées avec succès.")
@@ -0,0 +1,318 @@
+import sys
+import sqlite3
+import time
+from PyQt5.QtWidgets import (
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QComboBox, QMessageBox, QTableView, QStyledItemDelegate, QLineEdit, QAbstractItemView,
+    QAbstractItemDelegate, QShortcut
+)
+from PyQt5.QtGui import QFont, QColor, QKeySequence, QRegExpValidator
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant, QRegExp, QTimer, pyqtSignal
+from models.database_manager import obtenir_connexion
+from models.notes import MATIERES, enregistrer_notes, lire_grille, matiere_applicable, valider_note
+
+# Couleurs inspirées du MainMenu
+PRIMARY_COLOR = "#2C3E50"
+ACCENT_COLOR = "#1ABC9C"
+TEXT_COLOR = "#FFFFFF"
+COULEUR_EN_ATTENTE = QColor("#FFF3C4")
+COULEUR_NON_APPLICABLE = QColor("#E0E0E0")
+
+# Les notes saisies sont écrites par lots : toutes les 30 s, ou dès que 200 notes attendent
+INTERVALLE_ENREGISTREMENT = 30000
+TAILLE_LOT_ENREGISTREMENT = 200
+
+TOUTES_MATIERES = "Toutes les matières"
+
+
+def libelle_matiere(matiere):
+    return matiere.replace('_', ' ').capitalize()
+
+
+class ModeleGrilleNotes(QAbstractTableModel):
+    """Grille anonymats × matières ; les saisies sont validées en mémoire et attendent l'enregistrement."""
+    erreur = pyqtSignal(str)
+    modifie = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.lignes = []
+        self.matieres = []
+        self.en_attente = {}  # (row, matiere) -> note
+
+    def charger(self, lignes, matieres):
+        self.beginResetModel()
+        self.lignes = lignes
+        self.matieres = list(matieres)
+        self.en_attente = {}
+        self.endResetModel()
+
+    def afficher_matieres(self, matieres):
+        """Change les colonnes affichées ; les saisies en attente sont conservées."""
+        self.beginResetModel()
+        self.matieres = list(matieres)
+        self.endResetModel()
+
+    def note(self, row, matiere):
+        cle = (row, matiere)
+        return self.en_attente[cle] if cle in self.en_attente else self.lignes[row].notes[matiere]
+
+    def a_enregistrer(self):
+        """Notes en attente, sous la forme attendue par models.notes.enregistrer_notes."""
+        return [(self.lignes[row].anonymat, self.lignes[row].id_candidat, matiere, note)
+                for (row, matiere), note in self.en_attente.items()]
+
+    def marquer_enregistre(self):
+        """Reporte les notes écrites dans les lignes chargées et les retire de l'attente."""
+        for (row, matiere), note in self.en_attente.items():
+            self.lignes[row].notes[matiere] = note
+        self.en_attente.clear()
+        self.dataChanged.emit(self.index(0, 0), self.index(self.rowCount() - 1, self.columnCount() - 1))
+
+    # --- Interface Qt ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.lignes)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.matieres) + 1
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return QVariant()
+        ligne = self.lignes[index.row()]
+        if index.column() == 0:
+            return ligne.anonymat if role == Qt.DisplayRole else QVariant()
+        matiere = self.matieres[index.column() - 1]
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            note = self.note(index.row(), matiere)
+            return "" if note is None else f"{note:g}"
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if role == Qt.BackgroundRole:
+            if not matiere_applicable(ligne, matiere):
+                return COULEUR_NON_APPLICABLE
+            if (index.row(), matiere) in self.en_attente:
+                return COULEUR_EN_ATTENTE
+        return QVariant()
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        drapeaux = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if index.column() > 0 and matiere_applicable(self.lignes[index.row()], self.matieres[index.column() - 1]):
+            drapeaux |= Qt.ItemIsEditable
+        return drapeaux
+
+    def setData(self, index, valeur, role=Qt.EditRole):
+        if role != Qt.EditRole or not index.isValid() or index.column() == 0:
+            return False
+        try:
+            note = valider_note(valeur)
+        except ValueError as e:
+            self.erreur.emit(f"Anonymat {self.lignes[index.row()].anonymat} : {e}")
+            return False
+        matiere = self.matieres[index.column() - 1]
+        cle = (index.row(), matiere)
+        if note == self.lignes[index.row()].notes[matiere]:
+            self.en_attente.pop(cle, None)
+        else:
+            self.en_attente[cle] = note
+        self.dataChanged.emit(index, index)
+        self.modifie.emit()
+        return True
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return QVariant()
+        if orientation == Qt.Horizontal:
+            return "Anonymat" if section == 0 else libelle_matiere(self.matieres[section - 1])
+        return str(section + 1)
+
+
+class DelegueNote(QStyledItemDelegate):
+    """Éditeur de note : chiffres et une décimale (point ou virgule) seulement."""
+
+    def createEditor(self, parent, option, index):
+        editeur = QLineEdit(parent)
+        editeur.setAlignment(Qt.AlignCenter)
+        editeur.setValidator(QRegExpValidator(QRegExp(r"\d{0,2}([.,]\d{0,2})?"), editeur))
+        return editeur
+
+
+class GrilleNotes(QTableView):
+    """Grille pilotée au clavier : la frappe d'un chiffre ouvre la cellule, Entrée descend
+    à la copie suivante (saisie d'une matière sur toutes les copies), Tab passe à la
+    matière suivante, Suppr efface les notes sélectionnées."""
+
+    def __init__(self, modele, parent=None):
+        super().__init__(parent)
+        self.setModel(modele)
+        self.setItemDelegate(DelegueNote(self))
+        self.setEditTriggers(QAbstractItemView.AnyKeyPressed | QAbstractItemView.DoubleClicked
+                             | QAbstractItemView.EditKeyPressed)
+        self.setSelectionMode(QAbstractItemView.ContiguousSelection)
+
+    def descendre(self):
+        index = self.currentIndex()
+        if index.isValid() and index.row() + 1 < self.model().rowCount():
+            self.setCurrentIndex(index.sibling(index.row() + 1, index.column()))
+
+    def closeEditor(self, editeur, indice):
+        # Entrée valide la note et passe à la copie suivante, dans la même matière
+        super().closeEditor(editeur, QAbstractItemDelegate.NoHint
+                            if indice == QAbstractItemDelegate.SubmitModelCache else indice)
+        if indice == QAbstractItemDelegate.SubmitModelCache:
+            self.descendre()
+
+    def keyPressEvent(self, event):
+        if event.key() in (Qt.Key_Return, Qt.Key_Enter) and self.state() != QAbstractItemView.EditingState:
+            self.descendre()
+        elif event.key() in (Qt.Key_Delete, Qt.Key_Backspace) and self.state() != QAbstractItemView.EditingState:
+            for index in self.selectedIndexes():
+                if self.model().flags(index) & Qt.ItemIsEditable:
+                    self.model().setData(index, "")
+        else:
+            super().keyPressEvent(event)
+
+
+class SaisieNotesLot(QMainWindow):
+    """Saisie des notes par lot, en tableur : une ligne par anonymat, une colonne par matière."""
+    notes_enregistrees = pyqtSignal(list)  # id_candidat des copies écrites par le lot
+
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Saisie des Notes par lot")
+        self.setGeometry(250, 120, 1300, 700)
+        self.setStyleSheet(f"background-color: {PRIMARY_COLOR}; color: {TEXT_COLOR}; font-family: 'Roboto';")
+
+        self.conn = obtenir_connexion()
+        self.tour = 1  # Tour des copies chargées dans la grille
+        self.nb_enregistrees = 0
+        self.nb_saisies = 0
+        self.debut = time.monotonic()
+
+        self.central_widget = QWidget()
+        self.setCentralWidget(self.central_widget)
+        self.layout = QVBoxLayout(self.central_widget)
+
+        titre = QLabel("Saisie des Notes par lot")
+        titre.setFont(QFont("Roboto", 20, QFont.Bold))
+        self.layout.addWidget(titre, alignment=Qt.AlignCenter)
+
+        # Tour et matière saisis
+        barre = QHBoxLayout()
+        self.tour_combo = QComboBox()
+        self.tour_combo.addItems(["Premier Tour", "Second Tour"])
+        self.tour_combo.currentIndexChanged.connect(self.charger_grille)
+        self.matiere_combo = QComboBox()
+        self.matiere_combo.currentIndexChanged.connect(self.changer_matiere)
+        self.btn_enregistrer = QPushButton("Enregistrer (Ctrl+S)")
+        self.btn_enregistrer.setStyleSheet(f"background-color: {ACCENT_COLOR}; color: {TEXT_COLOR}; padding: 8px; border-radius: 5px;")
+        self.btn_enregistrer.clicked.connect(self.enregistrer)
+        for widget in [QLabel("Tour :"), self.tour_combo, QLabel("Matière :"), self.matiere_combo]:
+            barre.addWidget(widget)
+        barre.addStretch()
+        barre.addWidget(self.btn_enregistrer)
+        self.layout.addLayout(barre)
+
+        self.modele = ModeleGrilleNotes(self)
+        self.modele.modifie.connect(self.note_saisie)
+        self.modele.erreur.connect(self.signaler_erreur)
+        self.grille = GrilleNotes(self.modele)
+        self.grille.setStyleSheet("background-color: white; color: black;")
+        self.layout.addWidget(self.grille)
+
+        self.etat = QLabel()
+        self.layout.addWidget(self.etat)
+
+        QShortcut(QKeySequence.Save, self, activated=self.enregistrer)
+
+        self.minuteur = QTimer(self)
+        self.minuteur.timeout.connect(self.enregistrer)
+        self.minuteur.start(INTERVALLE_ENREGISTREMENT)
+
+        self.charger_grille()
+
+    def charger_grille(self):
+        """Enregistre les saisies en attente puis charge les copies du tour choisi."""
+        if not self.enregistrer():
+            # Les notes en attente appartiennent au tour affiché : on y reste
+            self.tour_combo.blockSignals(True)
+            self.tour_combo.setCurrentIndex(self.tour - 1)
+            self.tour_combo.blockSignals(False)
+            return
+        tour = self.tour_combo.currentIndex() + 1
+        try:
+            lignes = lire_grille(self.conn, tour)
+        except sqlite3.Error as e:
+            QMessageBox.critical(self, "Erreur", f"Erreur lors du chargement des copies : {e}")
+            return
+        self.tour = tour
+        matieres = MATIERES[tour]
+        self.matiere_combo.blockSignals(True)
+        self.matiere_combo.clear()
+        self.matiere_combo.addItems([TOUTES_MATIERES] + [libelle_matiere(m) for m in matieres])
+        self.matiere_combo.blockSignals(False)
+        self.modele.charger(lignes, matieres)
+        self.grille.setCurrentIndex(self.modele.index(0, 1))
+        self.grille.setFocus()
+        self.afficher_etat()
+
+    def changer_matiere(self, position):
+        """Une matière seule : le correcteur saisit toutes les copies de haut en bas."""
+        matieres = MATIERES[self.tour]
+        self.modele.afficher_matieres(matieres if position <= 0 else [matieres[position - 1]])
+        self.grille.setCurrentIndex(self.modele.index(0, 1))
+        self.grille.setFocus()
+
+    def note_saisie(self):
+        self.nb_saisies += 1
+        if len(self.modele.en_attente) >= TAILLE_LOT_ENREGISTREMENT:
+            self.enregistrer()
+        else:
+            self.afficher_etat()
+
+    def signaler_erreur(self, message):
+        self.etat.setText(f"<span style='color: #E74C3C;'>{message}</span>")
+
+    def enregistrer(self):
+        """Écrit les notes en attente en une transaction ; retourne False en cas d'échec."""
+        saisies = self.modele.a_enregistrer()
+        if not saisies:
+            return True
+        try:
+            self.nb_enregistrees += enregistrer_notes(self.conn, self.tour, saisies)
+        except (sqlite3.Error, ValueError) as e:
+            QMessageBox.critical(self, "Erreur", f"Erreur lors de l'enregistrement des notes : {e}")
+            return False
+        self.modele.marquer_enregistre()
+        self.notes_enregistrees.emit(sorted({id_candidat for _, id_candidat, _, _ in saisies}))
+        self.afficher_etat(f"Enregistré à {time.strftime('%H:%M:%S')}")
+        return True
+
+    def afficher_etat(self, message=""):
+        minutes = max((time.monotonic() - self.debut) / 60, 1 / 60)
+        self.etat.setText(
+            f"{len(self.modele.lignes)} copie(s) — {len(self.modele.en_attente)} note(s) en attente — "
+            f"{self.nb_enregistrees} enregistrée(s) — {self.nb_saisies / minutes:.0f} notes/min"
+            + (f" — {message}" if message else "")
+        )
+
+    def closeEvent(self, event):
+        if not self.enregistrer():
+            choix = QMessageBox.question(self, "Notes non enregistrées",
+                                         "Des notes n'ont pas pu être enregistrées. Fermer quand même ?",
+                                         QMessageBox.Yes | QMessageBox.No)
+            if choix != QMessageBox.Yes:
+                event.ignore()
+                return
+        self.minuteur.stop()
+        super().closeEvent(event)
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    window = SaisieNotesLot()
+    window.show()
+    sys.exit(app.exec_())
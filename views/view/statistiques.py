@@ -3,14 +3,31 @@ import sqlite3
 from typing import Dict, Tuple, Optional
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QLabel, 
-    QHBoxLayout, QPushButton, QFrame, QMessageBox, QComboBox
+    QHBoxLayout, QPushButton, QFrame, QMessageBox, QComboBox,
+    QTableWidget, QTableWidgetItem, QHeaderView
 )
 from PyQt5.QtGui import QFont, QPainter, QColor, QBrush
-from PyQt5.QtCore import Qt, QRectF, QMargins
+from PyQt5.QtCore import Qt, QRectF, QMargins, QTimer
 from PyQt5.QtChart import (
     QChart, QChartView, QPieSeries, QBarSeries, QBarSet, 
     QBarCategoryAxis, QValueAxis, QPieSlice
 )
+from controllers.task_controller import gestionnaire_taches
+from models.database_manager import obtenir_connexion
+from models.statistiques import (
+    STATUTS, StatistiquesCohorte, calculer_statistiques, lire_compteurs, statistiques_resultats
+)
+
+# Répartitions proposées : (libellé, dimension de StatistiquesCohorte.repartitions).
+# La première est affichée à l'ouverture : celle par établissement, tenue par les compteurs.
+REPARTITIONS = [("Par établissement", "etablissement"), ("Par sexe", "sexe"),
+                ("Par type de candidat", "type_candidat")]
+
+# Colonnes du tableau des matières après le nom ; seules les trois premières viennent des compteurs
+COLONNES_MATIERES = ["effectif", "moyenne", "ecart_type", "min", "p25", "mediane", "p75", "max"]
+
+# Intervalle (ms) de vérification des modifications de la base
+INTERVALLE_VERIFICATION = 2000
 
 
 
@@ -60,12 +77,17 @@ class StatCard(QFrame):
         title_label.setFont(QFont("Roboto", 12))
         title_label.setAlignment(Qt.AlignCenter)
         
-        value_label = QLabel(str(value))
-        value_label.setFont(QFont("Roboto", 16, QFont.Bold))
-        value_label.setAlignment(Qt.AlignCenter)
+        self.value_label = QLabel(str(value))
+        self.value_label.setFont(QFont("Roboto", 16, QFont.Bold))
+        self.value_label.setAlignment(Qt.AlignCenter)
         
         layout.addWidget(title_label)
-        layout.addWidget(value_label)
+        layout.addWidget(self.value_label)
+
+    def definir_valeur(self, value):
+        """Change la valeur affichée ; rien n'est redessiné si elle est identique."""
+        if self.value_label.text() != str(value):
+            self.value_label.setText(str(value))
 
 STATUS_COLORS = {
     "Admis": QColor("#2ECC71"),      # Vert
@@ -115,6 +137,9 @@ class Statistiques(QMainWindow):
 
         self.conn = None
         self.cur = None
+        self.statistiques = None  # Détail du moteur (quantiles, répartitions), None s'il est périmé
+        self.compteurs = None
+        self.signature = None
         self.init_database()
         
         # Widget central
@@ -131,13 +156,59 @@ class Statistiques(QMainWindow):
         # Contenu
         self.setup_content()
         
-        # Charger les données initiales
-        self.charger_statistiques()
+        # Les compteurs suffisent à l'ouverture ; le détail est calculé sur demande (Rafraîchir)
+        self.actualiser_compteurs()
+        self.minuteur = QTimer(self)
+        self.minuteur.timeout.connect(self.verifier_modifications)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.verifier_modifications()
+        self.minuteur.start(INTERVALLE_VERIFICATION)
+
+    def hideEvent(self, event):
+        self.minuteur.stop()
+        super().hideEvent(event)
+
+    def signature_base(self):
+        """Change à chaque écriture dans la base, par cette connexion ou une autre."""
+        return self.conn.execute("PRAGMA data_version").fetchone()[0], self.conn.total_changes
+
+    def verifier_modifications(self):
+        """Relit les compteurs si la base a été modifiée depuis la dernière lecture."""
+        if self.signature_base() != self.signature:
+            self.actualiser_compteurs()
+
+    def actualiser_compteurs(self):
+        """Lit les compteurs et ne met à jour que les cartes, graphiques et cellules qui changent."""
+        self.signature = self.signature_base()
+        try:
+            compteurs = lire_compteurs(self.conn)
+        except sqlite3.Error as e:
+            self.statusBar().showMessage(f"Compteurs indisponibles : {e}", 5000)
+            return
+        if compteurs == self.compteurs:
+            return
+        perime = self.compteurs is not None and self.statistiques is not None
+        if perime:
+            # Les quantiles et répartitions calculés ne correspondent plus aux données
+            self.statistiques = None
+            self.statusBar().showMessage("Données modifiées : Rafraîchir pour recalculer quantiles et répartitions.")
+        self.compteurs = compteurs
+
+        stats = statistiques_resultats(self.conn, compteurs)
+        self.update_cards(stats)
+        self.update_charts(stats)
+        self.remplir_matieres(compteurs.matieres)
+        if self.repartition_selector.currentData() == "etablissement":
+            self.remplir_repartition()
+        elif perime:
+            self.table_repartition.setRowCount(0)
 
     def init_database(self):
         """Initialise la connexion à la base de données avec gestion d'erreurs."""
         try:
-            self.conn = sqlite3.connect("bfem_db.sqlite")
+            self.conn = obtenir_connexion()
             self.cur = self.conn.cursor()
         except sqlite3.Error as e:
             QMessageBox.critical(self, "Erreur Base de données", 
@@ -171,114 +242,106 @@ class Statistiques(QMainWindow):
 
   
 
-    def get_statistics(self) -> Optional[Dict[str, dict]]:
-        """Récupère les statistiques détaillées de la base de données."""
-        try:
-            # Récupérer d'abord le total des candidats
-            self.cur.execute("""
-                SELECT COUNT(*) 
-                FROM Candidats
-            """)
-            total_candidats = self.cur.fetchone()[0]
-
-            # Récupérer les statistiques par statut
-            self.cur.execute("""
-                SELECT 
-                    D.statut,
-                    COUNT(*) as nombre,
-                    ROUND(CAST(COUNT(*) AS FLOAT) * 100 / CAST((
-                        SELECT COUNT(*) 
-                        FROM Deliberation
-                    ) AS FLOAT), 2) as pourcentage
-                FROM Deliberation D
-                GROUP BY D.statut
-                ORDER BY nombre DESC
-            """)
-            
-            resultats = self.cur.fetchall()
-            
-            # Initialiser les statistiques avec tous les statuts possibles
-            stats = {
-                "Total Candidats": total_candidats,
-                "Admis": {"nombre": 0, "pourcentage": 0.0},
-                "2nd Tour": {"nombre": 0, "pourcentage": 0.0},
-                "Échec": {"nombre": 0, "pourcentage": 0.0},
-                "Repêchage": {"nombre": 0, "pourcentage": 0.0}
-            }
-            
-            # Mettre à jour les statistiques avec les données récupérées
-            for statut, nombre, pourcentage in resultats:
-                if statut in stats:
-                    stats[statut] = {
-                        "nombre": nombre,
-                        "pourcentage": pourcentage
-                    }
-            
-            return stats
-
-        except sqlite3.Error as e:
-            QMessageBox.warning(self, "Erreur", f"Erreur lors de la récupération des statistiques: {str(e)}")
-            return None
-
     def charger_statistiques(self):
-        """Met à jour l'interface avec les dernières statistiques."""
-        # Nettoyer les widgets existants
-        for i in reversed(range(self.stats_layout.count())): 
-            widget = self.stats_layout.itemAt(i).widget()
-            if widget:
-                widget.deleteLater()
-
-        # Charger les nouvelles statistiques
-        stats = self.get_statistics()
-        if not stats:
-            return
-
-        print("Données récupérées :", stats)  # Ajoutez ce log pour vérifier les données
-
-        # Créer les cartes de statistiques
-        total_card = StatCard("Total Candidats", stats["Total Candidats"])
-        self.stats_layout.addWidget(total_card)
-
-        for statut, data in stats.items():
-            if statut != "Total Candidats":
-                stat_text = f"{data['nombre']} ({data['pourcentage']}%)"
-                stat_card = StatCard(statut, stat_text)
-                self.stats_layout.addWidget(stat_card)
-
-        # Mettre à jour les graphiques
+        """Recalcule le détail des statistiques en arrière-plan, puis met à jour l'interface."""
+        if not self.refresh_btn.isEnabled():
+            return  # Calcul déjà en cours
+        self.refresh_btn.setEnabled(False)
+        self.statusBar().showMessage("Calcul des statistiques...")
+
+        def terminer(statistiques):
+            self.refresh_btn.setEnabled(True)
+            self.statusBar().showMessage(f"{statistiques.total_candidats} candidats analysés "
+                                         f"en {statistiques.duree:.2f} s", 5000)
+            self.afficher_statistiques(statistiques)
+
+        def echouer(erreur):
+            self.refresh_btn.setEnabled(True)
+            self.statusBar().clearMessage()
+            QMessageBox.warning(self, "Erreur", f"Erreur lors de la récupération des statistiques: {erreur}")
+
+        gestionnaire_taches().soumettre(lambda conn, tache: calculer_statistiques(conn),
+                                        termine=terminer, erreur=echouer)
+
+    def afficher_statistiques(self, statistiques: StatistiquesCohorte):
+        """Complète les tableaux avec le détail du moteur (quantiles, répartitions)."""
+        self.statistiques = statistiques
+        stats = statistiques_resultats(self.conn, statistiques)
+        self.update_cards(stats)
         self.update_charts(stats)
-        
-
-    def update_charts(self, stats: Dict[str, dict]):
-        """Met à jour les graphiques avec les nouvelles données."""
-        print("Données reçues pour les graphiques :", stats)  # Ajoutez ce log pour vérifier les données
-
+        self.remplir_matieres(statistiques.matieres)
+        self.remplir_repartition()
+
+    def update_cards(self, stats: Dict[str, dict]):
+        """Met à jour la valeur des cartes existantes."""
+        self.cartes["Total Candidats"].definir_valeur(stats["Total Candidats"])
+        for statut in STATUTS:
+            self.cartes[statut].definir_valeur(f"{stats[statut]['nombre']} ({stats[statut]['pourcentage']}%)")
+
+    def definir_cellule(self, table, row, col, texte):
+        """Écrit une cellule seulement si son texte change."""
+        item = table.item(row, col)
+        if item is None:
+            item = QTableWidgetItem(texte)
+            if col:
+                item.setTextAlignment(Qt.AlignCenter)
+            table.setItem(row, col, item)
+        elif item.text() != texte:
+            item.setText(texte)
+
+    def remplir_matieres(self, matieres: Dict[str, dict]):
+        """Colonnes absentes des valeurs (quantiles pour les compteurs) affichées « - »."""
+        self.table_matieres.setRowCount(len(matieres))
+        for row, (matiere, valeurs) in enumerate(matieres.items()):
+            self.definir_cellule(self.table_matieres, row, 0, matiere.replace("_", " ").capitalize())
+            for col, cle in enumerate(COLONNES_MATIERES, 1):
+                valeur = valeurs.get(cle)
+                self.definir_cellule(self.table_matieres, row, col, "-" if valeur is None else str(valeur))
+
+    def remplir_repartition(self):
+        """Affiche la répartition choisie dans la liste, sans recalcul.
+
+        Sans détail à jour, la répartition par établissement vient des compteurs (admis
+        seulement) ; les autres demandent le calcul du détail.
+        """
+        dimension = self.repartition_selector.currentData()
+        if self.statistiques is not None:
+            repartition = self.statistiques.repartitions[dimension]
+        elif dimension == "etablissement" and self.compteurs is not None:
+            repartition = self.compteurs.etablissements
+        else:
+            self.charger_statistiques()
+            return
+        self.table_repartition.setRowCount(len(repartition))
+        for row, (valeur, groupe) in enumerate(repartition.items()):
+            self.definir_cellule(self.table_repartition, row, 0, valeur)
+            cellules = [groupe["total"]] + [groupe.get(statut, "-") for statut in STATUTS] + [f"{groupe['taux_admis']}%"]
+            for col, cellule in enumerate(cellules, 1):
+                self.definir_cellule(self.table_repartition, row, col, str(cellule))
+
+    def setup_charts(self):
+        """Crée les graphiques une fois ; update_charts ne fait ensuite que changer les valeurs."""
         # Graphique circulaire
         pie_series = QPieSeries()
+        self.tranches = {}
         
         # Ajouter les tranches avec leurs couleurs respectives
-        for statut, data in stats.items():
-            if statut != "Total Candidats":
-                print(f"Statut : {statut}, Données : {data}")  # Ajoutez ce log pour vérifier chaque statut
-                slice = QPieSlice(
-                    statut,
-                    float(data['nombre'])
-                )
-                pie_series.append(slice)
-                
-                # Définir la couleur de la tranche
-                if statut in STATUS_COLORS:
-                    slice.setBrush(STATUS_COLORS[statut])
-                
-                # Configurer l'étiquette
-                slice.setLabelVisible(True)
-                slice.setLabelPosition(QPieSlice.LabelOutside)
-                label_text = f"{statut}\n{data['nombre']} ({data['pourcentage']}%)"
-                slice.setLabel(label_text)
-                
-                # Ajouter des effets au survol
-                slice.setExploded(True)
-                slice.setExplodeDistanceFactor(0.1)
+        for statut in STATUTS:
+            slice = QPieSlice(statut, 0.0)
+            pie_series.append(slice)
+            self.tranches[statut] = slice
+            
+            # Définir la couleur de la tranche
+            if statut in STATUS_COLORS:
+                slice.setBrush(STATUS_COLORS[statut])
+            
+            # Configurer l'étiquette
+            slice.setLabelVisible(True)
+            slice.setLabelPosition(QPieSlice.LabelOutside)
+            
+            # Ajouter des effets au survol
+            slice.setExploded(True)
+            slice.setExplodeDistanceFactor(0.1)
 
         pie_chart = QChart()
         pie_chart.addSeries(pie_series)
@@ -297,20 +360,16 @@ class Statistiques(QMainWindow):
         self.pie_chart.setChart(pie_chart)
         
         # Graphique en barres
-        bar_set = QBarSet("Nombre de candidats")
-        categories = []
-        
-        for statut, data in stats.items():
-            if statut != "Total Candidats":
-                categories.append(statut)
-                bar_set.append(data['nombre'])
-                
-                # Définir la couleur de la barre
-                if statut in STATUS_COLORS:
-                    bar_set.setColor(STATUS_COLORS[statut])
+        self.bar_set = QBarSet("Nombre de candidats")
+        for statut in STATUTS:
+            self.bar_set.append(0)
+            
+            # Définir la couleur de la barre
+            if statut in STATUS_COLORS:
+                self.bar_set.setColor(STATUS_COLORS[statut])
 
         bar_series = QBarSeries()
-        bar_series.append(bar_set)
+        bar_series.append(self.bar_set)
 
         bar_chart = QChart()
         bar_chart.addSeries(bar_series)
@@ -320,23 +379,41 @@ class Statistiques(QMainWindow):
 
         # Axes
         axis_x = QBarCategoryAxis()
-        axis_x.append(categories)
+        axis_x.append(STATUTS)
         bar_chart.addAxis(axis_x, Qt.AlignBottom)
         bar_series.attachAxis(axis_x)
 
-        axis_y = QValueAxis()
-        max_value = max(data['nombre'] for statut, data in stats.items() if statut != "Total Candidats")
-        axis_y.setRange(0, max_value * 1.1)
-        axis_y.setTitleText("Nombre de candidats")
-        bar_chart.addAxis(axis_y, Qt.AlignLeft)
-        bar_series.attachAxis(axis_y)
+        self.axis_y = QValueAxis()
+        self.axis_y.setRange(0, 1.1)
+        self.axis_y.setTitleText("Nombre de candidats")
+        bar_chart.addAxis(self.axis_y, Qt.AlignLeft)
+        bar_series.attachAxis(self.axis_y)
 
         self.bar_chart.setChart(bar_chart)
+
+    def update_charts(self, stats: Dict[str, dict]):
+        """Met à jour les tranches et les barres dont la valeur a changé."""
+        for i, statut in enumerate(STATUTS):
+            nombre = stats[statut]['nombre']
+            slice = self.tranches[statut]
+            if slice.value() != nombre:
+                slice.setValue(float(nombre))
+            slice.setLabel(f"{statut}\n{nombre} ({stats[statut]['pourcentage']}%)")
+            if self.bar_set.at(i) != nombre:
+                self.bar_set.replace(i, nombre)
+
+        max_value = max(stats[statut]['nombre'] for statut in STATUTS)
+        self.axis_y.setRange(0, max(max_value, 1) * 1.1)
+
     def setup_content(self):
         """Configure le contenu principal de l'application."""
         # Layout pour les cartes de statistiques
         self.stats_layout = QHBoxLayout()
         self.layout.addLayout(self.stats_layout)
+        self.cartes = {}
+        for titre in ["Total Candidats"] + STATUTS:
+            self.cartes[titre] = StatCard(titre, "-")
+            self.stats_layout.addWidget(self.cartes[titre])
         
         # Layout pour les graphiques avec espacement
         charts_layout = QHBoxLayout()
@@ -374,16 +451,35 @@ class Statistiques(QMainWindow):
         charts_layout.addWidget(bar_container)
         
         self.layout.addLayout(charts_layout)
-
-
-    def closeEvent(self, event):
-        """Gère la fermeture propre de l'application."""
-        if self.conn:
-            try:
-                self.conn.close()
-            except sqlite3.Error:
-                pass
-        event.accept()
+        self.setup_charts()
+
+        # Tableaux : notes par matière et répartition des résultats
+        tables_layout = QHBoxLayout()
+        tables_layout.setSpacing(20)
+
+        self.table_matieres = QTableWidget(0, 9)
+        self.table_matieres.setHorizontalHeaderLabels(
+            ["Matière", "Notes", "Moyenne", "Écart-type", "Min", "Q1", "Médiane", "Q3", "Max"])
+
+        repartition_layout = QVBoxLayout()
+        self.repartition_selector = QComboBox()
+        for libelle, dimension in REPARTITIONS:
+            self.repartition_selector.addItem(libelle, dimension)
+        self.repartition_selector.currentIndexChanged.connect(self.remplir_repartition)
+        self.table_repartition = QTableWidget(0, len(STATUTS) + 3)
+        self.table_repartition.setHorizontalHeaderLabels(["Groupe", "Total"] + STATUTS + ["% admis"])
+        repartition_layout.addWidget(self.repartition_selector)
+        repartition_layout.addWidget(self.table_repartition)
+
+        for table in [self.table_matieres, self.table_repartition]:
+            table.setEditTriggers(QTableWidget.NoEditTriggers)
+            table.verticalHeader().setVisible(False)
+            table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+            table.setStyleSheet("background-color: rgba(255, 255, 255, 0.1); color: black;")
+
+        tables_layout.addWidget(self.table_matieres)
+        tables_layout.addLayout(repartition_layout)
+        self.layout.addLayout(tables_layout)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)